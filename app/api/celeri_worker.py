@@ -1,19 +1,31 @@
 """Celery worker management endpoints for the demo API."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
-from typing import List, Dict, Any
+from app.database import get_async_db, get_async_session_factory, get_db
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from typing import List, Dict, Any, Optional
+from datetime import datetime
 from app.models.celery_job import CeleryJob
 from app.celery_app import celery_app
-from sqlalchemy import select
+from celery import chunks, group
+from sqlalchemy import func, insert, select, tuple_
+from app.api.pagination import decode_cursor, encode_cursor, ndjson_response, page, wants_ndjson
+from app.job_events import TERMINAL_STATUSES, JobEventsUnavailable, get_job_event_bus, job_event
+from fastapi.responses import StreamingResponse
+import asyncio
 import json
+import uuid
+
+SSE_KEEPALIVE_SECONDS = 15.0
+EVENT_COLUMNS = (CeleryJob.id, CeleryJob.batch_id, CeleryJob.status, CeleryJob.progress, CeleryJob.updated_at)
 
 router = APIRouter(prefix="/celery-worker", tags=["celery worker"])
 
 @router.post("/submit_complicated_job", status_code=202) # Staus code 202 Accepted
 def submit_complicated_job(params: dict, db: Session = Depends(get_db)):
     """Persist a Celery job request and dispatch it to the worker queue."""
-    job = CeleryJob(params=json.dumps(params), status="PENDING")
+    job = CeleryJob(params=params, status="PENDING")
     db.add(job)
     db.commit()
     db.refresh(job)
@@ -24,17 +36,187 @@ def submit_complicated_job(params: dict, db: Session = Depends(get_db)):
 
     return {"job_id": job.id, "status": job.status}
 
-@router.get("/tasks")
-def get_celery_tasks(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Return the persisted Celery jobs and their current status."""
-    tasks = db.execute(select(CeleryJob)).scalars().all()
-    return [
-        {
-            "id": t.id,
-            "status": t.status,
-            "params": t.params,
-            "created_at": t.created_at,
-            "updated_at": t.updated_at
-        }
-        for t in tasks
+JOB_COLUMNS = (CeleryJob.id, CeleryJob.status, CeleryJob.progress, CeleryJob.params, CeleryJob.created_at,
+               CeleryJob.started_at, CeleryJob.updated_at)
+
+def dispatch_batch(job_ids: List[int], params_list: List[dict], chunk_size: int = 1) -> None:
+    """Publish a batch of analysis jobs as one Celery group, or as chunks of ``chunk_size`` jobs per message."""
+    if chunk_size > 1:
+        chunks(celery_app.signature("complicated_analysis.run_analysis"),
+               list(zip(job_ids, params_list)), chunk_size).apply_async()
+    else:
+        group(
+            celery_app.signature("complicated_analysis.run_analysis", kwargs={"job_id": job_id, "params": params})
+            for job_id, params in zip(job_ids, params_list)
+        ).apply_async()
+
+@router.post("/submit_batch", status_code=202) # Staus code 202 Accepted
+def submit_batch(
+    params_list: List[dict] = Body(..., min_length=1, max_length=10000, description="One params dict per job"),
+    chunk_size: int = Query(1, ge=1, le=1000, description="Jobs per broker message (1 = one message per job)"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Persist a whole parameter sweep in one INSERT and dispatch it to the worker queue under one batch ID."""
+    batch_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    rows = [
+        {"params": params, "status": "PENDING", "progress": 0, "batch_id": batch_id,
+         "created_at": now, "updated_at": now}
+        for params in params_list
     ]
+    # Multi-row INSERT ... RETURNING id, ids kept in the order of params_list
+    job_ids = db.execute(
+        insert(CeleryJob).returning(CeleryJob.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    db.commit()
+
+    dispatch_batch(job_ids, params_list, chunk_size)
+
+    return {"batch_id": batch_id, "job_ids": job_ids, "status": "PENDING"}
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str, db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
+    """Return aggregate status counts and mean progress of a submitted batch."""
+    rows = (await db.execute(
+        select(CeleryJob.status, func.count(), func.sum(CeleryJob.progress))
+        .where(CeleryJob.batch_id == batch_id)
+        .group_by(CeleryJob.status)
+    )).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+
+    counts = {status: count for status, count, _ in rows}
+    total = sum(counts.values())
+    finished = counts.get("SUCCEEDED", 0) + counts.get("FAILED", 0)
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "counts": counts,
+        "progress": sum(progress or 0 for _, _, progress in rows) / total,
+        "done": finished == total,
+    }
+
+@router.get("/tasks")
+async def get_celery_tasks(
+    request: Request,
+    response: Response,
+    status: Optional[List[str]] = Query(None, description="Only return jobs with these statuses"),
+    created_from: Optional[datetime] = Query(None, description="Only jobs created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only jobs created at or before this time"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(500, ge=1, le=5000, description="Page size"),
+    output: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$",
+                                  description="ndjson streams every matching row instead of one page"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[Dict[str, Any]]:
+    """Return the persisted Celery jobs and their current status, oldest first, one keyset page at a time."""
+    # Column-only projection ordered by the (created_at, id) keyset
+    stmt = select(*JOB_COLUMNS).order_by(CeleryJob.created_at, CeleryJob.id)
+    if status:
+        stmt = stmt.where(CeleryJob.status.in_(status))
+    if created_from is not None:
+        stmt = stmt.where(CeleryJob.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(CeleryJob.created_at <= created_to)
+    if cursor is not None:
+        created_at, job_id = decode_cursor(cursor, datetime, int)
+        stmt = stmt.where(tuple_(CeleryJob.created_at, CeleryJob.id) > tuple_(created_at, job_id))
+
+    if wants_ndjson(request, output):
+        return ndjson_response(db, stmt, lambda row: row._asdict())
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    rows = page(rows, limit, response, lambda row: encode_cursor(row.created_at, row.id))
+    return [row._asdict() for row in rows]
+
+
+def sse_message(event: Dict[str, Any]) -> str:
+    """Format a job event as one Server-Sent Events message."""
+    return f"id: {event['updated_at']}\nevent: status\ndata: {json.dumps(event)}\n\n"
+
+async def status_events(request: Request, queue: asyncio.Queue, current: Dict[int, Dict[str, Any]], matches):
+    """
+    Yield the current state of each job, then one message per actual change until all jobs finish.
+
+    Duplicates (same status and progress) and events older than the state
+    already sent are dropped. A comment line keeps idle connections open. When
+    the event bus fails, an ``error`` message ends the stream.
+    """
+    bus = get_job_event_bus()
+    try:
+        for event in current.values():
+            yield sse_message(event)
+        pending = {job_id for job_id, event in current.items() if event["status"] not in TERMINAL_STATUSES}
+        while pending:
+            try:
+                event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            if "error" in event:
+                # The bus lost its subscription: end the stream so the client reconnects and re-reads the rows
+                yield f"event: error\ndata: {json.dumps(event)}\n\n"
+                return
+            if not matches(event) or event["job_id"] not in current:
+                continue
+            last = current[event["job_id"]]
+            if (event["status"], event["progress"]) == (last["status"], last["progress"]) \
+                    or event["updated_at"] < last["updated_at"]:
+                continue
+            current[event["job_id"]] = event
+            yield sse_message(event)
+            if event["status"] in TERMINAL_STATUSES:
+                pending.discard(event["job_id"])
+    finally:
+        bus.unsubscribe(queue)
+
+async def subscribe_with_snapshot(sessions: async_sessionmaker, stmt):
+    """
+    Subscribe to job events, then read the current rows of ``stmt`` in a short-lived session.
+
+    Subscribing first means no change can slip in between the read and the
+    first event. The session is closed before the stream starts, so an open
+    stream does not hold a pooled connection.
+    """
+    bus = get_job_event_bus()
+    try:
+        queue = await bus.subscribe()
+    except JobEventsUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    try:
+        async with sessions() as db:
+            rows = (await db.execute(stmt)).all()
+    except BaseException:
+        bus.unsubscribe(queue)
+        raise
+    if not rows:
+        bus.unsubscribe(queue)
+    return queue, rows
+
+@router.get("/tasks/{job_id}/events")
+async def stream_job_status(job_id: int, request: Request,
+                            sessions: async_sessionmaker = Depends(get_async_session_factory)):
+    """Stream status changes of one job as Server-Sent Events, ending when the job finishes."""
+    queue, rows = await subscribe_with_snapshot(sessions, select(*EVENT_COLUMNS).where(CeleryJob.id == job_id))
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    current = {row.id: job_event(row) for row in rows}
+    return StreamingResponse(status_events(request, queue, current, lambda e: e["job_id"] == job_id),
+                             media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/batch/{batch_id}/events")
+async def stream_batch_status(batch_id: str, request: Request,
+                              sessions: async_sessionmaker = Depends(get_async_session_factory)):
+    """Stream status changes of every job in a batch as Server-Sent Events, ending when all jobs finish."""
+    queue, rows = await subscribe_with_snapshot(
+        sessions, select(*EVENT_COLUMNS).where(CeleryJob.batch_id == batch_id).order_by(CeleryJob.id)
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+
+    current = {row.id: job_event(row) for row in rows}
+    return StreamingResponse(status_events(request, queue, current, lambda e: e["batch_id"] == batch_id),
+                             media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,48 @@
+"""Compact columnar encodings for time-series responses (``format=columnar``)."""
+
+from typing import Any, Dict, Mapping
+
+import numpy as np
+
+
+def time_axis(times: np.ndarray, step: int) -> Dict[str, Any]:
+    """
+    Describe an epoch array as ``{"start", "step", "count"}``.
+
+    Resampled series skip empty buckets, so when the spacing is not uniformly
+    ``step`` the explicit epochs are added under ``"times"``.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    axis = {"start": int(times[0]) if times.size else None, "step": step, "count": int(times.size)}
+    if times.size > 1 and np.any(np.diff(times) != step):
+        axis["times"] = times
+    return axis
+
+
+def columnar_series(times: np.ndarray, columns: Mapping[str, np.ndarray], step: int) -> Dict[str, Any]:
+    """A time axis plus one value array per variable, parallel to it."""
+    # orjson serialises numpy arrays natively, but only C-contiguous ones
+    values = {name: np.ascontiguousarray(column) for name, column in columns.items()}
+    return {**time_axis(times, step), "columns": values}
+
+
+def run_lengths(mask) -> Dict[str, Any]:
+    """
+    Run-length encode a boolean series.
+
+    Returns:
+        dict: ``{"first": bool, "runs": [...]}``; the runs alternate in value,
+            starting with ``first``, and sum to the series length
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.size == 0:
+        return {"first": False, "runs": np.zeros(0, dtype=np.int64)}
+    edges = np.flatnonzero(mask[1:] != mask[:-1]) + 1
+    return {"first": bool(mask[0]), "runs": np.diff(np.concatenate(([0], edges, [mask.size])))}
+
+
+def expand_run_lengths(encoded: Mapping[str, Any]) -> np.ndarray:
+    """Inverse of :func:`run_lengths`."""
+    runs = np.asarray(encoded["runs"], dtype=np.int64)
+    values = (np.arange(runs.size) % 2 == 0) == bool(encoded["first"])
+    return np.repeat(values, runs)
@@ -1,15 +1,60 @@
-"""Weather service endpoints backed by the static JSON forecast file."""
+"""Weather service endpoints backed by the static JSON forecast file or a forecast grid."""
 
-from fastapi import APIRouter, Query, HTTPException
-from typing import Dict, Any
-import json
+from fastapi import APIRouter, Query, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+import math
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+import os
+import threading
+from app.forecast_store import ForecastGrid, format_timestamps, to_records
+from app.ingest import DEFAULT_BATCH_SIZE, ForecastIngest, feed_format
+from app.resample import RESOLUTION_PATTERN, parse_aggregation, parse_resolution, resample
 
-# Load JSON mock at startup
+# JSON mock, parsed on first use into a time-sorted column store.
+# A multi-location grid (see demo_tools/generate_forecast_grid.py) replaces it when configured:
+# either an .npz archive or a memory-mapped binary file (see demo_tools/convert_forecast.py).
 DATA_PATH = Path(__file__).parent.parent / "mock_forecast.json"
-with open(DATA_PATH, "r") as f:
-    weather_data = json.load(f)
+GRID_PATH = os.getenv("WEATHER_GRID_PATH")
+
+
+def load_forecast_grid() -> ForecastGrid:
+    """Load the configured forecast grid, or wrap the JSON mock as a single-point grid."""
+    if GRID_PATH:
+        path = Path(GRID_PATH)
+        return ForecastGrid.from_npz(path) if path.suffix == ".npz" else ForecastGrid.from_binary(path)
+    return ForecastGrid.from_json(DATA_PATH)
+
+
+_forecast_grid: Optional[ForecastGrid] = None
+_forecast_grid_lock = threading.Lock()
+_ingest_lock = threading.Lock()  # serialises appends, which extend the buffers of the current grid
+
+
+def get_forecast_grid() -> ForecastGrid:
+    """
+    Return the process-wide forecast grid, loading it on first use.
+
+    Loading is deferred so importing the app (and booting workers that never
+    serve weather requests) stays fast; the lock keeps concurrent first
+    requests from parsing the file twice.
+    """
+    global _forecast_grid
+    if _forecast_grid is None:
+        with _forecast_grid_lock:
+            if _forecast_grid is None:
+                _forecast_grid = load_forecast_grid()
+    return _forecast_grid
+
+
+def append_forecast(times, columns) -> int:
+    """Upsert a batch into the served forecast and publish the new grid; return how many entries it replaced."""
+    global _forecast_grid
+    with _ingest_lock:
+        grid, replaced = get_forecast_grid().merge(times, columns)
+        _forecast_grid = grid  # requests already holding the previous grid keep a consistent series
+    return replaced
 
 router = APIRouter(prefix="/weather-service", tags=["weather service"])
 
@@ -17,9 +62,12 @@ router = APIRouter(prefix="/weather-service", tags=["weather service"])
 def get_weather(
     location: str = Query("61.5,4.8", description="Format: lat,lon"),
     time_from: int = Query(..., alias="from", description="Start timestamp (unix seconds, UTC)"),
-    time_to: int = Query(...,le=10000000000, description="End timestamp (unix seconds, UTC)")
+    time_to: int = Query(...,le=10000000000, description="End timestamp (unix seconds, UTC)"),
+    interpolation: str = Query("nearest", pattern="^(nearest|bilinear)$", description="Grid lookup method"),
+    resolution: Optional[str] = Query(None, pattern=RESOLUTION_PATTERN, description="Aggregate into buckets, e.g. 1h"),
+    aggregation: str = Query("mean", description="mean|max|min, or per variable like wave_height:max,wind_speed:max"),
 ) -> Dict[str, Any]:
-    """Return forecast data filtered by the requested location and time range."""
+    """Return forecast data filtered by the requested location and time range, optionally resampled."""
     # Parse and validate location
     try:
         lat_str, lon_str = location.split(",")
@@ -27,25 +75,34 @@ def get_weather(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid location format. Expected 'lat,lon'.")
 
-    # Time bounds (UTC-aware)
-    from_time = datetime.fromtimestamp(time_from, tz=timezone.utc)
-    to_time = datetime.fromtimestamp(time_to, tz=timezone.utc)
+    # Hash the location to its grid cell, then binary search the inclusive [from, to] range
+    grid = get_forecast_grid()
+    times, columns, (grid_lat, grid_lon) = grid.query(lat, lon, time_from, time_to, interpolation)
 
-    # Filter forecast entries by time range (timestamps in JSON are Z/UTC)
-    filtered_forecast = []
-    for entry in weather_data["forecast"]:
-        entry_time = datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00"))
-        if from_time <= entry_time <= to_time:
-            filtered_forecast.append(entry)
+    # Aggregate server-side so the payload shrinks before it crosses the wire
+    if resolution is not None:
+        try:
+            how = parse_aggregation(aggregation, columns)
+            times, columns = resample(times, columns, parse_resolution(resolution), how)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    filtered_forecast = to_records(times, columns)
 
     # Echo requested location
-    return {
+    result = {
         "location": {"lat": lat, "lon": lon},
+        "grid_point": {"lat": grid_lat, "lon": grid_lon},
         "forecast": filtered_forecast,
     }
+    if grid.members:
+        result["ensemble_members"] = grid.members  # every variable is a list of member values per entry
+    return result
 
 @router.get("/weather_next_12_hours")
-def get_weather_next_12_hours(location: str = Query(..., description="Format: lat,lon")) -> Dict[str, Any]:
+def get_weather_next_12_hours(
+    location: str = Query(..., description="Format: lat,lon"),
+    interpolation: str = Query("nearest", pattern="^(nearest|bilinear)$", description="Grid lookup method"),
+) -> Dict[str, Any]:
     """Return the next twelve hours of forecast data for the requested location."""
 
     # Parse and validate location
@@ -59,16 +116,53 @@ def get_weather_next_12_hours(location: str = Query(..., description="Format: la
     from_time = datetime.now(tz=timezone.utc)
     to_time = from_time + timedelta(hours=12)
 
-    # Filter forecast entries by time range (timestamps in JSON are Z/UTC)
-    filtered_forecast = []
-    for entry in weather_data["forecast"]:
-        entry_time = datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00"))
-        if from_time <= entry_time <= to_time:
-            filtered_forecast.append(entry)
-
+    # Binary search the time range; sub-second "now" is rounded inwards
+    filtered_forecast, (grid_lat, grid_lon) = get_forecast_grid().records(
+        lat, lon, math.ceil(from_time.timestamp()), math.floor(to_time.timestamp()), interpolation
+    )
 
     # Echo requested location; or validate against file if you prefer
     return {
         "location": {"lat": lat, "lon": lon},
+        "grid_point": {"lat": grid_lat, "lon": grid_lon},
         "forecast": filtered_forecast,
-    }
\ No newline at end of file
+    }
+
+@router.post("/forecast")
+async def ingest_forecast(
+    request: Request,
+    feed: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson|csv)$",
+                                description="Feed format; taken from Content-Type when omitted"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=1_000_000, description="Records per append"),
+) -> Dict[str, Any]:
+    """
+    Stream a forecast feed into the served forecast without a restart.
+
+    The request body is parsed as it arrives and appended in batches, so the
+    feed is never held in memory. Records are validated and deduplicated by
+    timestamp, the last one winning, also over existing entries. Invalid
+    records are skipped and reported; a JSON syntax error stops the feed with
+    400, keeping the batches appended before it.
+    """
+    fmt = feed or feed_format(content_type=request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send JSON, NDJSON or CSV, or pass format=json|ndjson|csv.")
+    grid = get_forecast_grid()
+    if grid.shape != (1, 1):
+        raise HTTPException(status_code=409, detail="Only the single-location forecast accepts feeds; "
+                                                    "rebuild a grid with demo_tools.convert_forecast instead.")
+
+    ingest = ForecastIngest(fmt, append_forecast, list(grid.columns), grid.members, batch_size)
+    try:
+        # Parsing is CPU bound: keep it off the event loop, one chunk at a time
+        async for chunk in request.stream():
+            await run_in_threadpool(ingest.feed, chunk)
+        stats = await run_in_threadpool(ingest.finish)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e), **ingest.stats})
+
+    times = get_forecast_grid().times
+    stats["forecast"] = {"points": int(times.size), "from": None, "to": None}
+    if times.size:
+        stats["forecast"]["from"], stats["forecast"]["to"] = format_timestamps(times[[0, -1]])
+    return stats
@@ -0,0 +1,25 @@
+"""Prometheus scrape endpoint."""
+
+import logging
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.metrics import job_duration_collector
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def metrics(db: Session = Depends(get_db)) -> Response:
+    """Expose every metric of this process in the Prometheus text format."""
+    # Jobs run in the Celery worker; their durations are read back from the database at scrape time
+    try:
+        job_duration_collector.collect(db)
+    except Exception:
+        logger.exception("Could not fold finished Celery jobs into the job duration histograms")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
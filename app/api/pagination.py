@@ -0,0 +1,85 @@
+"""Keyset pagination and NDJSON streaming helpers shared by the listing endpoints."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Decode a cursor produced by :func:`encode_cursor` into values of ``types``, raising 400 if it is malformed.
+
+    Every value is checked before it reaches a keyset comparison: ``int`` must be
+    a JSON integer and ``datetime`` an ISO 8601 string.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [_cursor_value(value, kind) for value, kind in zip(values, types)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _cursor_value(value: Any, kind: type) -> Any:
+    if kind is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if kind is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"Cursor value {value!r} is not {kind.__name__}")
+
+
+def wants_ndjson(request: Request, format: Optional[str]) -> bool:
+    """True when the client asked for NDJSON via ``format=ndjson`` or the ``Accept`` header."""
+    if format is not None:
+        return format == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_response(db: AsyncSession, stmt, to_dict: Callable[[Any], Dict[str, Any]]) -> StreamingResponse:
+    """
+    Stream every row of ``stmt`` as one JSON document per line.
+
+    Rows are pulled from a server-side cursor in batches of ``STREAM_BATCH_SIZE``,
+    so memory stays constant however large the table is.
+    """
+    async def lines():
+        result = await db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield "".join(json.dumps(to_dict(row), default=_json_default) + "\n" for row in partition)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def page(rows: Sequence[Any], limit: int, response: Response, cursor_of: Callable[[Any], str]) -> Sequence[Any]:
+    """
+    Trim a ``limit + 1`` row fetch to one page and advertise the next cursor.
+
+    The cursor of the last returned row is sent in the ``X-Next-Cursor`` header
+    only when more rows exist, so the body keeps its plain list shape.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = cursor_of(rows[-1])
+    return rows
@@ -1,24 +1,49 @@
 """Scheduling endpoints that orchestrate tasks using weather forecasts."""
 
 # api/schedule.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 from app.models.schedule import Task
-from app.database import get_db  # you'd define get_db() returning a session
-from app.lib import wow_analysis
+from app.database import get_async_db, get_db  # you'd define get_db() returning a session
+from app.api.columnar import columnar_series, run_lengths
+from app.api.pagination import decode_cursor, encode_cursor, ndjson_response, page, wants_ndjson
+from app.criteria import (
+    DEFAULT_CONFIDENCE,
+    Criteria,
+    compile_criteria,
+    evaluate_criteria,
+    wave_height_criteria,
+    window_analysis,
+)
+from app.lib import chain_schedule_masks, topological_order
+from app.metrics import StageTimer
+from app.forecast_store import format_timestamps, to_records
+from app.resample import resample
+from app.weather_client import WeatherAPIError, WeatherClient
+from app.window_table import ACTIVE_STATUSES, parse_hours, read_window, window_table_query
 from datetime import datetime, timezone, timedelta
-import httpx
+import numpy as np
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
-def parse_hours(duration_str: str) -> int:
-    """Convert a duration string such as ``"4h"`` into an integer hour value."""
-    # expects like "4h"
-    if not duration_str.endswith("h"):
-        raise ValueError("duration must be like '4h'")
-    return int(duration_str[:-1])
+HOUR_SECONDS = 3600
+CONFIDENCE_DESCRIPTION = (
+    "Required probability (share of ensemble members) for go hours and window starts; "
+    f"defaults to {DEFAULT_CONFIDENCE} when the forecast is an ensemble"
+)
+
+# Per-stage latency histograms (db, weather, resample, analysis, serialize), exported on /metrics
+WINDOW_STAGES = StageTimer("window")
+WINDOWS_STAGES = StageTimer("windows")
+PLAN_STAGES = StageTimer("plan")
+
+def get_weather_client(request: Request) -> WeatherClient:
+    """FastAPI dependency returning the app-lifetime weather client created at startup."""
+    return request.app.state.weather_client
 
 def unix_seconds(dt: datetime) -> int:
     """Convert a timezone-aware datetime into Unix seconds."""
@@ -28,137 +53,475 @@ def iso_utc(dt: datetime) -> str:
     """Serialise a datetime to an ISO 8601 UTC string without fractional seconds."""
     return dt.replace(microsecond=0).astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
 
+def task_limits(task: Task) -> Tuple[int, float]:
+    """Return ``(duration_hours, wave_height_limit)`` of a task, raising 400 on malformed fields."""
+    try:
+        task_hours = parse_hours(task.duration)          # e.g. "4h" -> 4
+        if task_hours < 1:
+            raise ValueError("duration must be at least 1h")
+        return task_hours, float(task.wave_height_limit)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid task fields: {e}")
+
+def task_criteria(task: Task, wave_height_limit: float) -> Criteria:
+    """Return the compiled operability criteria of a task (default: its wave height limit), raising 400 if invalid."""
+    if task.criteria is None:
+        return wave_height_criteria(wave_height_limit)
+    try:
+        return compile_criteria(task.criteria)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid criteria of task {task.id}: {e}")
+
+def task_definition(task: Task) -> Tuple[int, float, Criteria]:
+    """
+    Return ``(duration_hours, wave_height_limit, criteria)`` of a task, raising ValueError on malformed fields.
+
+    The batch endpoints report such a task on its own entry and analyse the others.
+    """
+    try:
+        task_hours = parse_hours(task.duration)
+        if task_hours < 1:
+            raise ValueError("duration must be at least 1h")
+        wave_height_limit = float(task.wave_height_limit)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid task fields: {e}")
+    if task.criteria is None:
+        return task_hours, wave_height_limit, wave_height_criteria(wave_height_limit)
+    try:
+        return task_hours, wave_height_limit, compile_criteria(task.criteria)
+    except ValueError as e:
+        raise ValueError(f"Invalid criteria: {e}")
+
+async def hourly_forecast(
+    weather: WeatherClient, lat: float, lon: float, now_utc: datetime, end_utc: datetime, stages: StageTimer
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Fetch the (cached) forecast for ``[now, end]`` and average it into hourly buckets."""
+    # Cached per location and hour; concurrent requests share one upstream call
+    try:
+        with stages("weather"):
+            forecast = await weather.forecast(lat, lon, now_utc)
+    except WeatherAPIError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"Weather API error: {e.detail}")
+
+    # Resample to 1h spacing by averaging all points within each hour bucket;
+    # hours without any points are skipped (keeps result truly based on available data)
+    with stages("resample"):
+        times, columns = forecast.query(unix_seconds(now_utc), unix_seconds(end_utc))
+        return resample(times, columns, HOUR_SECONDS, how="mean")
+
+def start_windows(hour_times: np.ndarray, start_indices, task_hours: int) -> List[Dict[str, Any]]:
+    """Prepare start windows with start + duration for the given hourly start indices."""
+    starts = hour_times[np.asarray(start_indices, dtype=np.int64)]
+    return [
+        {"start": start, "end": end, "duration_hours": task_hours}
+        for start, end in zip(format_timestamps(starts), format_timestamps(starts + task_hours * HOUR_SECONDS))
+    ]
+
+def columnar_windows(hour_times: np.ndarray, go_no_go, start_indices, task_hours: int) -> Dict[str, Any]:
+    """Columnar ``analysis``: run-length encoded go/no-go and the start epochs of the windows."""
+    return {
+        "go_no_go": run_lengths(go_no_go),   # aligned with the hourly_forecast axis
+        "start_windows": {
+            "start": hour_times[np.asarray(start_indices, dtype=np.int64)],
+            "duration_hours": task_hours,
+        },
+    }
+
+def ensemble_members(hourly: Dict[str, np.ndarray]) -> int:
+    """Number of ensemble members in a forecast; 0 when it is deterministic."""
+    wave_height = hourly["wave_height"]
+    return wave_height.shape[0] if wave_height.ndim > 1 else 0
+
+def ensemble_mean(hourly: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Collapse ``(members, n)`` ensemble columns to their mean, for the hourly_forecast in responses."""
+    return {name: values.mean(axis=0) if values.ndim > 1 else values for name, values in hourly.items()}
+
+def confident_exceedance(go: np.ndarray, exceedance: np.ndarray, confidence: float) -> np.ndarray:
+    """
+    Per-task exceedances for chain planning, ``(k, n)``.
+
+    On an ensemble (``(k, members, n)`` masks) an hour counts as exceeded when
+    P(go) stays below ``confidence`` and at least one member has data for it.
+    """
+    if go.ndim == 2:
+        return exceedance
+    p_go = np.count_nonzero(go, axis=1) / go.shape[1]
+    return (p_go < confidence) & np.any(go | exceedance, axis=1)
+
+NO_FORECAST_NOTE = "No forecast points returned in the requested window."
+
 @router.get("/window") # Async due to "Call to external API (weather forecast)
 async def schedule_window(
     schedule_id: int = Query(..., description="ID of the task/schedule"),
     lat: float = Query(61.5),
     lon: float = Query(4.8),
     lookahead_hours: int = Query(12, ge=1, le=168, description="Forecast horizon in hours (default 12)"),
-    db: Session = Depends(get_db),
-) -> Dict[str, Any]:
-    """Calculate start windows for the schedule based on forecasted wave conditions."""
+    output: str = Query("records", alias="format", pattern="^(records|columnar)$",
+                        description="records (per-hour objects) or columnar (parallel arrays on an epoch axis)"),
+    confidence: Optional[float] = Query(None, gt=0, le=1, description=CONFIDENCE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    weather: WeatherClient = Depends(get_weather_client),
+) -> ORJSONResponse:
+    """
+    Calculate start windows for the schedule based on forecasted wave conditions.
 
-    # Fetch task
-    task = db.get(Task, schedule_id)
-    if task is None:
-        raise HTTPException(status_code=404, detail=f"Task {schedule_id} not found")
+    For an ensemble forecast (or when ``confidence`` is given) every member is
+    analysed in one pass. The analysis then carries P(go) per hour and
+    P(window) per start, go/no-go and start windows are those reaching the
+    confidence, and hourly_forecast holds the ensemble mean.
 
-    try:
-        task_hours = parse_hours(task.duration)          # e.g. "4h" -> 4
-        wave_height_limit = float(task.wave_height_limit)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid task fields: {e}")
+    Results the prefetcher materialized for the current forecast are served
+    from the window table (``X-Window-Source: materialized``); anything else
+    is computed live.
+    """
+
+    # Fetch task, with its precomputed windows at this location if the prefetcher has any
+    with WINDOW_STAGES("db"):
+        row = (await db.execute(window_table_query(schedule_id, lat, lon))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Task {schedule_id} not found")
+    task, window, snapshot = row
+    task_hours, wave_height_limit = task_limits(task)
 
     now_utc = datetime.now(tz=timezone.utc)
     end_utc = now_utc + timedelta(hours=lookahead_hours)
+    served = None
+    if confidence is None:
+        served = read_window(task, window, snapshot, task_hours, unix_seconds(now_utc), unix_seconds(end_utc))
+    if served is not None:
+        return window_response(schedule_id, task, wave_height_limit, lat, lon, task_hours, output, "materialized",
+                               **served)
 
-    params = {
-        "location": f"{lat},{lon}",
-        "from": unix_seconds(now_utc),
-        "time_to": unix_seconds(end_utc),
-    }
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.get("http://localhost:8020/weather-service/weather", params=params) # Pretending that this is external
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=f"Weather API error: {resp.text}")
-
-    data = resp.json()
-    raw = data.get("forecast", [])
-    if not raw:
-        return {
+    hour_times, hourly = await hourly_forecast(weather, lat, lon, now_utc, end_utc, WINDOW_STAGES)
+    if hour_times.size == 0:
+        result = {
             "schedule_id": schedule_id,
-            "task": {"duration": task.duration, "wave_height_limit": wave_height_limit},
+            "task": {"duration": task.duration, "wave_height_limit": wave_height_limit, "criteria": task.criteria},
             "location": {"lat": lat, "lon": lon},
             "hourly_forecast": [],
             "analysis": {"go_no_go": [], "start_windows": []},
-            "note": "No forecast points returned in the requested window.",
+            "note": NO_FORECAST_NOTE,
+        }
+        if output == "columnar":
+            result.update(format="columnar",
+                          hourly_forecast=columnar_series(hour_times, ensemble_mean(hourly), HOUR_SECONDS),
+                          analysis=columnar_windows(hour_times, [], [], task_hours))
+        return ORJSONResponse(result)
+
+    # WOW analysis of the task criteria over all hourly forecast variables (every ensemble member at once)
+    criteria = task_criteria(task, wave_height_limit)
+    members = ensemble_members(hourly)
+    probabilistic = members > 0 or confidence is not None
+    threshold = DEFAULT_CONFIDENCE if confidence is None else confidence
+    with WINDOW_STAGES("analysis"):
+        go, starts, p_go, p_window = window_analysis(hourly, [criteria], [task_hours], probabilistic, threshold)
+        if probabilistic:
+            p_go, p_window = p_go[0], p_window[0]
+    return window_response(schedule_id, task, wave_height_limit, lat, lon, task_hours, output, "live",
+                           hour_times, ensemble_mean(hourly), go[0], starts[0], p_go, p_window, members, threshold)
+
+def window_response(schedule_id: int, task: Task, wave_height_limit: float, lat: float, lon: float,
+                    task_hours: int, output: str, source: str, hour_times: np.ndarray, hourly: Dict[str, np.ndarray],
+                    go_no_go: np.ndarray, start_indices: np.ndarray, p_go: Optional[np.ndarray],
+                    p_window: Optional[np.ndarray], members: int, confidence: float = DEFAULT_CONFIDENCE
+                    ) -> ORJSONResponse:
+    """Serialise a /window analysis, computed live or read from the window table, in the requested format."""
+    # to_records and the JSON encoding are the serialisation cost
+    with WINDOW_STAGES("serialize"):
+        result = {
+            "schedule_id": schedule_id,
+            "task": {
+                "name": getattr(task, "name", None),
+                "duration": task.duration,
+                "wave_height_limit": wave_height_limit,
+                "criteria": task.criteria,
+            },
+            "location": {"lat": lat, "lon": lon},
         }
+        if members:
+            result["ensemble_members"] = members
+        if output == "columnar":
+            # Parallel numpy arrays on an epoch axis, encoded by orjson without per-hour dicts
+            result["format"] = "columnar"
+            result["hourly_forecast"] = columnar_series(hour_times, hourly, HOUR_SECONDS)
+            result["analysis"] = columnar_windows(hour_times, go_no_go, start_indices, task_hours)
+        else:
+            result["hourly_forecast"] = to_records(hour_times, hourly)
+            result["analysis"] = {
+                "go_no_go": go_no_go.tolist(),   # aligned with hourly_forecast
+                "start_windows": start_windows(hour_times, start_indices, task_hours),
+            }
+        if p_go is not None:
+            # Both aligned with hourly_forecast; orjson encodes the arrays directly
+            result["analysis"].update(confidence=confidence, p_go=p_go, p_window=p_window)
+        return ORJSONResponse(result, headers={"X-Window-Source": source})
+
+
+@router.get("/windows")
+async def schedule_windows(
+    task_ids: Optional[List[int]] = Query(None, alias="task_id", description="Task IDs; repeat the parameter"),
+    status: Optional[List[str]] = Query(None, description="Status filter used when no task IDs are given"),
+    lat: float = Query(61.5),
+    lon: float = Query(4.8),
+    lookahead_hours: int = Query(12, ge=1, le=168, description="Forecast horizon in hours (default 12)"),
+    confidence: Optional[float] = Query(None, gt=0, le=1, description=CONFIDENCE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    weather: WeatherClient = Depends(get_weather_client),
+) -> JSONResponse:
+    """Calculate start windows for many tasks at one location with a single forecast fetch."""
+
+    # Load every requested task in one query (default: the tasks a planner can still schedule)
+    stmt = select(Task).order_by(Task.id)
+    if task_ids:
+        stmt = stmt.where(Task.id.in_(task_ids))
+    else:
+        stmt = stmt.where(Task.status.in_(status or ACTIVE_STATUSES))
+    with WINDOWS_STAGES("db"):
+        tasks = (await db.execute(stmt)).scalars().all()
+    missing = sorted(set(task_ids or ()) - {t.id for t in tasks})
 
-    #Resample to 1h spacing by averaging all points within each hour bucket
-    buckets = {}
-    for p in raw:
-        t = datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00"))
-        hour_bucket = t.replace(minute=0, second=0, microsecond=0, tzinfo=timezone.utc)
-
-        if hour_bucket not in buckets:
-            buckets[hour_bucket] = {"wind_speed": 0.0, "wave_height": 0.0, "wave_period": 0.0, "n": 0}
-
-        b = buckets[hour_bucket]
-        b["wind_speed"] += float(p["wind_speed"])
-        b["wave_height"] += float(p["wave_height"])
-        b["wave_period"] += float(p["wave_period"])
-        b["n"] += 1
-
-    # Ensure continuous hourly timeline from the first to last available bucket within [now, end]
-    timeline = []
-    cur_time = now_utc.replace(minute=0, second=0, microsecond=0)
-    end_aligned = end_utc.replace(minute=0, second=0, microsecond=0)
-    while cur_time <= end_aligned:
-        if cur_time in buckets and buckets[cur_time]["n"] > 0:
-            n = buckets[cur_time]["n"]
-            timeline.append({
-                "timestamp": iso_utc(cur_time),
-                "wind_speed": buckets[cur_time]["wind_speed"] / n,
-                "wave_height": buckets[cur_time]["wave_height"] / n,
-                "wave_period": buckets[cur_time]["wave_period"] / n
-            })
-        # if an hour has no points, we skip it (keeps result truly based on available data)
-        cur_time += timedelta(hours=1)
-
-    if not timeline:
-        raise HTTPException(
-            status_code=502,
-            detail="Insufficient hourly resolution/continuity from external weather source.",
+    # A task with malformed fields gets an error entry; the rest are still analysed
+    definitions, errors = [], {}
+    for t in tasks:
+        try:
+            definitions.append(task_definition(t))
+        except ValueError as e:
+            errors[t.id] = str(e)
+    valid = [t for t in tasks if t.id not in errors]
+
+    now_utc = datetime.now(tz=timezone.utc)
+    end_utc = now_utc + timedelta(hours=lookahead_hours)
+    hour_times, hourly = await hourly_forecast(weather, lat, lon, now_utc, end_utc, WINDOWS_STAGES)
+
+    # One batched WOW pass over all tasks' criteria, and over every ensemble member
+    members = ensemble_members(hourly)
+    probabilistic = members > 0 or confidence is not None
+    threshold = DEFAULT_CONFIDENCE if confidence is None else confidence
+    with WINDOWS_STAGES("analysis"):
+        go_no_go, start_indices, p_go, p_window = window_analysis(
+            hourly, [c for _, _, c in definitions], [h for h, _, _ in definitions], probabilistic, threshold
         )
+    hourly = ensemble_mean(hourly)
+    position = {t.id: k for k, t in enumerate(valid)}
 
-    # WOW analysis over hourly wave height series
-    wave_series = [p["wave_height"] for p in timeline]
-    go_no_go, start_indices = wow_analysis(wave_series, task_hours, wave_height_limit)
-
-    # Prepare start windows with start + duration
-    start_windows = []
-    for idx in start_indices:
-        start_ts = datetime.fromisoformat(timeline[idx]["timestamp"].replace("Z", "+00:00"))
-        end_ts = start_ts + timedelta(hours=task_hours)
-        start_windows.append({
-            "start": iso_utc(start_ts),
-            "end": iso_utc(end_ts),
-            "duration_hours": task_hours,
+    with WINDOWS_STAGES("serialize"):
+        windows = []
+        for task in tasks:
+            entry = {
+                "schedule_id": task.id,
+                "task": {
+                    "name": task.name,
+                    "duration": task.duration,
+                    "status": task.status,
+                    "wave_height_limit": task.wave_height_limit,
+                    "criteria": task.criteria,
+                },
+            }
+            windows.append(entry)
+            if task.id in errors:
+                entry["error"] = errors[task.id]
+                continue
+            k = position[task.id]
+            task_hours, wave_height_limit, _ = definitions[k]
+            entry["task"]["wave_height_limit"] = wave_height_limit
+            entry["analysis"] = {
+                "go_no_go": go_no_go[k].tolist(),   # aligned with hourly_forecast
+                "start_windows": start_windows(hour_times, start_indices[k], task_hours),
+            }
+            if probabilistic:
+                entry["analysis"].update(confidence=threshold, p_go=p_go[k].tolist(), p_window=p_window[k].tolist())
+
+        result = {
+            "location": {"lat": lat, "lon": lon},
+            "hourly_forecast": to_records(hour_times, hourly),
+            "windows": windows,
+            "missing_task_ids": missing,
+        }
+        if members:
+            result["ensemble_members"] = members
+        if hour_times.size == 0:
+            result["note"] = NO_FORECAST_NOTE
+        return JSONResponse(result)
+
+
+
+@router.get("/plan")
+async def schedule_plan(
+    lat: float = Query(61.5),
+    lon: float = Query(4.8),
+    lookahead_hours: int = Query(48, ge=1, le=168, description="Forecast horizon in hours (default 48)"),
+    confidence: Optional[float] = Query(None, gt=0, le=1, description=CONFIDENCE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    weather: WeatherClient = Depends(get_weather_client),
+) -> JSONResponse:
+    """
+    Plan the earliest weather-feasible start of every open task, respecting predecessor order.
+
+    On an ensemble forecast a task may only be worked in hours whose P(go)
+    reaches ``confidence``.
+    """
+
+    with PLAN_STAGES("db"):
+        tasks = (await db.execute(select(Task).order_by(Task.id))).scalars().all()
+    by_id = {t.id: t for t in tasks}
+
+    now_utc = datetime.now(tz=timezone.utc)
+    end_utc = now_utc + timedelta(hours=lookahead_hours)
+    hour_times, hourly = await hourly_forecast(weather, lat, lon, now_utc, end_utc, PLAN_STAGES)
+
+    # COMPLETED tasks are done; a STARTED task is assumed to run its full duration from now,
+    # so its successors may not start before it ends. Everything else gets scheduled.
+    open_tasks = [t for t in tasks if t.status not in ("COMPLETED", "STARTED")]
+    position = {t.id: k for k, t in enumerate(open_tasks)}
+    # A task with malformed fields is reported and never placed, so its successors stay blocked
+    errors: Dict[int, str] = {}
+    durations, valid, criteria = [], [], []
+    for k, t in enumerate(open_tasks):
+        try:
+            task_hours, _, task_rule = task_definition(t)
+        except ValueError as e:
+            errors[t.id] = str(e)
+            durations.append(1)
+            continue
+        durations.append(task_hours)
+        valid.append(k)
+        criteria.append(task_rule)
+    predecessors, earliest = [], []
+    for t in open_tasks:
+        pred = by_id.get(t.predecessor)
+        predecessors.append(position.get(t.predecessor))
+        earliest.append(0)
+        if pred is not None and pred.status == "STARTED":
+            try:
+                earliest[-1] = task_definition(pred)[0]
+            except ValueError as e:
+                # Unknown end of the running predecessor: its successor cannot be planned
+                errors[pred.id] = str(e)
+                earliest[-1] = hour_times.size + 1
+
+    index = {t.id: k for k, t in enumerate(tasks)}
+    try:
+        order = topological_order([index.get(t.predecessor) for t in tasks])
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=f"Invalid task graph: {e}")
+    threshold = DEFAULT_CONFIDENCE if confidence is None else confidence
+    with PLAN_STAGES("analysis"):
+        go, exceedance = evaluate_criteria(criteria, hourly)
+        blocked = np.ones((len(open_tasks), hour_times.size), dtype=bool)
+        blocked[valid] = confident_exceedance(go, exceedance, threshold)
+        starts, _ = chain_schedule_masks(blocked, durations, predecessors, earliest)
+
+    # Group tasks by the root of their predecessor chain, in dependency order
+    chains: Dict[int, List[Dict[str, Any]]] = {}
+    root_of: Dict[int, int] = {}
+    for k in order:
+        t = tasks[k]
+        root_of[t.id] = root_of[t.predecessor] if t.predecessor in by_id else t.id
+        entry = {"id": t.id, "name": t.name, "status": t.status, "predecessor": t.predecessor,
+                 "duration": t.duration, "wave_height_limit": t.wave_height_limit, "criteria": t.criteria,
+                 "start": None, "end": None, "feasible": t.status in ("COMPLETED", "STARTED")}
+        if t.id in errors:
+            entry["error"] = errors[t.id]
+        if t.id in position and starts[position[t.id]] >= 0:
+            start_ts = int(hour_times[starts[position[t.id]]])
+            entry["start"], entry["end"] = format_timestamps(
+                [start_ts, start_ts + durations[position[t.id]] * HOUR_SECONDS]
+            )
+            entry["feasible"] = True
+        chains.setdefault(root_of[t.id], []).append(entry)
+
+    with PLAN_STAGES("serialize"):
+        return JSONResponse({
+            "location": {"lat": lat, "lon": lon},
+            "horizon": {"start": iso_utc(now_utc), "end": iso_utc(end_utc)},
+            "chains": [{"root_id": root_id, "tasks": entries} for root_id, entries in chains.items()],
         })
 
-    return {
-        "schedule_id": schedule_id,
-        "task": {
-            "name": getattr(task, "name", None),
-            "duration": task.duration,
-            "wave_height_limit": wave_height_limit,
-        },
-        "location": {"lat": lat, "lon": lon},
-        "hourly_forecast": timeline,
-        "analysis": {
-            "go_no_go": go_no_go,   # aligned with hourly_forecast
-            "start_windows": start_windows,
-        },
-    }
 
+@router.get("/forecast-cache")
+def forecast_cache_stats(weather: WeatherClient = Depends(get_weather_client)) -> Dict[str, Any]:
+    """Return hit/miss counters of the forecast cache used by the window endpoints."""
+    return weather.cache.stats()
 
 
+TASK_COLUMNS = (Task.id, Task.name, Task.duration, Task.predecessor, Task.status, Task.wave_height_limit,
+                Task.criteria)
+
 @router.get("/tasks")
-def get_all_tasks(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Return all tasks stored in the scheduling table."""
-    tasks = db.execute(select(Task)).scalars().all()
-    return [
-        {
-            "id": t.id,
-            "name": t.name,
-            "duration": t.duration,
-            "predecessor": t.predecessor,
-            "status": t.status,
-            "wave_height_limit": t.wave_height_limit,
-        }
-        for t in tasks
-    ]
+async def get_all_tasks(
+    request: Request,
+    response: Response,
+    status: Optional[List[str]] = Query(None, description="Only return tasks with these statuses"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(500, ge=1, le=5000, description="Page size"),
+    output: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$",
+                                  description="ndjson streams every matching row instead of one page"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[Dict[str, Any]]:
+    """Return tasks stored in the scheduling table, one keyset page at a time (or streamed as NDJSON)."""
+    # Column-only projection: rows are never hydrated into ORM objects
+    stmt = select(*TASK_COLUMNS).order_by(Task.id)
+    if status:
+        stmt = stmt.where(Task.status.in_(status))
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, int)
+        stmt = stmt.where(Task.id > after_id)
+
+    if wants_ndjson(request, output):
+        return ndjson_response(db, stmt, lambda row: row._asdict())
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    return [row._asdict() for row in page(rows, limit, response, lambda row: encode_cursor(row.id))]
+
+# Allowed source statuses of every bulk transition
+TASK_TRANSITIONS = {"STARTED": ("READY",), "COMPLETED": ("READY", "STARTED")}
+
+@router.put("/tasks/status") # PUT since we are modifying underlying database
+def transition_tasks(
+    task_ids: List[int] = Body(..., min_length=1, max_length=10000, description="Tasks to move"),
+    status: str = Body(..., pattern="^(STARTED|COMPLETED)$", description="Target status"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Move many tasks to ``status`` in one statement, unblocking their successors in the same transaction.
+
+    STARTED is allowed from READY, COMPLETED from READY or STARTED; other tasks
+    are left alone and reported under ``rejected`` with their current status
+    (None when they do not exist). Completing a task moves its BLOCKED
+    successors to READY.
+    """
+    ids = sorted(set(task_ids))
+    if db.get_bind().dialect.name == "postgresql":
+        # The UPDATEs below already move every task once: under READ COMMITTED a row another call changed
+        # is re-checked against their WHERE clause. But they lock rows in scan order, targets first and
+        # successors second, so two overlapping calls can each hold a row the other waits for and deadlock.
+        # Locking the targets and their successors up front in id order makes overlapping calls queue up.
+        # SQLite takes its single write lock on the first UPDATE instead.
+        db.execute(
+            select(Task.id).where(or_(Task.id.in_(ids), Task.predecessor.in_(ids))).order_by(Task.id).with_for_update()
+        )
+
+    # Check-and-set per row: a task another call already moved no longer matches the WHERE clause
+    updated = db.execute(
+        update(Task).where(Task.id.in_(ids), Task.status.in_(TASK_TRANSITIONS[status])).values(status=status)
+        .returning(*TASK_COLUMNS).execution_options(synchronize_session=False)
+    ).all()
+    unblocked = []
+    if status == "COMPLETED" and updated:
+        unblocked = db.execute(
+            update(Task).where(Task.predecessor.in_([row.id for row in updated]), Task.status == "BLOCKED")
+            .values(status="READY").returning(*TASK_COLUMNS).execution_options(synchronize_session=False)
+        ).all()
+    done = {row.id for row in updated}
+    current = dict(db.execute(select(Task.id, Task.status).where(Task.id.in_([i for i in ids if i not in done]))).all())
+    db.commit()
+
+    return {
+        "status": status,
+        "updated": sorted((row._asdict() for row in updated), key=lambda t: t["id"]),
+        "unblocked": sorted((row._asdict() for row in unblocked), key=lambda t: t["id"]),
+        "rejected": [{"id": i, "status": current.get(i)} for i in ids if i not in done],
+    }
 
 @router.put("/task/{task_id}/complete") # PUT since we are modifying underlying database
 def mark_task_complete(task_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
@@ -207,4 +570,40 @@ def mark_task_started(task_id: int, db: Session = Depends(get_db)) -> Dict[str,
             "predecessor": task.predecessor,
             "wave_height_limit": task.wave_height_limit,
         },
-    }
\ No newline at end of file
+    }
+
+
+@router.put("/task/{task_id}/criteria") # PUT since we are modifying underlying database
+def set_task_criteria(
+    task_id: int,
+    criteria: Optional[Union[str, Dict[str, Any], List[Any]]] = Body(
+        None, embed=True,
+        description="Expression such as 'wave_height <= 2.5 and wind_speed < 12', a limit table, "
+                    "a list of both, or null to fall back to wave_height_limit",
+    ),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Replace the operability criteria of a task, validating them before they are stored."""
+    task = db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    if criteria is not None:
+        try:
+            compile_criteria(criteria)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid criteria: {e}")
+
+    task.criteria = criteria
+    db.commit()
+    db.refresh(task)
+
+    return {
+        "message": f"Criteria of task {task_id} updated",
+        "task": {
+            "id": task.id,
+            "name": task.name,
+            "status": task.status,
+            "wave_height_limit": task.wave_height_limit,
+            "criteria": task.criteria,
+        },
+    }
@@ -3,6 +3,7 @@ import os
 
 BROKER  = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+PREFETCH_INTERVAL_SECONDS = float(os.getenv("PREFETCH_INTERVAL_SECONDS", "300"))  # 0 turns the prefetcher off
 
 # Celery app using docker
 celery_app = Celery(
@@ -14,4 +15,13 @@ celery_app = Celery(
 #Import submodules
 celery_app.autodiscover_tasks(["app"],related_name="celery_tasks")
 
-
+# celery beat: keep the materialized window table in step with the forecast
+if PREFETCH_INTERVAL_SECONDS > 0:
+    celery_app.conf.beat_schedule = {
+        "refresh-window-table": {
+            "task": "prefetch_windows.refresh_window_table",
+            "schedule": PREFETCH_INTERVAL_SECONDS,
+            # A run still queued when the next one is due is dropped rather than piling up
+            "options": {"expires": PREFETCH_INTERVAL_SECONDS},
+        },
+    }
@@ -1 +1 @@
-from . import complicated_ananlysis
\ No newline at end of file
+from . import complicated_ananlysis, prefetch_windows
@@ -1,8 +1,11 @@
 from celery import shared_task
+from datetime import datetime
 from app.database import SessionLocal
 from app.models.celery_job import CeleryJob
-import time
-import json
+from app.sea_state import run_simulation
+from app.job_events import publish_job_event
+
+PROGRESS_STEP = 5  # only write progress to the database every 5 percent
 
 @shared_task(name="complicated_analysis.run_analysis")
 def run_analysis(job_id: int, params: dict):
@@ -13,16 +16,26 @@ def run_analysis(job_id: int, params: dict):
         return
 
     job.status = "RUNNING"
+    job.progress = 0
+    job.started_at = datetime.utcnow()
     db.commit()
+    publish_job_event(job)
+
+    def report_progress(percent: int):
+        if percent >= job.progress + PROGRESS_STEP or percent == 100:
+            job.progress = percent
+            db.commit()
+            publish_job_event(job)
 
     try:
-        # Heavy analysis placeholder
-        time.sleep(10)
+        # JONSWAP irregular sea-state simulation, chunked over a process pool
+        statistics = run_simulation(params, progress=report_progress)
 
-        result = {"ok": True, "details": params}
+        result = {"ok": True, "details": params, "statistics": statistics}
 
         job.status = "SUCCEEDED"
-        job.result = json.dumps(result)
+        job.progress = 100
+        job.result = result
 
     except Exception as e:
         job.status = "FAILED"
@@ -30,6 +43,7 @@ def run_analysis(job_id: int, params: dict):
 
     finally:
         db.commit()
+        publish_job_event(job)
         db.close()
 
     return True
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from celery import shared_task
+from sqlalchemy import select
+
+from app.criteria import compile_criteria, wave_height_criteria
+from app.database import SessionLocal
+from app.forecast_store import ForecastStore
+from app.models.schedule import Task
+from app.weather_client import WeatherClient
+from app.window_table import (
+    ACTIVE_STATUSES, PREFETCH_LOCATIONS, TaskDefinition, parse_hours, parse_locations, refresh_windows,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def task_definitions(tasks: Sequence[Task]) -> List[TaskDefinition]:
+    """``(task, duration_hours, criteria)`` of every task whose fields parse; the others are logged and skipped."""
+    definitions = []
+    for task in tasks:
+        try:
+            hours = parse_hours(task.duration)
+            if hours < 1:
+                raise ValueError("duration must be at least 1h")
+            if task.criteria is None:
+                criteria = wave_height_criteria(task.wave_height_limit)
+            else:
+                criteria = compile_criteria(task.criteria)
+        except Exception as e:
+            logger.warning("Not materializing windows of task %s: %s", task.id, e)
+            continue
+        definitions.append((task, hours, criteria))
+    return definitions
+
+
+async def fetch_forecasts(locations: Sequence[Tuple[float, float]], now: datetime) -> List[object]:
+    """Fetch every location concurrently; a failed location yields its exception instead of a forecast."""
+    client = WeatherClient.create()
+    try:
+        return await asyncio.gather(
+            *(client.forecast(lat, lon, now) for lat, lon in locations), return_exceptions=True
+        )
+    finally:
+        await client.aclose()
+
+
+@shared_task(name="prefetch_windows.refresh_window_table")
+def refresh_window_table(locations: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Periodic (celery beat) refresh of the materialized window table for the prefetch locations."""
+    now = datetime.now(tz=timezone.utc)
+    targets = parse_locations(locations or PREFETCH_LOCATIONS)
+    forecasts = asyncio.run(fetch_forecasts(targets, now))
+
+    db = SessionLocal()
+    try:
+        tasks = db.execute(select(Task).where(Task.status.in_(ACTIVE_STATUSES)).order_by(Task.id)).scalars().all()
+        definitions = task_definitions(tasks)
+        summary = {}
+        for (lat, lon), forecast in zip(targets, forecasts):
+            if not isinstance(forecast, ForecastStore):
+                logger.warning("Forecast for %s,%s unavailable: %s", lat, lon, forecast)
+                continue
+            horizon = WeatherClient.horizon(WeatherClient.cache_key(lat, lon, now))
+            summary[f"{lat},{lon}"] = stats = refresh_windows(db, lat, lon, forecast, horizon, definitions)
+            logger.info("Window table at %s,%s: %s", lat, lon, stats)
+        return summary
+    finally:
+        db.close()
@@ -0,0 +1,299 @@
+"""Operability criteria of tasks, compiled once into vectorized evaluators over forecast columns."""
+
+import ast
+import json
+from functools import lru_cache, reduce
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.forecast_store import VARIABLES
+from app.lib import window_probabilities, window_start_mask
+
+Columns = Mapping[str, np.ndarray]
+Evaluator = Callable[[Columns], np.ndarray]
+
+_COMPARISONS = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal}
+_ARITHMETIC = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+               ast.Pow: np.power}
+_FUNCTIONS = {"abs": (np.abs, 1), "sqrt": (np.sqrt, 1), "min": (np.minimum, 2), "max": (np.maximum, 2)}
+_INTERPOLATIONS = ("linear", "step")
+
+# Longer expressions are rejected before parsing; nesting depth, and so the recursion of parsing, compiling
+# and evaluating, is bounded by the length
+MAX_EXPRESSION_LENGTH = 256
+DEFAULT_CONFIDENCE = 0.9  # share of ensemble members that must agree on a go / a feasible window
+
+
+class Criteria:
+    """
+    A compiled operability rule: at which forecast points a task may be worked.
+
+    Criteria come from a task's ``criteria`` document, which is one of
+      - an expression over the forecast variables, e.g.
+        ``"wave_height <= 2.5 and wind_speed < 12"`` (comparisons, ``and``/``or``/``not``,
+        arithmetic and ``abs``/``sqrt``/``min``/``max``);
+      - a limit table, a limit on one variable interpolated from another, e.g.
+        ``{"variable": "wave_height", "by": "wave_period", "points": [[6, 2.5], [10, 2.0]]}``
+        (``"interpolation": "step"`` holds each limit until the next breakpoint);
+      - a list of the above, all of which must hold.
+
+    Expressions are parsed with :mod:`ast` and only the constructs above are
+    accepted; nothing is ever passed to ``eval``.
+    """
+
+    __slots__ = ("source", "variables", "threshold", "_evaluate")
+
+    def __init__(self, source: Any, variables: Sequence[str], evaluate: Evaluator,
+                 threshold: Optional[Tuple[str, Callable, float]] = None):
+        self.source = source
+        self.variables = tuple(sorted(set(variables)))
+        # (variable, comparison, limit) for single comparisons, which are evaluated in batches
+        self.threshold = threshold
+        self._evaluate = evaluate
+
+    def __repr__(self) -> str:
+        return f"Criteria({self.source!r})"
+
+    def evaluate(self, columns: Columns) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the criteria on every forecast point.
+
+        Returns:
+            tuple: (go, exceedance), boolean arrays shaped like the columns
+                - go: True where all criteria hold
+                - exceedance: True where a criterion fails; points where any variable
+                  used is NaN are neither, as in :func:`app.lib.wow_analysis_batch`
+        """
+        known = _known(columns, self.variables)
+        ok = np.asarray(self._evaluate(columns), dtype=bool)
+        return ok & known, ~ok & known
+
+
+def _known(columns: Columns, variables: Sequence[str]) -> np.ndarray:
+    return reduce(np.logical_and, (np.isfinite(columns[name]) for name in variables))
+
+
+def _compile_expression(text: str) -> Criteria:
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Criteria expression is longer than {MAX_EXPRESSION_LENGTH} characters; "
+                         "split it into a list of criteria")
+    variables: List[str] = []
+    try:
+        tree = ast.parse(text, mode="eval")
+        evaluate, is_condition = _compile_node(tree.body, variables)
+    except SyntaxError as e:
+        raise ValueError(f"Invalid criteria expression '{text}': {e.msg}")
+    except (RecursionError, MemoryError):
+        raise ValueError(f"Criteria expression '{text}' is nested too deeply")
+    if not is_condition:
+        raise ValueError(f"Criteria expression '{text}' must be a comparison")
+    if not variables:
+        raise ValueError(f"Criteria expression '{text}' does not use any forecast variable")
+
+    threshold = None
+    body = tree.body
+    if isinstance(body, ast.Compare) and len(body.ops) == 1:
+        left, right = body.left, body.comparators[0]
+        if isinstance(left, ast.Name) and _is_number(right):
+            threshold = (left.id, _COMPARISONS[type(body.ops[0])], float(right.value))
+    return Criteria(text, variables, evaluate, threshold)
+
+
+def _is_number(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and type(node.value) in (int, float)
+
+
+def _compile_node(node: ast.AST, variables: List[str]) -> Tuple[Evaluator, bool]:
+    """Compile one expression node into ``(evaluator, is_condition)``."""
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_condition(value, variables) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return (lambda columns: reduce(combine, (part(columns) for part in parts))), True
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_condition(node.operand, variables)
+        return (lambda columns: np.logical_not(operand(columns))), True
+
+    if isinstance(node, ast.Compare):
+        if not all(type(op) in _COMPARISONS for op in node.ops):
+            raise ValueError("Only <, <=, > and >= comparisons are allowed")
+        # Chained comparisons (1 <= wave_period < 12) hold when every link holds
+        operands = [_compile_value(value, variables) for value in [node.left, *node.comparators]]
+        links = [(_COMPARISONS[type(op)], operands[k], operands[k + 1]) for k, op in enumerate(node.ops)]
+        return (lambda columns: reduce(np.logical_and, (cmp(a(columns), b(columns)) for cmp, a, b in links))), True
+
+    return _compile_value(node, variables), False
+
+
+def _compile_condition(node: ast.AST, variables: List[str]) -> Evaluator:
+    evaluate, is_condition = _compile_node(node, variables)
+    if not is_condition:
+        raise ValueError(f"Expected a comparison, got '{ast.unparse(node)}'")
+    return evaluate
+
+
+def _compile_value(node: ast.AST, variables: List[str]) -> Evaluator:
+    if _is_number(node):
+        value = float(node.value)
+        return lambda columns: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in VARIABLES:
+            raise ValueError(f"Unknown variable '{node.id}'; expected one of {', '.join(VARIABLES)}")
+        name = node.id
+        variables.append(name)
+        return lambda columns: columns[name]
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile_value(node.operand, variables)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        return lambda columns: np.negative(operand(columns))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        op = _ARITHMETIC[type(node.op)]
+        left, right = _compile_value(node.left, variables), _compile_value(node.right, variables)
+        return lambda columns: op(left(columns), right(columns))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS:
+        function, arity = _FUNCTIONS[node.func.id]
+        if len(node.args) != arity or node.keywords:
+            raise ValueError(f"{node.func.id}() takes {arity} argument{'s' if arity > 1 else ''}")
+        args = [_compile_value(arg, variables) for arg in node.args]
+        return lambda columns: function(*(arg(columns) for arg in args))
+
+    raise ValueError(f"Unsupported criteria syntax '{ast.unparse(node)}'")
+
+
+def _compile_table(spec: Mapping[str, Any]) -> Criteria:
+    unknown = set(spec) - {"variable", "by", "points", "interpolation"}
+    if unknown:
+        raise ValueError(f"Unknown limit table keys: {', '.join(sorted(unknown))}")
+    variable, by = spec.get("variable"), spec.get("by")
+    for name in (variable, by):
+        if name not in VARIABLES:
+            raise ValueError(f"Unknown variable '{name}'; expected one of {', '.join(VARIABLES)}")
+    interpolation = spec.get("interpolation", "linear")
+    if interpolation not in _INTERPOLATIONS:
+        raise ValueError(f"interpolation must be one of {', '.join(_INTERPOLATIONS)}")
+    try:
+        points = np.asarray(spec.get("points"), dtype=float)
+    except (TypeError, ValueError):
+        points = np.zeros((0, 0))
+    if points.ndim != 2 or points.shape[0] < 1 or points.shape[1] != 2 or not np.all(np.isfinite(points)):
+        raise ValueError("points must be a list of [value, limit] pairs")
+    xs, limits = points[:, 0].copy(), points[:, 1].copy()
+    if np.any(np.diff(xs) <= 0):
+        raise ValueError(f"points must be in increasing order of {by}")
+
+    if interpolation == "linear":
+        # Clamped to the first/last limit outside the table
+        def evaluate(columns):
+            return columns[variable] <= np.interp(columns[by], xs, limits)
+    else:
+        def evaluate(columns):
+            index = np.searchsorted(xs, columns[by], side="right") - 1
+            return columns[variable] <= limits[np.maximum(index, 0)]
+    return Criteria(dict(spec), (variable, by), evaluate)
+
+
+def _compile(spec: Any) -> Criteria:
+    if isinstance(spec, str):
+        return _compile_expression(spec)
+    if isinstance(spec, dict):
+        return _compile_table(spec)
+    if isinstance(spec, list) and spec:
+        parts = [_compile(part) for part in spec]
+        if len(parts) == 1:
+            return parts[0]
+        variables = [name for part in parts for name in part.variables]
+        return Criteria(spec, variables, lambda columns: reduce(np.logical_and, (p._evaluate(columns) for p in parts)))
+    raise ValueError("Criteria must be an expression, a limit table or a non-empty list of them")
+
+
+@lru_cache(maxsize=4096)
+def _compile_document(document: str) -> Criteria:
+    return _compile(json.loads(document))
+
+
+def compile_criteria(spec: Any) -> Criteria:
+    """
+    Compile a criteria document (see :class:`Criteria`), raising ValueError when it is invalid.
+
+    Compiled criteria are cached by their canonical JSON, so every task sharing
+    a rule shares one evaluator.
+    """
+    return _compile_document(json.dumps(spec, sort_keys=True))
+
+
+def wave_height_criteria(wave_height_limit: float) -> Criteria:
+    """The default criteria of a task without its own: ``wave_height <= wave_height_limit``."""
+    return compile_criteria(f"wave_height <= {float(wave_height_limit)!r}")
+
+
+def evaluate_criteria(criteria: Sequence[Criteria], columns: Columns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate many tasks' criteria over the same forecast columns.
+
+    Single comparisons (the default ``wave_height <= limit`` included) are
+    grouped per variable and comparison into one broadcast comparison, and
+    every other distinct criteria object is evaluated once, however many tasks
+    share it.
+
+    Args:
+        criteria (Sequence[Criteria]): One compiled criteria per task, ``k`` in total
+        columns (Mapping[str, numpy.ndarray]): Forecast variables, shape ``(n,)`` or ``(members, n)``
+
+    Returns:
+        tuple: (go, exceedance), boolean arrays of shape ``(k,) + column shape``
+    """
+    shape = np.shape(columns["wave_height"]) if "wave_height" in columns else np.shape(next(iter(columns.values())))
+    go = np.zeros((len(criteria),) + shape, dtype=bool)
+    exceedance = np.zeros_like(go)
+
+    thresholds: Dict[Tuple[str, Callable], List[int]] = {}
+    shared: Dict[int, List[int]] = {}
+    for k, c in enumerate(criteria):
+        if c.threshold is not None:
+            thresholds.setdefault(c.threshold[:2], []).append(k)
+        else:
+            shared.setdefault(id(c), []).append(k)
+
+    for (name, compare), rows in thresholds.items():
+        values = np.asarray(columns[name], dtype=float)
+        limits = np.array([criteria[k].threshold[2] for k in rows]).reshape((-1,) + (1,) * values.ndim)
+        ok = compare(values[None], limits)
+        known = np.isfinite(values)[None]
+        go[rows], exceedance[rows] = ok & known, ~ok & known
+    for rows in shared.values():
+        go[rows], exceedance[rows] = criteria[rows[0]].evaluate(columns)
+    return go, exceedance
+
+
+def window_analysis(hourly: Columns, criteria: Sequence[Criteria], task_hours: Sequence[int],
+                    probabilistic: bool, confidence: float = DEFAULT_CONFIDENCE):
+    """
+    Go/no-go and start windows of ``k`` tasks over the hourly forecast, in one batched pass.
+
+    Every task's criteria are evaluated on all forecast variables at once; with
+    ``probabilistic`` set (always for an ensemble) the per-member results are
+    averaged into P(go) / P(window) and thresholded at ``confidence``.
+
+    Returns:
+        tuple: (go_no_go, start_indices, p_go, p_window)
+            - go_no_go: Boolean array ``(k, n)``
+            - start_indices: List of ``k`` arrays of window start indices
+            - p_go, p_window: Arrays ``(k, n)``, see :func:`app.lib.window_probabilities`;
+              None unless probabilistic
+    """
+    go, exceedance = evaluate_criteria(criteria, hourly)
+    durations = np.asarray(task_hours, dtype=np.int64).reshape(-1)
+    if not probabilistic:
+        start_mask = window_start_mask(exceedance, durations)
+        return go, [np.flatnonzero(row) for row in start_mask], None, None
+    if go.ndim == 2:
+        # A deterministic forecast is a single-member ensemble
+        go, exceedance = go[:, None], exceedance[:, None]
+    p_go, p_window = window_probabilities(go, exceedance, durations)
+    return p_go >= confidence, [np.flatnonzero(row >= confidence) for row in p_window], p_go, p_window
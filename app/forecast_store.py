@@ -0,0 +1,407 @@
+"""Columnar, time-sorted storage for the forecast series and grids served by the weather service."""
+
+import copy
+import json
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+VARIABLES = ("wind_speed", "wave_height", "wave_period")
+
+# Binary forecast file (see ForecastGrid.to_binary): a fixed header, the lat/lon axes, one
+# record per variable, then page-aligned little-endian int64 epochs and float32 columns.
+FORECAST_FILE_MAGIC = b"WXFCST"
+FORECAST_FILE_VERSION = 2
+_FILE_PREAMBLE = struct.Struct("<6sH")  # magic, version
+_FILE_HEADERS = {
+    1: struct.Struct("<6sHIIQI"),  # magic, version, n_lat, n_lon, n_times, n_vars
+    2: struct.Struct("<6sHIIQII"),  # ... and n_members (0: deterministic, no member axis)
+}
+_FILE_VARIABLE = struct.Struct("<32sb")  # name (NUL padded), decimals (-1: keep float32 as is)
+_FILE_ALIGNMENT = 4096
+MAX_DECIMALS = 6
+
+
+def parse_timestamp(timestamp: str) -> int:
+    """Convert an ISO 8601 UTC timestamp (``...Z`` or ``+00:00``) into Unix seconds."""
+    return int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+
+
+def format_timestamps(epochs: np.ndarray) -> List[str]:
+    """Format Unix seconds as ISO 8601 UTC strings such as ``2025-11-14T07:49:39Z``."""
+    stamps = np.datetime_as_string(np.asarray(epochs, dtype="datetime64[s]"), unit="s")
+    return [f"{s}Z" for s in stamps.tolist()]
+
+
+class ForecastStore:
+    """
+    A single forecast series held as a sorted epoch array plus one array per variable.
+
+    Timestamps are parsed once on construction, so range queries are a pair of
+    binary searches returning slice views of the underlying arrays.
+    """
+
+    def __init__(self, times: Iterable[int], columns: Mapping[str, Iterable[float]]):
+        times = np.asarray(times, dtype=np.int64)
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        for name, values in columns.items():
+            if values.shape[-1] != times.shape[0]:
+                raise ValueError(f"Column '{name}' has {values.shape[-1]} points, expected {times.shape[0]}")
+
+        if times.size and np.any(times[1:] < times[:-1]):
+            order = np.argsort(times, kind="stable")
+            times = times[order]
+            columns = {name: values[..., order] for name, values in columns.items()}
+
+        self.times = times
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "ForecastStore":
+        """
+        Build a store from forecast entries shaped like the weather service JSON.
+
+        A variable given as a list per entry (one value per ensemble member)
+        becomes a ``(members, n)`` column.
+        """
+        records = list(records)
+        times = [parse_timestamp(r["timestamp"]) for r in records]
+        names = [k for k in records[0] if k != "timestamp"] if records else list(VARIABLES)
+        columns = {name: np.moveaxis(np.array([r[name] for r in records], dtype=float), 0, -1) for name in names}
+        return cls(times, columns)
+
+    @classmethod
+    def from_json(cls, path: Path) -> "ForecastStore":
+        """Load a ``{"forecast": [...]}`` JSON document from disk."""
+        with open(path, "r") as f:
+            return cls.from_records(json.load(f)["forecast"])
+
+    def __len__(self) -> int:
+        return int(self.times.shape[0])
+
+    def time_slice(self, time_from: int, time_to: int) -> slice:
+        """Return the index slice covering ``time_from <= t <= time_to`` (Unix seconds)."""
+        start = int(np.searchsorted(self.times, time_from, side="left"))
+        stop = int(np.searchsorted(self.times, time_to, side="right"))
+        return slice(start, max(start, stop))
+
+    def query(self, time_from: int, time_to: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return views of the epoch array and every column within the inclusive range."""
+        s = self.time_slice(time_from, time_to)
+        return self.times[s], {name: values[..., s] for name, values in self.columns.items()}
+
+    def records(self, time_from: int, time_to: int) -> List[Dict[str, Any]]:
+        """Return the inclusive range as a list of forecast entries (the JSON wire shape)."""
+        return to_records(*self.query(time_from, time_to))
+
+
+def to_records(times: np.ndarray, columns: Mapping[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Convert an epoch array and parallel columns into forecast entries (the JSON wire shape).
+
+    Ensemble columns (``(members, n)``) give a list of member values per entry.
+    """
+    names = list(columns)
+    rows = zip(format_timestamps(times), *(np.moveaxis(np.asarray(columns[name]), -1, 0).tolist() for name in names))
+    return [{"timestamp": row[0], **dict(zip(names, row[1:]))} for row in rows]
+
+
+def column_decimals(values: np.ndarray) -> Optional[int]:
+    """Return the fewest decimals (up to ``MAX_DECIMALS``) that represent every value exactly, if any."""
+    values = np.asarray(values, dtype=np.float64)
+    for decimals in range(MAX_DECIMALS + 1):
+        if np.array_equal(np.round(values, decimals), values, equal_nan=True):
+            return decimals
+    return None
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _FILE_ALIGNMENT) * _FILE_ALIGNMENT
+
+
+def _regular_axis(values: np.ndarray, name: str) -> Tuple[float, float]:
+    """Return ``(origin, step)`` of an ascending, evenly spaced coordinate axis."""
+    if values.ndim != 1 or values.size == 0:
+        raise ValueError(f"{name} must be a non-empty 1-D array")
+    if values.size == 1:
+        return float(values[0]), 1.0
+    steps = np.diff(values)
+    if steps[0] <= 0 or not np.allclose(steps, steps[0]):
+        raise ValueError(f"{name} must be ascending and evenly spaced")
+    return float(values[0]), float(steps[0])
+
+
+class _GrowableSeries:
+    """Over-allocated time and column buffers shared by the successive grids of an append-only series."""
+    __slots__ = ("times", "columns", "length")
+
+    def __init__(self, capacity: int, shapes: Mapping[str, Tuple[int, ...]]):
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.columns = {name: np.empty(shape + (capacity,)) for name, shape in shapes.items()}
+        self.length = 0
+
+
+class ForecastGrid:
+    """
+    Forecast series on a regular lat/lon grid, every point sharing one time axis.
+
+    Columns have shape ``(n_lat, n_lon, n_times)``, or ``(n_lat, n_lon, n_members,
+    n_times)`` for an ensemble forecast. Because the grid is regular,
+    the spatial index is plain arithmetic: a location hashes straight to its
+    cell, so nearest-point and bilinear lookups cost the same for any grid size.
+    Locations outside the grid are clamped to its edge.
+
+    Columns opened from a binary file are float32 memory maps. ``decimals``
+    records how many decimals each one was quantised from, so values read back
+    are rounded to exactly what was written (2.1, not 2.0999999046325684).
+    """
+
+    def __init__(self, lats: Iterable[float], lons: Iterable[float], times: Iterable[int],
+                 columns: Mapping[str, np.ndarray], decimals: Optional[Mapping[str, int]] = None):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self._lat0, self._dlat = _regular_axis(self.lats, "lats")
+        self._lon0, self._dlon = _regular_axis(self.lons, "lons")
+
+        self.times = np.asarray(times, dtype=np.int64)
+        if self.times.size and np.any(self.times[1:] <= self.times[:-1]):
+            raise ValueError("times must be strictly increasing")
+
+        expected = (self.lats.size, self.lons.size, self.times.size)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        for name, values in self.columns.items():
+            if values.shape[:2] + values.shape[-1:] != expected:
+                raise ValueError(f"Column '{name}' has shape {values.shape}, expected {expected}")
+        self.decimals = dict(decimals or {})
+        self._series: Optional[_GrowableSeries] = None
+
+    @classmethod
+    def from_store(cls, store: ForecastStore, lat: float, lon: float) -> "ForecastGrid":
+        """Wrap a single-location series as a 1x1 grid that answers every location."""
+        columns = {name: values[None, None, ...] for name, values in store.columns.items()}
+        return cls([lat], [lon], store.times, columns)
+
+    @classmethod
+    def from_json(cls, path: Path) -> "ForecastGrid":
+        """Load a ``{"location": ..., "forecast": [...]}`` JSON document as a single-point grid."""
+        with open(path, "r") as f:
+            document = json.load(f)
+        store = ForecastStore.from_records(document["forecast"])
+        return cls.from_store(store, document["location"]["lat"], document["location"]["lon"])
+
+    @classmethod
+    def from_npz(cls, path: Path) -> "ForecastGrid":
+        """Load a grid written by ``demo_tools.generate_forecast_grid``."""
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files if name not in ("lats", "lons", "times")}
+            return cls(data["lats"], data["lons"], data["times"], columns)
+
+    @classmethod
+    def from_binary(cls, path: Path) -> "ForecastGrid":
+        """
+        Open a file written by :meth:`to_binary` as read-only memory maps.
+
+        Nothing beyond the header is read up front: range queries touch only the
+        pages they need, and every process mapping the file shares the OS page cache.
+        """
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if raw.size < _FILE_PREAMBLE.size or _FILE_PREAMBLE.unpack_from(raw)[0] != FORECAST_FILE_MAGIC:
+            raise ValueError(f"{path} is not a forecast file")
+        version = _FILE_PREAMBLE.unpack_from(raw)[1]
+        if version not in _FILE_HEADERS:
+            raise ValueError(f"Unsupported forecast file version {version}")
+        header = _FILE_HEADERS[version]
+        _, _, n_lat, n_lon, n_times, n_vars, *rest = header.unpack_from(raw)
+        n_members = rest[0] if rest else 0
+        shape = (n_lat, n_lon) + ((n_members,) if n_members else ()) + (n_times,)
+
+        offset = header.size
+        lats = np.frombuffer(raw, dtype="<f8", count=n_lat, offset=offset)
+        lons = np.frombuffer(raw, dtype="<f8", count=n_lon, offset=offset + 8 * n_lat)
+        offset += 8 * (n_lat + n_lon)
+        variables = [_FILE_VARIABLE.unpack_from(raw, offset + k * _FILE_VARIABLE.size) for k in range(n_vars)]
+        offset = _align(offset + n_vars * _FILE_VARIABLE.size)
+
+        column_size = 4 * int(np.prod(shape))
+        if raw.size < _align(offset + 8 * n_times) + n_vars * _align(column_size):
+            raise ValueError(f"{path} is truncated")
+        times = raw[offset:offset + 8 * n_times].view("<i8")
+        offset = _align(offset + 8 * n_times)
+
+        columns, decimals = {}, {}
+        for name, digits in variables:
+            name = name.rstrip(b"\0").decode()
+            columns[name] = raw[offset:offset + column_size].view("<f4").reshape(shape)
+            if digits >= 0:
+                decimals[name] = digits
+            offset += _align(column_size)
+        return cls(lats, lons, times, columns, decimals)
+
+    def to_binary(self, path: Path) -> None:
+        """
+        Write the grid in the memory-mappable binary format read by :meth:`from_binary`.
+
+        Values are stored as float32, with the decimals each column was rounded to
+        so they read back exactly.
+        """
+        shapes = {values.shape for values in self.columns.values()}
+        if len(shapes) > 1 or any(len(shape) > 4 for shape in shapes):
+            raise ValueError("Columns must share one (n_lat, n_lon[, n_members], n_times) shape")
+        shape = next(iter(shapes), ())
+        n_members = shape[2] if len(shape) == 4 else 0
+
+        header = _FILE_HEADERS[FORECAST_FILE_VERSION].pack(
+            FORECAST_FILE_MAGIC, FORECAST_FILE_VERSION, self.lats.size, self.lons.size, self.times.size,
+            len(self.columns), n_members,
+        )
+        header += self.lats.astype("<f8").tobytes() + self.lons.astype("<f8").tobytes()
+        for name, values in self.columns.items():
+            digits = self.decimals[name] if name in self.decimals else column_decimals(values)
+            header += _FILE_VARIABLE.pack(name.encode(), -1 if digits is None else digits)
+
+        with open(path, "wb") as f:
+            f.write(header.ljust(_align(len(header)), b"\0"))
+            f.write(self.times.astype("<i8").tobytes().ljust(_align(8 * self.times.size), b"\0"))
+            for values in self.columns.values():
+                data = np.asarray(values, dtype="<f4").tobytes()
+                f.write(data.ljust(_align(len(data)), b"\0"))
+
+    def merge(self, times: Iterable[int], columns: Mapping[str, np.ndarray]) -> Tuple["ForecastGrid", int]:
+        """
+        Return a single-point grid with a batch of entries upserted, and how many existing entries it replaced.
+
+        ``times`` must be strictly increasing and ``columns`` hold every variable
+        of the grid as ``([n_members,] len(times))`` arrays; on a timestamp that
+        already exists the batch wins. This grid is left untouched, so readers
+        holding it keep a consistent series. A batch past the current end is
+        written into spare buffer capacity (amortised O(batch)); one that
+        overlaps existing times rebuilds the series.
+        """
+        if self.shape != (1, 1):
+            raise ValueError("Only a single-location forecast can be appended to")
+        if set(columns) != set(self.columns):
+            raise ValueError(f"Expected the variables {sorted(self.columns)}, got {sorted(columns)}")
+        times = np.asarray(times, dtype=np.int64)
+        columns = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+        if times.size == 0:
+            return self, 0
+        if np.any(times[1:] <= times[:-1]):
+            raise ValueError("times must be strictly increasing")
+
+        n, k = self.times.size, times.size
+        series = self._series
+        if n and times[0] <= self.times[-1]:
+            # Overlap: build fresh buffers so grids already handed out never change
+            merged = np.union1d(self.times, times)
+            grown = self._allocate(merged.size)
+            grown.times[:merged.size] = merged
+            old_at, new_at = np.searchsorted(merged, self.times), np.searchsorted(merged, times)
+            for name, values in columns.items():
+                grown.columns[name][0, 0, ..., old_at] = self._read(name, 0, 0, slice(None))
+                grown.columns[name][0, 0, ..., new_at] = values
+            grown.length = merged.size
+            return self._with_series(grown), n + k - merged.size
+
+        if series is None or series.length != n or series.times.size < n + k:
+            # First append, an outgrown buffer, or a stale grid whose buffer tail a newer grid already uses
+            series = self._allocate(n + k)
+            series.times[:n] = self.times
+            for name in self.columns:
+                series.columns[name][0, 0, ..., :n] = self._read(name, 0, 0, slice(None))
+        # Past the end of the buffers, which no published grid looks at
+        series.times[n:n + k] = times
+        for name, values in columns.items():
+            series.columns[name][0, 0, ..., n:n + k] = values
+        series.length = n + k
+        return self._with_series(series), 0
+
+    def _allocate(self, size: int) -> _GrowableSeries:
+        """Buffers for at least ``size`` entries, doubled so a run of appends costs amortised O(1) each."""
+        shapes = {name: values.shape[:-1] for name, values in self.columns.items()}
+        return _GrowableSeries(max(2 * size, 1024), shapes)
+
+    def _with_series(self, series: _GrowableSeries) -> "ForecastGrid":
+        # A shallow copy skips the O(n) validation of __init__: the buffers are sorted by construction
+        grid = copy.copy(self)
+        grid.times = series.times[:series.length]
+        grid.columns = {name: values[..., :series.length] for name, values in series.columns.items()}
+        grid.decimals = {}  # values were rounded to their decimals when copied into the buffers
+        grid._series = series
+        return grid
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.lats.size, self.lons.size
+
+    @property
+    def members(self) -> int:
+        """Number of ensemble members; 0 for a deterministic forecast."""
+        return max((values.shape[2] for values in self.columns.values() if values.ndim == 4), default=0)
+
+    def _fractional_index(self, lat: float, lon: float) -> Tuple[float, float]:
+        fi = min(max((lat - self._lat0) / self._dlat, 0.0), self.lats.size - 1.0)
+        fj = min(max((lon - self._lon0) / self._dlon, 0.0), self.lons.size - 1.0)
+        return fi, fj
+
+    def _read(self, name: str, i: int, j: int, s: slice) -> np.ndarray:
+        """Values of one column at grid index ``(i, j)`` over time slice ``s``, undoing float32 quantisation."""
+        values = self.columns[name][i, j, ..., s]
+        digits = self.decimals.get(name)
+        return values if digits is None else np.round(values.astype(np.float64), digits)
+
+    def nearest(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Return the ``(i, j)`` grid index closest to the location."""
+        fi, fj = self._fractional_index(lat, lon)
+        return int(round(fi)), int(round(fj))
+
+    def query(self, lat: float, lon: float, time_from: int, time_to: int, method: str = "nearest"
+              ) -> Tuple[np.ndarray, Dict[str, np.ndarray], Tuple[float, float]]:
+        """
+        Return the inclusive time range of the series at a location.
+
+        Args:
+            lat (float): Latitude of the requested location
+            lon (float): Longitude of the requested location
+            time_from (int): Start timestamp (Unix seconds, UTC)
+            time_to (int): End timestamp (Unix seconds, UTC)
+            method (str): ``"nearest"`` for the closest grid point (views, unless quantised) or
+                ``"bilinear"`` to interpolate between the four surrounding points
+
+        Returns:
+            tuple: (times, columns, point)
+                - times: Epoch array of the selected range
+                - columns: Mapping of variable name to values over that range
+                - point: ``(lat, lon)`` the series represents
+        """
+        start = int(np.searchsorted(self.times, time_from, side="left"))
+        stop = max(start, int(np.searchsorted(self.times, time_to, side="right")))
+        s = slice(start, stop)
+
+        if method == "nearest":
+            i, j = self.nearest(lat, lon)
+            columns = {name: self._read(name, i, j, s) for name in self.columns}
+            return self.times[s], columns, (float(self.lats[i]), float(self.lons[j]))
+
+        if method != "bilinear":
+            raise ValueError(f"Unknown interpolation method '{method}'")
+
+        fi, fj = self._fractional_index(lat, lon)
+        i0, j0 = int(fi), int(fj)
+        i1, j1 = min(i0 + 1, self.lats.size - 1), min(j0 + 1, self.lons.size - 1)
+        wi, wj = fi - i0, fj - j0
+        columns = {
+            name: (self._read(name, i0, j0, s) * ((1 - wi) * (1 - wj)) + self._read(name, i0, j1, s) * ((1 - wi) * wj)
+                   + self._read(name, i1, j0, s) * (wi * (1 - wj)) + self._read(name, i1, j1, s) * (wi * wj))
+            for name in self.columns
+        }
+        point = (self._lat0 + fi * self._dlat, self._lon0 + fj * self._dlon)
+        return self.times[s], columns, point
+
+    def records(self, lat: float, lon: float, time_from: int, time_to: int, method: str = "nearest"
+                ) -> Tuple[List[Dict[str, Any]], Tuple[float, float]]:
+        """Return the range at a location as forecast entries plus the point they represent."""
+        times, columns, point = self.query(lat, lon, time_from, time_to, method)
+        return to_records(times, columns), point
@@ -0,0 +1,404 @@
+"""
+Streaming ingestion of forecast feeds (JSON, NDJSON or CSV) into the served forecast.
+
+A feed is pushed through in raw byte chunks: a decoder turns them into records
+as they complete, every record is validated, and valid ones are collected into
+fixed-size batches that are deduplicated by timestamp and handed to an
+``append`` callback. Memory is bounded by one chunk plus one batch, whatever
+the size of the feed.
+"""
+
+import codecs
+import csv
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.forecast_store import VARIABLES
+
+DEFAULT_BATCH_SIZE = 10_000
+CHUNK_SIZE = 1 << 16
+MAX_RECORD_BYTES = 1 << 20  # a record (JSON value, NDJSON or CSV line) still incomplete after this much is malformed
+MAX_REPORTED_ERRORS = 20
+
+CONTENT_TYPES = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+SUFFIXES = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+
+def feed_format(content_type: Optional[str] = None, path: Optional[Path] = None) -> Optional[str]:
+    """Return ``json``, ``ndjson`` or ``csv`` for a Content-Type header or a file suffix, if recognised."""
+    if content_type:
+        return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+    if path is not None:
+        return SUFFIXES.get(Path(path).suffix.lower())
+    return None
+
+
+class LineSplitter:
+    """
+    Split a stream of text (or byte) chunks into lines, buffering only the unfinished last line.
+
+    The unfinished line is kept as a list of its pieces and joined once it ends,
+    so a long line costs linear time. A line longer than ``MAX_RECORD_BYTES``
+    comes out as a ValueError instead, and the rest of it is discarded up to the
+    next newline without being buffered.
+    """
+
+    def __init__(self, empty: Union[str, bytes]):
+        self._empty = empty
+        self._newline = "\n" if isinstance(empty, str) else b"\n"
+        self._pieces: List[Union[str, bytes]] = []
+        self._size = 0
+        self._skipping = False  # inside an over-long line
+
+    def feed(self, data: Union[str, bytes]) -> List[Any]:
+        lines: List[Any] = data.split(self._newline)
+        tail = lines.pop()
+        if lines:
+            if self._skipping:
+                del lines[0]
+                self._skipping = False
+            elif self._pieces:
+                lines[0] = self._empty.join(self._pieces) + lines[0]
+            self._pieces, self._size = [], 0
+        lines = [self._too_long() if len(line) > MAX_RECORD_BYTES else line for line in lines]
+        if not self._skipping and tail:
+            self._pieces.append(tail)
+            self._size += len(tail)
+            if self._size > MAX_RECORD_BYTES:
+                self._pieces, self._size, self._skipping = [], 0, True
+                lines.append(self._too_long())
+        return lines
+
+    def close(self) -> List[Any]:
+        line = self._empty.join(self._pieces)
+        self._pieces, self._size, self._skipping = [], 0, False
+        return [line]
+
+    @staticmethod
+    def _too_long() -> ValueError:
+        return ValueError(f"Line longer than {MAX_RECORD_BYTES} bytes")
+
+
+class NdjsonDecoder:
+    """One JSON record per line. A malformed or over-long line is yielded as a ValueError, so only that record is lost."""
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self._lines = LineSplitter("")
+        self._decode = json.JSONDecoder().decode
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        yield from self._records(self._lines.feed(self._text.decode(chunk)))
+
+    def close(self) -> Iterator[Any]:
+        yield from self._records(self._lines.feed(self._text.decode(b"", final=True)) + self._lines.close())
+
+    def _records(self, lines: List[Any]) -> Iterator[Any]:
+        for line in lines:
+            if isinstance(line, ValueError):
+                yield line
+            elif line and not line.isspace():
+                try:
+                    yield self._decode(line)
+                except ValueError as e:
+                    yield ValueError(f"Malformed JSON line: {e}")
+
+
+class CsvDecoder:
+    """A header row naming ``timestamp`` and the variables, then one record per line (values stay strings)."""
+
+    def __init__(self):
+        self._lines = LineSplitter(b"")
+        self._header: Optional[List[str]] = None
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        yield from self._decode(self._lines.feed(chunk))
+
+    def close(self) -> Iterator[Any]:
+        yield from self._decode(self._lines.close())
+
+    def _decode(self, lines: List[Any]) -> Iterator[Any]:
+        run: List[bytes] = []  # consecutive lines, parsed by one csv.reader
+        for line in lines + [None]:
+            if isinstance(line, bytes):
+                run.append(line)
+                continue
+            yield from self._rows(run)
+            run = []
+            if isinstance(line, ValueError):
+                if self._header is None:
+                    raise ValueError(f"CSV header: {line}")
+                yield line
+
+    def _rows(self, lines: List[bytes]) -> Iterator[Any]:
+        rows = csv.reader(line.decode("utf-8-sig" if self._header is None else "utf-8").rstrip("\r")
+                          for line in lines if line.strip())
+        for row in rows:
+            if self._header is None:
+                self._header = [name.strip() for name in row]
+            elif len(row) != len(self._header):
+                yield ValueError(f"Expected {len(self._header)} CSV fields, got {len(row)}")
+            else:
+                yield dict(zip(self._header, row))
+
+
+class JsonDecoder:
+    """
+    A ``{"forecast": [...]}`` document (other keys are kept in ``document``) or a bare array of records.
+
+    Only the text of the record being decoded is buffered. Unlike NDJSON, a
+    syntax error cannot be skipped over and raises ValueError.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._state = "start"  # then "key" (inside the object), "array", "items" and "done"
+        self._in_object = False
+        self._decoder = json.JSONDecoder()
+        self.document: Dict[str, Any] = {}
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        self._buffer += self._text.decode(chunk)
+        yield from self._drain(final=False)
+
+    def close(self) -> Iterator[Any]:
+        self._buffer += self._text.decode(b"", final=True)
+        yield from self._drain(final=True)
+        if self._state != "done":
+            raise ValueError("Truncated JSON forecast document")
+
+    def _drain(self, final: bool) -> Iterator[Any]:
+        buffer, pos = self._buffer, 0
+        try:
+            while True:
+                pos = self._skip_whitespace(buffer, pos)
+                if pos == len(buffer):
+                    break
+                char = buffer[pos]
+                if self._state == "start":
+                    if char not in "[{":
+                        raise ValueError("A JSON forecast is an object or an array of records")
+                    self._state, self._in_object, pos = ("items" if char == "[" else "key"), char == "{", pos + 1
+                elif self._state == "key":
+                    if char in ",}":
+                        pos += 1
+                        if char == "}":
+                            self._state = "done"
+                        continue
+                    decoded = self._decode_key(buffer, pos, final)
+                    if decoded is None:
+                        break
+                    key, end = decoded
+                    if key == "forecast":
+                        self._state, pos = "array", end
+                        continue
+                    value = self._decode(buffer, self._skip_whitespace(buffer, end), final)
+                    if value is None:
+                        break  # the key stays buffered until its value is complete
+                    self.document[key], pos = value
+                elif self._state == "array":
+                    if char != "[":
+                        raise ValueError("'forecast' must be an array of records")
+                    self._state, pos = "items", pos + 1
+                elif self._state == "items":
+                    if char == ",":
+                        pos += 1
+                    elif char == "]":
+                        self._state, pos = ("key" if self._in_object else "done"), pos + 1
+                    else:
+                        value = self._decode(buffer, pos, final)
+                        if value is None:
+                            break
+                        record, pos = value
+                        yield record
+                else:
+                    raise ValueError("Unexpected data after the JSON forecast document")
+        finally:
+            self._buffer = buffer[pos:]
+        if not final and len(self._buffer) > MAX_RECORD_BYTES:
+            raise ValueError(f"JSON record larger than {MAX_RECORD_BYTES} bytes, or malformed")
+
+    @staticmethod
+    def _skip_whitespace(buffer: str, pos: int) -> int:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        return pos
+
+    def _decode(self, buffer: str, pos: int, final: bool) -> Optional[Tuple[Any, int]]:
+        """Decode the value at ``pos``, or None when the buffer may end inside it."""
+        try:
+            value, end = self._decoder.raw_decode(buffer, pos)
+        except ValueError as e:
+            if final:
+                raise ValueError(f"Malformed JSON forecast: {e}") from None
+            return None
+        # A number running into the end of the buffer may continue in the next chunk
+        if end == len(buffer) and not final:
+            return None
+        return value, end
+
+    def _decode_key(self, buffer: str, pos: int, final: bool) -> Optional[Tuple[str, int]]:
+        """Decode ``"key":`` at ``pos``, or None when it is not complete yet."""
+        decoded = self._decode(buffer, pos, final)
+        if decoded is None:
+            return None
+        key, end = decoded
+        if not isinstance(key, str):
+            raise ValueError("Malformed JSON forecast: expected an object key")
+        end = self._skip_whitespace(buffer, end)
+        if end == len(buffer):
+            if final:
+                raise ValueError("Truncated JSON forecast document")
+            return None
+        if buffer[end] != ":":
+            raise ValueError("Malformed JSON forecast: expected ':' after an object key")
+        return key, end + 1
+
+
+DECODERS = {"json": JsonDecoder, "ndjson": NdjsonDecoder, "csv": CsvDecoder}
+
+
+def iter_records(chunks: Iterable[bytes], fmt: str) -> Iterator[Any]:
+    """Yield the records of a feed given as byte chunks; malformed NDJSON/CSV lines come out as ValueError."""
+    decoder = DECODERS[fmt]()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+def read_chunks(f: BinaryIO, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a binary file in ``size`` byte chunks."""
+    return iter(lambda: f.read(size), b"")
+
+
+def _number(value: Any, name: str) -> float:
+    if type(value) is float:
+        number = value
+    elif isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{name} must be a number")
+    else:
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number, got {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite")
+    if number < 0 and name in VARIABLES:
+        raise ValueError(f"{name} must not be negative")
+    return number
+
+
+def validate_record(record: Any, variables: Sequence[str], members: int = 0) -> Tuple[int, List[Any]]:
+    """
+    Return ``(epoch seconds, values)`` of a forecast record, raising ValueError when it is unusable.
+
+    The timestamp must be ISO 8601 with a UTC offset, and every variable a
+    finite number (non-negative for the known variables); with ``members > 0``
+    a list of that many numbers. Other keys are ignored.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record is not an object")
+    if "timestamp" not in record:
+        raise ValueError("Missing timestamp")
+    try:
+        moment = datetime.fromisoformat(record["timestamp"].replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid timestamp {record['timestamp']!r}") from None
+    if moment.tzinfo is None:
+        raise ValueError(f"Timestamp {record['timestamp']!r} has no UTC offset")
+
+    values = []
+    for name in variables:
+        if name not in record:
+            raise ValueError(f"Missing {name}")
+        value = record[name]
+        if members:
+            if not isinstance(value, list) or len(value) != members:
+                raise ValueError(f"{name} must list {members} ensemble member values")
+            values.append([_number(v, name) for v in value])
+        else:
+            values.append(_number(value, name))
+    return int(moment.timestamp()), values
+
+
+class ForecastIngest:
+    """
+    Ingest one feed: push raw chunks with :meth:`feed`, then call :meth:`finish` for the statistics.
+
+    ``append(times, columns)`` receives each batch with strictly increasing
+    times, ``columns`` mapping every variable to a ``([members,] n)`` array, and
+    returns how many of its entries replaced existing ones. Within a batch the
+    last record for a timestamp wins; across batches that is up to ``append``.
+    Invalid records are counted and skipped, with the first few reasons kept.
+    """
+
+    def __init__(self, fmt: str, append: Callable[[np.ndarray, Dict[str, np.ndarray]], int],
+                 variables: Sequence[str], members: int = 0, batch_size: int = DEFAULT_BATCH_SIZE):
+        self._decoder = DECODERS[fmt]()
+        self._append = append
+        self._variables = list(variables)
+        self._members = members
+        self._times = np.empty(batch_size, dtype=np.int64)
+        self._values = np.empty((batch_size, len(self._variables)) + ((members,) if members else ()))
+        self._size = 0
+        self.stats: Dict[str, Any] = {
+            "records": 0,  # seen in the feed
+            "rejected": 0,  # failed validation
+            "duplicates": 0,  # superseded by a later record for the same timestamp in their batch
+            "appended": 0,  # new timestamps
+            "replaced": 0,  # timestamps that already existed
+            "batches": 0,
+            "errors": [],  # the first MAX_REPORTED_ERRORS rejections: record number and reason
+        }
+
+    def feed(self, chunk: bytes) -> None:
+        for record in self._decoder.feed(chunk):
+            self._add(record)
+
+    def finish(self) -> Dict[str, Any]:
+        for record in self._decoder.close():
+            self._add(record)
+        self._flush()
+        return self.stats
+
+    def _add(self, record: Any) -> None:
+        self.stats["records"] += 1
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            epoch, values = validate_record(record, self._variables, self._members)
+        except ValueError as e:
+            self.stats["rejected"] += 1
+            if len(self.stats["errors"]) < MAX_REPORTED_ERRORS:
+                self.stats["errors"].append({"record": self.stats["records"], "error": str(e)})
+            return
+        self._times[self._size] = epoch
+        self._values[self._size] = values
+        self._size += 1
+        if self._size == self._times.size:
+            self._flush()
+
+    def _flush(self) -> None:
+        n, self._size = self._size, 0
+        if not n:
+            return
+        # np.unique on the reversed batch finds the last record per timestamp, in ascending time order
+        times, first = np.unique(self._times[n - 1::-1], return_index=True)
+        last = n - 1 - first
+        columns = {name: np.moveaxis(self._values[last, k], 0, -1) for k, name in enumerate(self._variables)}
+        replaced = self._append(times, columns)
+        self.stats["duplicates"] += n - times.size
+        self.stats["replaced"] += replaced
+        self.stats["appended"] += times.size - replaced
+        self.stats["batches"] += 1
@@ -0,0 +1,172 @@
+"""Job status notifications published by the Celery worker and fanned out to API subscribers."""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_BACKEND = os.getenv("JOB_EVENTS_BACKEND", "redis")  # "redis" or "memory"
+JOB_EVENTS_REDIS_URL = os.getenv("JOB_EVENTS_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"))
+JOB_EVENTS_CHANNEL = "celery-job-events"
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED")
+LISTENER_RESTART_SECONDS = 1.0  # delay before a failed Redis listener is restarted, doubling while it keeps failing
+LISTENER_RESTART_MAX_SECONDS = 60.0
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+
+class JobEventsUnavailable(RuntimeError):
+    """The job event bus could not subscribe, so a stream would miss changes."""
+
+
+def job_event(job) -> Dict[str, Any]:
+    """Snapshot the notification-relevant fields of a ``CeleryJob`` row."""
+    updated_at = job.updated_at or datetime.utcnow()
+    return {
+        "job_id": job.id,
+        "batch_id": job.batch_id,
+        "status": job.status,
+        "progress": job.progress,
+        "updated_at": updated_at.isoformat(),
+    }
+
+
+class JobEventBus:
+    """
+    In-process job event bus.
+
+    Subscribers are asyncio queues; publishing is thread-safe, so events can come
+    from request threads or tests as well as the event loop. This class is the
+    fake used when ``JOB_EVENTS_BACKEND=memory``; :class:`RedisJobEventBus`
+    carries events across processes.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._deliver(event)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for loop, queue in list(self._subscribers):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def _fail(self, reason: str) -> None:
+        """End every open stream with an error event; their clients reconnect and re-read the current state."""
+        self._deliver({"error": reason})
+        self._subscribers = set()
+
+    async def subscribe(self) -> asyncio.Queue:
+        """Register a queue that receives every event published from now on."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+
+class RedisJobEventBus(JobEventBus):
+    """
+    Job event bus over Redis pub/sub.
+
+    The worker publishes with a plain Redis client. Each API process holds a
+    single subscription and fans events out to its local queues, so the number
+    of Redis connections does not grow with the number of open streams.
+    """
+
+    def __init__(self, url: str = JOB_EVENTS_REDIS_URL, channel: str = JOB_EVENTS_CHANNEL):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self._publisher: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._failures = 0  # consecutive listener failures without a confirmed subscription
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        if self._publisher is None:
+            self._publisher = redis.Redis.from_url(self.url)
+        self._publisher.publish(self.channel, json.dumps(event))
+
+    async def subscribe(self) -> asyncio.Queue:
+        """
+        Register a queue once the Redis subscription is confirmed, so every event published afterwards reaches it.
+
+        Raises JobEventsUnavailable when Redis does not confirm in time.
+        """
+        if self._listener is None or self._listener.done():
+            self._start_listener()
+        listener, ready = self._listener, self._ready
+        queue = await super().subscribe()
+        if not ready.is_set():
+            waiter = asyncio.ensure_future(ready.wait())
+            await asyncio.wait({waiter, listener}, timeout=SUBSCRIBE_TIMEOUT_SECONDS,
+                               return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not ready.is_set():
+                self.unsubscribe(queue)
+                raise JobEventsUnavailable("Could not subscribe to job events")
+        return queue
+
+    def _start_listener(self) -> None:
+        self._ready = asyncio.Event()
+        self._listener = asyncio.ensure_future(self._listen(self._ready))
+        self._listener.add_done_callback(self._listener_done)
+
+    def _listener_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        # Redis went away or the listener crashed: open streams would only send keep-alives from here on
+        error = task.exception()
+        delay = min(LISTENER_RESTART_SECONDS * 2 ** self._failures, LISTENER_RESTART_MAX_SECONDS)
+        self._failures += 1
+        logger.error("Job event listener stopped; restarting in %.0f s", delay,
+                     exc_info=(type(error), error, error.__traceback__) if error else None)
+        self._fail("Job event subscription lost")
+        asyncio.get_running_loop().call_later(delay, self._restart, task)
+
+    def _restart(self, failed: asyncio.Task) -> None:
+        # A subscribe() in the meantime may already have started a new listener
+        if self._listener is failed:
+            self._start_listener()
+
+    async def _listen(self, ready: asyncio.Event) -> None:
+        client = aioredis.from_url(self.url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            async for message in pubsub.listen():
+                if message["type"] == "subscribe":
+                    ready.set()  # the server confirmed the subscription
+                    self._failures = 0
+                elif message["type"] == "message":
+                    self._deliver(json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_bus: Optional[JobEventBus] = None
+
+
+def get_job_event_bus() -> JobEventBus:
+    """Return the process-wide bus selected by ``JOB_EVENTS_BACKEND``."""
+    global _bus
+    if _bus is None:
+        _bus = RedisJobEventBus() if JOB_EVENTS_BACKEND == "redis" else JobEventBus()
+    return _bus
+
+
+def publish_job_event(job) -> None:
+    """Publish a job's current state; a notification failure never fails the job itself."""
+    try:
+        get_job_event_bus().publish(job_event(job))
+    except Exception:
+        logger.exception("Could not publish status event for job %s", job.id)
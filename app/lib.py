@@ -1,3 +1,128 @@
+import numpy as np
+
+
+def window_start_mask(exceedance_mask, task_durations):
+    """
+    Flag the indices where a window of consecutive non-exceeding points can start.
+
+    A window of ``d`` points starting at ``i`` is clear when the running count of
+    exceedances does not change between ``i`` and ``i + d``, so every row is
+    resolved in a single cumulative-sum pass regardless of the window length.
+
+    Args:
+        exceedance_mask (array-like of bool): Shape ``(..., n)``; True where a limit is exceeded
+        task_durations (int or array-like of int): Window length (number of consecutive
+            data points), broadcast against the leading dimensions of ``exceedance_mask``
+
+    Returns:
+        numpy.ndarray: Boolean array of shape ``(..., n)``, True where a full-length
+            window starting at that index contains no exceedance
+    """
+    exceedance = np.asarray(exceedance_mask, dtype=bool)
+    n = exceedance.shape[-1]
+    lead_shape = exceedance.shape[:-1]
+    durations = np.broadcast_to(np.asarray(task_durations, dtype=np.int64), lead_shape)
+    if np.any(durations < 1):
+        raise ValueError("task_duration must be at least one data point")
+
+    # counts[..., k] = number of exceedances among the first k points
+    counts = np.zeros(lead_shape + (n + 1,), dtype=np.int64)
+    np.cumsum(exceedance, axis=-1, out=counts[..., 1:])
+
+    ends = np.arange(n) + durations[..., None]
+    in_range = ends <= n
+    window_counts = np.take_along_axis(counts, np.minimum(ends, n), axis=-1)
+    return in_range & (window_counts == counts[..., :n])
+
+
+def wow_analysis_batch(wave_height_series, task_durations, wave_height_limits):
+    """
+    Run the weather-window analysis for many (duration, limit) pairs in one pass.
+
+    Args:
+        wave_height_series (array-like): Wave height values, shape ``(n,)``
+        task_durations (int or array-like of int): Required durations (number of
+            consecutive data points), shape ``(k,)`` or scalar
+        wave_height_limits (float or array-like of float): Maximum acceptable wave
+            heights, shape ``(k,)`` or scalar
+
+    Returns:
+        tuple: (go_no_go_signals, start_indices)
+            - go_no_go_signals: Boolean array of shape ``(k, n)``, one row per pair
+            - start_indices: List of ``k`` integer arrays with the valid start indices
+    """
+    series = np.asarray(wave_height_series, dtype=float)
+    durations, limits = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(task_durations, dtype=np.int64)),
+        np.atleast_1d(np.asarray(wave_height_limits, dtype=float)),
+    )
+
+    # Comparisons are kept separate so NaN points behave exactly like the reference
+    # loop: never a "go" signal, but never breaking a window either.
+    go_no_go = series[None, :] <= limits[:, None]
+    exceedance = series[None, :] > limits[:, None]
+    start_mask = window_start_mask(exceedance, durations)
+
+    start_indices = [np.flatnonzero(row) for row in start_mask]
+    return go_no_go, start_indices
+
+
+def ensemble_window_probabilities(ensemble_series, task_durations, wave_height_limits):
+    """
+    Probabilistic weather-window analysis over all ensemble members in one pass.
+
+    Every member is analysed like a deterministic series, for every (duration,
+    limit) pair at once, and the per-member outcomes are averaged.
+
+    Args:
+        ensemble_series (array-like): Wave height values, shape ``(m, n)`` for ``m``
+            members; a 1-D series counts as a single member
+        task_durations (int or array-like of int): Required durations (number of
+            consecutive data points), shape ``(k,)`` or scalar
+        wave_height_limits (float or array-like of float): Maximum acceptable wave
+            heights, shape ``(k,)`` or scalar
+
+    Returns:
+        tuple: (p_go, p_window)
+            - p_go: Array of shape ``(k, n)``, fraction of members within the limit at each point
+            - p_window: Array of shape ``(k, n)``, fraction of members in which a full
+              window can start at each point
+    """
+    series = np.atleast_2d(np.asarray(ensemble_series, dtype=float))
+    durations, limits = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(task_durations, dtype=np.int64)),
+        np.atleast_1d(np.asarray(wave_height_limits, dtype=float)),
+    )
+
+    # (k, m, n) masks; NaN points are neither "go" nor an exceedance, as in wow_analysis_batch
+    go = series[None, :, :] <= limits[:, None, None]
+    exceedance = series[None, :, :] > limits[:, None, None]
+    return window_probabilities(go, exceedance, durations)
+
+
+def window_probabilities(go_mask, exceedance_mask, task_durations):
+    """
+    Average per-member go/no-go and window starts into probabilities.
+
+    Args:
+        go_mask (array-like of bool): Shape ``(k, m, n)``; True where task ``k`` may be
+            worked at point ``n`` of member ``m``
+        exceedance_mask (array-like of bool): Shape ``(k, m, n)``; True where a limit is exceeded
+        task_durations (array-like of int): Required durations (number of points), shape ``(k,)``
+
+    Returns:
+        tuple: (p_go, p_window), arrays of shape ``(k, n)``; see :func:`ensemble_window_probabilities`
+    """
+    go = np.asarray(go_mask, dtype=bool)
+    members = go.shape[1]
+    durations = np.asarray(task_durations, dtype=np.int64).reshape(-1, 1)
+    start_mask = window_start_mask(exceedance_mask, durations)
+
+    p_go = np.count_nonzero(go, axis=1) / members
+    p_window = np.count_nonzero(start_mask, axis=1) / members
+    return p_go, p_window
+
+
 def wow_analysis(wave_height_series, task_duration, wave_height_limit):
     """
     Analyze wave height series to identify suitable windows for task execution.
@@ -13,23 +138,127 @@ def wow_analysis(wave_height_series, task_duration, wave_height_limit):
             - start_indices: List of indices where task can be started (beginning of valid windows)
     """
     n = len(wave_height_series)
-    go_no_go_signals = []
-    start_indices = []
-
-    # Generate go/no-go signals for each data point
-    for i in range(n):
-        go_no_go_signals.append(wave_height_series[i] <= wave_height_limit)
-
-    # Find valid start indices for task execution
-    for i in range(n - task_duration + 1):
-        # Check if the next task_duration points all satisfy the wave height limit
-        valid_window = True
-        for j in range(task_duration):
-            if wave_height_series[i + j] > wave_height_limit:
-                valid_window = False
-                break
-
-        if valid_window:
-            start_indices.append(i)
-
-    return go_no_go_signals, start_indices
\ No newline at end of file
+    if n == 0 or task_duration < 1:
+        # Degenerate windows: every index up to n - task_duration trivially qualifies
+        go_no_go_signals = [value <= wave_height_limit for value in wave_height_series]
+        return go_no_go_signals, list(range(max(n - task_duration + 1, 0)))
+
+    go_no_go, start_indices = wow_analysis_batch(wave_height_series, task_duration, wave_height_limit)
+    return go_no_go[0].tolist(), start_indices[0].tolist()
+
+
+def next_start_index(start_mask):
+    """
+    For every index, find the first allowed start at or after it.
+
+    Args:
+        start_mask (array-like of bool): Shape ``(..., n)``; True where a window may start
+
+    Returns:
+        numpy.ndarray: Integer array of shape ``(..., n + 1)``; ``n`` where no start remains,
+            with a trailing sentinel so an earliest time equal to ``n`` can be looked up
+    """
+    mask = np.asarray(start_mask, dtype=bool)
+    n = mask.shape[-1]
+    candidates = np.full(mask.shape[:-1] + (n + 1,), n, dtype=np.int64)
+    candidates[..., :n] = np.where(mask, np.arange(n), n)
+    # Running minimum from the right: one reverse pass per task
+    return np.minimum.accumulate(candidates[..., ::-1], axis=-1)[..., ::-1]
+
+
+def topological_order(predecessors):
+    """
+    Order tasks so every task comes after its predecessor.
+
+    Args:
+        predecessors (list): Position of each task's predecessor in the same list, or None
+
+    Returns:
+        list: Task positions in dependency order
+    """
+    children = [[] for _ in predecessors]
+    roots = []
+    for i, p in enumerate(predecessors):
+        if p is None:
+            roots.append(i)
+        else:
+            children[p].append(i)
+
+    order = []
+    stack = roots[::-1]
+    while stack:
+        i = stack.pop()
+        order.append(i)
+        stack.extend(children[i][::-1])
+    if len(order) != len(predecessors):
+        raise ValueError("predecessor graph contains a cycle")
+    return order
+
+
+def chain_schedule(wave_height_series, task_durations, wave_height_limits, predecessors, earliest_starts=None):
+    """
+    Find the earliest weather-feasible start for every task in a predecessor graph.
+
+    Every task needs ``task_durations[k]`` consecutive points at or below its own
+    limit, and may not start before its predecessor ends. Feasibility arrays for
+    all tasks are computed up front, so the walk over the graph is a single
+    lookup per task and the total cost is linear in horizon x tasks.
+
+    Args:
+        wave_height_series (array-like): Wave height values, shape ``(n,)``
+        task_durations (array-like of int): Duration of each task (number of points)
+        wave_height_limits (array-like of float): Maximum acceptable wave height per task
+        predecessors (list): Position of each task's predecessor in the same list, or None
+        earliest_starts (array-like of int, optional): Earliest allowed start index per task
+
+    Returns:
+        tuple: (start_indices, end_indices)
+            - start_indices: Integer array, -1 where the task cannot be fitted in the horizon
+            - end_indices: Integer array (exclusive end), -1 where the task cannot be fitted
+    """
+    series = np.asarray(wave_height_series, dtype=float)
+    limits = np.asarray(wave_height_limits, dtype=float)
+    exceedance = series[None, :] > limits[:, None]
+    return chain_schedule_masks(exceedance, task_durations, predecessors, earliest_starts)
+
+
+def chain_schedule_masks(exceedance_mask, task_durations, predecessors, earliest_starts=None):
+    """
+    :func:`chain_schedule` on precomputed per-task exceedances instead of wave height limits.
+
+    Args:
+        exceedance_mask (array-like of bool): Shape ``(k, n)``; True where task ``k``'s
+            criteria fail at point ``n``
+        task_durations (array-like of int): Duration of each task (number of points)
+        predecessors (list): Position of each task's predecessor in the same list, or None
+        earliest_starts (array-like of int, optional): Earliest allowed start index per task
+
+    Returns:
+        tuple: (start_indices, end_indices), as for :func:`chain_schedule`
+    """
+    durations = np.asarray(task_durations, dtype=np.int64)
+    k = durations.shape[0]
+    exceedance = np.asarray(exceedance_mask, dtype=bool).reshape(k, -1)
+    n = exceedance.shape[1]
+    if earliest_starts is None:
+        earliest_starts = np.zeros(k, dtype=np.int64)
+
+    starts = np.full(k, -1, dtype=np.int64)
+    ends = np.full(k, -1, dtype=np.int64)
+    if k == 0:
+        return starts, ends
+
+    next_start = next_start_index(window_start_mask(exceedance, durations))
+    for t in topological_order(predecessors):
+        earliest = int(earliest_starts[t])
+        p = predecessors[t]
+        if p is not None:
+            if ends[p] < 0:
+                continue  # predecessor never fits, so neither does this task
+            earliest = max(earliest, int(ends[p]))
+        if earliest > n:
+            continue
+        start = int(next_start[t, earliest])
+        if start < n:
+            starts[t], ends[t] = start, start + int(durations[t])
+    return starts, ends
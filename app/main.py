@@ -1,15 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.api import schedule
 from app.api import celeri_worker
 from app.api import external_weather
+from app.api import metrics
 from app.init_mock_schedule_db import init_db_demo
+from app.metrics import MetricsMiddleware
+from app.weather_client import WeatherClient
+import os
 
-app = FastAPI()
+# Demo seeding; set SEED_DEMO_DB=0 against a real database, DEMO_RESET=1 to wipe and reseed
+SEED_DEMO_DB = os.getenv("SEED_DEMO_DB", "1") == "1"
+DEMO_RESET = os.getenv("DEMO_RESET", "0") == "1"
+
+# Gzip responses of at least this many bytes for clients that accept it; 0 turns compression off
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "0"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Skipped when the database is already at the current schema version
+    if SEED_DEMO_DB:
+        await run_in_threadpool(init_db_demo, force=DEMO_RESET)
+    # One pooled weather client (and forecast cache) for the app lifetime
+    app.state.weather_client = WeatherClient.create()
+    yield
+    await app.state.weather_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+if GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+app.add_middleware(MetricsMiddleware)
 app.include_router(schedule.router)
 app.include_router(celeri_worker.router)
 app.include_router(external_weather.router)
-
-init_db_demo()
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,166 @@
+"""Prometheus metrics: request and per-stage latency histograms, and Celery job durations."""
+
+import threading
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Tuple
+
+from prometheus_client import Histogram
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.job_events import TERMINAL_STATUSES
+from app.models.celery_job import CeleryJob
+
+# Seconds; request stages range from microseconds (analysis) to the weather call timeout
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+JOB_FOLD_BATCH_SIZE = 5000
+# How far behind the newest folded job a scrape looks again, for jobs whose commit landed after a later one
+JOB_FOLD_GRACE = timedelta(seconds=60)
+
+SCHEDULE_STAGES = ("db", "weather", "resample", "analysis", "serialize")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "schedule_stage_duration_seconds", "Time spent per stage of the scheduling endpoints",
+    ["endpoint", "stage"], buckets=LATENCY_BUCKETS,
+)
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_job_queue_wait_seconds", "Time from job submission until a worker started it",
+    ["status"], buckets=JOB_BUCKETS,
+)
+JOB_RUN_SECONDS = Histogram(
+    "celery_job_run_duration_seconds", "Worker run time of finished jobs",
+    ["status"], buckets=JOB_BUCKETS,
+)
+
+
+class _Stage:
+    """Context manager observing its elapsed time; lighter than ``Histogram.time()``."""
+
+    __slots__ = ("_observe", "_start")
+
+    def __init__(self, observe: Callable[[float], None]):
+        self._observe = observe
+
+    def __enter__(self):
+        self._start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._observe(perf_counter() - self._start)
+
+
+class StageTimer:
+    """
+    Stage timings of one endpoint.
+
+    The labelled histogram children are bound once at import, so timing a stage
+    (``with WINDOW_STAGES("db"): ...``) costs about a microsecond.
+    """
+
+    def __init__(self, endpoint: str, stages: Iterable[str] = SCHEDULE_STAGES):
+        self.endpoint = endpoint
+        self._observe = {stage: STAGE_SECONDS.labels(endpoint, stage).observe for stage in stages}
+
+    def __call__(self, stage: str) -> _Stage:
+        return _Stage(self._observe[stage])
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request.
+
+    Requests are labelled by route template (``/schedule/tasks/{job_id}/events``
+    rather than the concrete path) so the label set stays bounded; unmatched
+    paths share the ``<unmatched>`` label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], route.path if route is not None else "<unmatched>", str(status)
+            ).observe(perf_counter() - start)
+
+
+class JobDurationCollector:
+    """
+    Folds finished Celery jobs into the queue-wait and run-time histograms.
+
+    Each call reads the jobs that finished since the previous call, walking
+    ``(updated_at, id)`` as a keyset from the newest ``updated_at`` folded so far.
+    A worker stamps ``updated_at`` before its transaction commits, so a job can
+    become visible after a later one was already folded. Every call therefore
+    starts ``grace`` before that watermark and skips the ids it has already
+    observed in this trailing window, so the cost per scrape is proportional to
+    the jobs finished in between plus those of the last ``grace``. Durations
+    come from the timestamps the worker writes: queue wait is
+    ``started_at - created_at`` and run time is ``updated_at - started_at``. The
+    watermark starts at process start, so a restart does not replay history.
+    """
+
+    def __init__(self, since: datetime = None, grace: timedelta = JOB_FOLD_GRACE):
+        self._since = since or datetime.utcnow()
+        self._watermark = self._since
+        self._grace = grace
+        self._recent: Dict[int, datetime] = {}  # job id -> updated_at, for the jobs folded within the grace window
+        self._lock = threading.Lock()
+
+    def collect(self, db: Session) -> int:
+        """Observe jobs finished since the last call; returns how many were folded in."""
+        folded = 0
+        with self._lock:
+            cursor: Tuple[datetime, int] = (max(self._since, self._watermark - self._grace), 0)
+            while True:
+                rows = db.execute(
+                    select(CeleryJob.id, CeleryJob.status, CeleryJob.created_at, CeleryJob.started_at,
+                           CeleryJob.updated_at)
+                    .where(CeleryJob.status.in_(TERMINAL_STATUSES))
+                    .where(tuple_(CeleryJob.updated_at, CeleryJob.id) > tuple_(*cursor))
+                    .order_by(CeleryJob.updated_at, CeleryJob.id)
+                    .limit(JOB_FOLD_BATCH_SIZE)
+                ).all()
+                for job_id, status, created_at, started_at, updated_at in rows:
+                    if job_id in self._recent:
+                        continue
+                    self._recent[job_id] = updated_at
+                    folded += 1
+                    # Jobs that failed before a worker picked them up have no start time
+                    if started_at is not None:
+                        JOB_QUEUE_WAIT_SECONDS.labels(status).observe((started_at - created_at).total_seconds())
+                        JOB_RUN_SECONDS.labels(status).observe((updated_at - started_at).total_seconds())
+                if rows:
+                    cursor = (rows[-1].updated_at, rows[-1].id)
+                    self._watermark = max(self._watermark, rows[-1].updated_at)
+                if len(rows) < JOB_FOLD_BATCH_SIZE:
+                    break
+            horizon = self._watermark - self._grace
+            self._recent = {job_id: updated for job_id, updated in self._recent.items() if updated >= horizon}
+        return folded
+
+
+job_duration_collector = JobDurationCollector()
+
@@ -1,4 +1,9 @@
 # app/models/__init__.py
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# JSONB on PostgreSQL (indexable, no re-parsing on read); plain JSON elsewhere, e.g. SQLite in tests
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
\ No newline at end of file
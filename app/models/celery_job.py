@@ -1,18 +1,28 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime, Index
 from datetime import datetime
-from app.models import Base
+from app.models import Base, JSONDocument
 
 class CeleryJob(Base):
     __tablename__ = "celery_job"
+    __table_args__ = (
+        # Serves status filters and the (created_at, id) keyset listing of recent jobs
+        Index("ix_celery_job_status_created_at", "status", "created_at"),
+        # Lets /metrics fold in only the jobs finished since its previous scrape
+        Index("ix_celery_job_updated_at", "updated_at"),
+    )
+
     id = Column(Integer, primary_key=True)
 
-    # Store params as JSON (string) – safer than trying to enforce a schema here.
-    params = Column(Text, nullable=False)
+    # Store params as a JSON document – safer than trying to enforce a schema here.
+    params = Column(JSONDocument, nullable=False)
     status = Column(String(32), nullable=False, default="PENDING")
-    result = Column(Text, nullable=True)
+    progress = Column(Integer, nullable=False, default=0)  # percent complete, written by the worker
+    batch_id = Column(String(36), nullable=True, index=True)  # set for jobs submitted through submit_batch
+    result = Column(JSONDocument, nullable=True)
     error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)  # set by the worker when it picks the job up
     updated_at = Column(DateTime, default=datetime.utcnow,
                          onupdate=datetime.utcnow, nullable=False)
 
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from app.models import Base
+from app.models import Base, JSONDocument
 
 class Task(Base):
     __tablename__ = "task"
@@ -7,6 +7,8 @@ class Task(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String)
     duration = Column(String)
-    predecessor = Column(Integer, ForeignKey("task.id"), nullable=True)
+    predecessor = Column(Integer, ForeignKey("task.id"), nullable=True, index=True)
     status = Column(String)
-    wave_height_limit = Column(Float)
\ No newline at end of file
+    wave_height_limit = Column(Float)
+    # Operability criteria document (see app.criteria); when NULL the task is limited by wave_height_limit alone
+    criteria = Column(JSONDocument, nullable=True)
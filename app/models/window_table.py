@@ -0,0 +1,36 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+from datetime import datetime
+from app.models import Base, JSONDocument
+
+class ForecastSnapshot(Base):
+    """The hourly forecast a prefetch run analysed at one location, identified by a content hash."""
+    __tablename__ = "forecast_snapshot"
+    __table_args__ = (UniqueConstraint("lat", "lon", name="uq_forecast_snapshot_location"),)
+
+    id = Column(Integer, primary_key=True)
+    lat = Column(Float, nullable=False)  # rounded like the forecast cache key
+    lon = Column(Float, nullable=False)
+    version = Column(String(64), nullable=False)  # sha256 of the fetched forecast
+    horizon_start = Column(Integer, nullable=False)  # Unix seconds covered by the fetch
+    horizon_end = Column(Integer, nullable=False)
+    members = Column(Integer, nullable=False, default=0)  # ensemble members; 0 when deterministic
+    times = Column(LargeBinary, nullable=False)  # hourly bucket epochs, little-endian int64
+    variables = Column(JSONDocument, nullable=False)  # names of the rows of ``values``
+    values = Column(LargeBinary, nullable=False)  # (variables, hours) little-endian float64, ensemble mean
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # last run that saw this version
+
+class TaskWindow(Base):
+    """Precomputed go/no-go and window starts of one task on a forecast snapshot, as packed bit arrays."""
+    __tablename__ = "task_window"
+
+    task_id = Column(Integer, ForeignKey("task.id", ondelete="CASCADE"), primary_key=True)
+    snapshot_id = Column(Integer, ForeignKey("forecast_snapshot.id", ondelete="CASCADE"), primary_key=True,
+                         index=True)
+    version = Column(String(64), nullable=False)  # snapshot version the bits were computed from
+    task_signature = Column(String(64), nullable=False)  # hash of duration, wave_height_limit and criteria
+    go = Column(LargeBinary, nullable=False)  # np.packbits, aligned with the snapshot hours
+    exceedance = Column(LargeBinary, nullable=False)
+    starts = Column(LargeBinary, nullable=False)
+    p_go = Column(LargeBinary, nullable=True)  # little-endian float64; ensembles only
+    p_window = Column(LargeBinary, nullable=True)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
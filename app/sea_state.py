@@ -0,0 +1,181 @@
+"""Irregular sea-state simulation from a JONSWAP spectrum, chunked for parallel execution."""
+
+import math
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import billiard
+import numpy as np
+
+CHUNK_SAMPLES = 8192  # samples per chunk; bounds the (samples x frequencies) working array
+# Pool size per simulation. Every prefork Celery child runs its own pool, so the default keeps one process per
+# job; raise it to about cpu_count // worker concurrency when a worker runs few long simulations at a time.
+DEFAULT_WORKERS = int(os.getenv("SIM_WORKERS", "1"))
+
+
+def jonswap_spectrum(omega: np.ndarray, hs: float, tp: float, gamma: float = 3.3) -> np.ndarray:
+    """
+    JONSWAP wave spectrum S(omega) [m^2 s/rad] for significant height ``hs`` [m] and peak period ``tp`` [s].
+
+    Uses the Pierson-Moskowitz shape with a peak enhancement ``gamma`` and the
+    usual normalisation ``1 - 0.287 ln(gamma)`` so the spectrum keeps ``m0 = hs^2 / 16``.
+    """
+    omega = np.asarray(omega, dtype=float)
+    wp = 2 * np.pi / tp
+    sigma = np.where(omega <= wp, 0.07, 0.09)
+    pm = 5.0 / 16.0 * hs ** 2 * wp ** 4 * omega ** -5 * np.exp(-1.25 * (omega / wp) ** -4)
+    peak = gamma ** np.exp(-0.5 * ((omega - wp) / (sigma * wp)) ** 2)
+    return (1 - 0.287 * np.log(gamma)) * pm * peak
+
+
+class SeaStateSimulation:
+    """
+    Linear random-phase simulation of the surface elevation for one sea state.
+
+    The surface is a sum of harmonic components with JONSWAP amplitudes and
+    seeded random phases, so any time chunk can be evaluated independently and
+    the chunks join into one continuous record.
+    """
+
+    def __init__(self, hs: float, tp: float, duration: float, dt: float = 0.1, gamma: float = 3.3,
+                 n_freq: int = 256, seed: int = 0):
+        if hs <= 0 or tp <= 0 or duration <= 0 or dt <= 0:
+            raise ValueError("HS, TP, SimLength and dt must be positive")
+        if not 1 <= gamma <= 10:
+            raise ValueError("gamma must be between 1 and 10")
+
+        wp = 2 * np.pi / tp
+        self.omega = np.linspace(0.3 * wp, 5.0 * wp, n_freq)
+        d_omega = self.omega[1] - self.omega[0]
+        self.amplitude = np.sqrt(2 * jonswap_spectrum(self.omega, hs, tp, gamma) * d_omega)
+        self.phase = np.random.default_rng(seed).uniform(0, 2 * np.pi, n_freq)
+        self.dt = dt
+        self.n_samples = int(math.ceil(duration / dt))
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "SeaStateSimulation":
+        """Build a simulation from job params such as ``{"HS": 2, "TP": 9, "SimLength": 200}`` (metres, seconds)."""
+        try:
+            return cls(
+                hs=float(params["HS"]),
+                tp=float(params["TP"]),
+                duration=float(params["SimLength"]),
+                dt=float(params.get("dt", 0.1)),
+                gamma=float(params.get("gamma", 3.3)),
+                n_freq=int(params.get("n_freq", 256)),
+                seed=int(params.get("seed", 0)),
+            )
+        except KeyError as e:
+            raise ValueError(f"Missing parameter {e}")
+
+    def chunks(self, chunk_samples: int = CHUNK_SAMPLES) -> List[Tuple[int, int]]:
+        """Split the record into ``(first_sample, n_samples)`` chunks."""
+        return [(i, min(chunk_samples, self.n_samples - i)) for i in range(0, self.n_samples, chunk_samples)]
+
+    def elevation(self, first_sample: int, n_samples: int) -> np.ndarray:
+        """Surface elevation [m] for ``n_samples`` samples starting at ``first_sample``."""
+        t = (first_sample + np.arange(n_samples)) * self.dt
+        return np.cos(np.outer(t, self.omega) + self.phase) @ self.amplitude
+
+    def chunk_statistics(self, chunk: Tuple[int, int]) -> Dict[str, float]:
+        """Mergeable statistics of one chunk; see :func:`merge_statistics`."""
+        first_sample, n_samples = chunk
+        # One extra leading sample so an up-crossing on the chunk boundary is counted exactly once
+        lead = 1 if first_sample > 0 else 0
+        eta = self.elevation(first_sample - lead, n_samples + lead)
+        body = eta[lead:]
+        return {
+            "n": float(n_samples),
+            "sum": float(body.sum()),
+            "sum_sq": float(np.dot(body, body)),
+            "max": float(body.max()),
+            "min": float(body.min()),
+            "upcrossings": float(np.count_nonzero((eta[:-1] < 0) & (eta[1:] >= 0))),
+        }
+
+
+def merge_statistics(parts: Iterable[Dict[str, float]], dt: float) -> Dict[str, float]:
+    """Combine chunk statistics into record statistics (Hs estimate, mean zero-crossing period, extremes)."""
+    parts = list(parts)
+    n = sum(p["n"] for p in parts)
+    mean = sum(p["sum"] for p in parts) / n
+    variance = max(sum(p["sum_sq"] for p in parts) / n - mean ** 2, 0.0)
+    upcrossings = sum(p["upcrossings"] for p in parts)
+    return {
+        "samples": int(n),
+        "mean": mean,
+        "std": math.sqrt(variance),
+        "hs_estimate": 4 * math.sqrt(variance),
+        "tz_estimate": n * dt / upcrossings if upcrossings else None,
+        "max_crest": max(p["max"] for p in parts),
+        "min_trough": min(p["min"] for p in parts),
+        "upcrossings": int(upcrossings),
+    }
+
+
+def _chunk_statistics(args):
+    # Module-level so it can be pickled to pool workers
+    simulation, chunk = args
+    return simulation.chunk_statistics(chunk)
+
+
+_pools: Dict[int, Any] = {}  # worker count -> pool of this process
+_pools_pid: Optional[int] = None
+_pools_lock = threading.Lock()
+
+
+def process_pool(workers: int):
+    """
+    The process-wide pool of ``workers`` processes, started on first use and reused by later simulations.
+
+    Tearing a billiard pool down takes from one to about thirty seconds (its
+    handler threads poll, and workers wait for their results to be acknowledged),
+    so a pool per simulation would cost more than the simulation itself.
+    """
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # A forked child (e.g. a prefork Celery worker) must not use its parent's pool
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if workers not in _pools:
+            # billiard (Celery's multiprocessing fork) may start children from daemonic worker processes
+            _pools[workers] = billiard.Pool(workers)
+        return _pools[workers]
+
+
+def run_simulation(params: Dict[str, Any], workers: Optional[int] = None, chunk_samples: int = CHUNK_SAMPLES,
+                   progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    """
+    Simulate the sea state described by ``params`` and return its statistics.
+
+    Chunks are spread over the process pool when there is more than one chunk
+    and more than one worker. ``progress`` is called with the completed
+    percentage each time a chunk finishes.
+    """
+    simulation = SeaStateSimulation.from_params(params)
+    chunks = simulation.chunks(chunk_samples)
+    workers = min(workers or DEFAULT_WORKERS, len(chunks))
+
+    if workers <= 1:
+        results = map(_chunk_statistics, ((simulation, c) for c in chunks))
+    else:
+        # One job per chunk rather than imap: billiard acknowledges results per job, and a worker holding
+        # unacknowledged map results stalls the pool's eventual shutdown for 30 s
+        done = queue.Queue()
+        pool = process_pool(workers)
+        for c in chunks:
+            pool.apply_async(_chunk_statistics, ((simulation, c),), callback=done.put, error_callback=done.put)
+        results = (done.get() for _ in chunks)
+
+    parts = []
+    for part in results:
+        if isinstance(part, BaseException):
+            raise part
+        parts.append(part)
+        if progress is not None:
+            progress(int(100 * len(parts) / len(chunks)))
+
+    return merge_statistics(parts, simulation.dt)
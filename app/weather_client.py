@@ -0,0 +1,169 @@
+"""Pooled client for the external weather service with a TTL/LRU forecast cache."""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from app.forecast_store import ForecastStore
+
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "http://localhost:8020/weather-service/weather")
+CACHE_TTL_SECONDS = float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "600"))
+CACHE_MAX_STALE_SECONDS = float(os.getenv("FORECAST_CACHE_MAX_STALE_SECONDS", "21600"))
+CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "256"))
+LOCATION_DECIMALS = 2  # ~1 km; sites closer than this share a cache entry
+MAX_LOOKAHEAD_HOURS = 168
+
+CacheKey = Tuple[float, float, int]
+
+
+class WeatherAPIError(Exception):
+    """Raised when the weather service cannot deliver a forecast and no stale copy exists."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ForecastCache:
+    """
+    Size-bounded LRU cache of forecasts with a freshness TTL and single-flight fills.
+
+    Concurrent misses for the same key share one in-flight fetch. When a refresh
+    fails, the newest entry for the same location is served instead, as long as
+    it is younger than ``max_stale_seconds``.
+    """
+
+    def __init__(self, fetch: Callable[[CacheKey], Awaitable[ForecastStore]], ttl_seconds: float = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES, max_stale_seconds: float = CACHE_MAX_STALE_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_stale_seconds = max_stale_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, ForecastStore]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.errors = 0
+        self.evictions = 0
+
+    async def get(self, key: CacheKey) -> ForecastStore:
+        """Return the forecast for ``key``, fetching it at most once across concurrent callers."""
+        entry = self._entries.get(key)
+        if entry is not None and self._clock() - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled request does not abort the fetch other callers wait on
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: CacheKey) -> ForecastStore:
+        try:
+            store = await self._fetch(key)
+        except Exception:
+            self.errors += 1
+            stale = self._newest_for_location(key)
+            if stale is None:
+                raise
+            self.stale_served += 1
+            return stale
+
+        self._entries[key] = (self._clock(), store)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return store
+
+    def _newest_for_location(self, key: CacheKey) -> Optional[ForecastStore]:
+        now = self._clock()
+        candidates = [
+            (fetched_at, store) for k, (fetched_at, store) in self._entries.items()
+            if k[:2] == key[:2] and now - fetched_at < self.max_stale_seconds
+        ]
+        return max(candidates, key=lambda c: c[0])[1] if candidates else None
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            "errors": self.errors,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+class WeatherClient:
+    """
+    App-lifetime weather service client sharing one pooled ``httpx.AsyncClient``.
+
+    Forecasts are fetched per rounded location and hour bucket, always covering
+    the maximum lookahead, so every request in the same hour is served from one
+    upstream call regardless of its horizon.
+    """
+
+    def __init__(self, http: httpx.AsyncClient, url: str = WEATHER_API_URL, **cache_options):
+        self._http = http
+        self.url = url
+        self.cache = ForecastCache(self._fetch, **cache_options)
+
+    @classmethod
+    def create(cls, **cache_options) -> "WeatherClient":
+        """Build a client with a connection pool sized for the API's concurrency."""
+        http = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        return cls(http, **cache_options)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    @staticmethod
+    def cache_key(lat: float, lon: float, now: datetime) -> CacheKey:
+        hour_bucket = now.replace(minute=0, second=0, microsecond=0)
+        return round(lat, LOCATION_DECIMALS), round(lon, LOCATION_DECIMALS), int(hour_bucket.timestamp())
+
+    async def forecast(self, lat: float, lon: float, now: datetime) -> ForecastStore:
+        """Return a forecast covering ``[now, now + MAX_LOOKAHEAD_HOURS]`` for the location."""
+        return await self.cache.get(self.cache_key(lat, lon, now))
+
+    @staticmethod
+    def horizon(key: CacheKey) -> Tuple[int, int]:
+        """Return the ``(from, to)`` Unix seconds fetched for a cache key."""
+        hour_start = key[2]
+        return hour_start, hour_start + int(timedelta(hours=MAX_LOOKAHEAD_HOURS + 1).total_seconds())
+
+    async def _fetch(self, key: CacheKey) -> ForecastStore:
+        lat, lon, _ = key
+        time_from, time_to = self.horizon(key)
+        params = {"location": f"{lat},{lon}", "from": time_from, "time_to": time_to}
+        try:
+            resp = await self._http.get(self.url, params=params)
+        except httpx.HTTPError as e:
+            raise WeatherAPIError(502, f"Weather API unreachable: {e}") from e
+        if resp.status_code != 200:
+            raise WeatherAPIError(resp.status_code, resp.text)
+        return ForecastStore.from_records(resp.json().get("forecast", []))
@@ -0,0 +1,299 @@
+"""Materialized window table: window analysis of the active tasks, precomputed per forecast version."""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, select
+from sqlalchemy.orm import Session
+
+from app.criteria import DEFAULT_CONFIDENCE, Criteria, evaluate_criteria, window_analysis
+from app.forecast_store import ForecastStore
+from app.lib import window_start_mask
+from app.models.schedule import Task
+from app.models.window_table import ForecastSnapshot, TaskWindow
+from app.resample import resample
+from app.weather_client import CACHE_TTL_SECONDS, LOCATION_DECIMALS
+
+HOUR_SECONDS = 3600
+
+# "lat,lon;lat,lon": the locations the beat prefetcher keeps warm
+PREFETCH_LOCATIONS = os.getenv("PREFETCH_LOCATIONS", "61.5,4.8")
+# Rows of a snapshot no prefetch run has confirmed for this long are stale; defaults to the forecast cache TTL
+WINDOW_TABLE_MAX_AGE_SECONDS = float(os.getenv("WINDOW_TABLE_MAX_AGE_SECONDS", str(CACHE_TTL_SECONDS)))
+
+# Tasks the scheduler still has to place: the ones planned by /schedule and materialized by the prefetcher
+ACTIVE_STATUSES = ("READY", "BLOCKED")
+
+# (task, duration_hours, criteria) of every task to materialize
+TaskDefinition = Tuple[Task, int, Criteria]
+
+
+def parse_hours(duration_str: str) -> int:
+    """Convert a duration string such as ``"4h"`` into an integer hour value."""
+    # expects like "4h"
+    if not duration_str.endswith("h"):
+        raise ValueError("duration must be like '4h'")
+    return int(duration_str[:-1])
+
+
+def parse_locations(spec: str) -> List[Tuple[float, float]]:
+    """Parse ``"lat,lon;lat,lon"`` into rounded ``(lat, lon)`` pairs, as used for the forecast cache keys."""
+    locations = []
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        lat, lon = part.split(",")
+        locations.append((round(float(lat), LOCATION_DECIMALS), round(float(lon), LOCATION_DECIMALS)))
+    return locations
+
+
+def forecast_version(store: ForecastStore) -> str:
+    """Content hash of a forecast: any change to an epoch or a value gives a new version."""
+    digest = hashlib.sha256(store.times.astype("<i8").tobytes())
+    for name in sorted(store.columns):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(store.columns[name], dtype="<f8").tobytes())
+    return digest.hexdigest()
+
+
+def task_signature(task: Task) -> str:
+    """Hash of the task fields the window analysis depends on."""
+    fields = [task.duration, task.wave_height_limit, task.criteria]
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+def pack_bits(mask: np.ndarray) -> bytes:
+    return np.packbits(np.asarray(mask, dtype=bool)).tobytes()
+
+
+def unpack_bits(data: bytes, n: int) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=n).astype(bool)
+
+
+def snapshot_hourly(snapshot: ForecastSnapshot) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Hour epochs and per-variable hourly values stored in a snapshot."""
+    times = np.frombuffer(snapshot.times, dtype="<i8")
+    values = np.frombuffer(snapshot.values, dtype="<f8").reshape(len(snapshot.variables), times.size)
+    return times, dict(zip(snapshot.variables, values))
+
+
+def unchanged_hours(old_times: np.ndarray, old_hourly: Dict[str, np.ndarray],
+                    times: np.ndarray, hourly: Dict[str, np.ndarray]) -> Tuple[int, int]:
+    """
+    Match a new hourly forecast against the previous snapshot.
+
+    Returns:
+        tuple: (offset, count); new hours ``[0, count)`` carry the same epochs and
+            values as old hours ``[offset, offset + count)``
+    """
+    if times.size == 0 or old_times.size == 0 or set(hourly) != set(old_hourly):
+        return 0, 0
+    offset = int(np.searchsorted(old_times, times[0]))
+    m = min(old_times.size - offset, times.size)
+    if m <= 0:
+        return offset, 0
+    same = old_times[offset:offset + m] == times[:m]
+    for name, values in hourly.items():
+        old, new = old_hourly[name][offset:offset + m], values[:m]
+        same &= (old == new) | (np.isnan(old) & np.isnan(new))
+    return offset, m if same.all() else int(np.argmin(same))
+
+
+def refresh_windows(db: Session, lat: float, lon: float, store: ForecastStore, horizon: Tuple[int, int],
+                    definitions: Sequence[TaskDefinition], now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Bring the materialized windows of one location up to date with a freshly fetched forecast.
+
+    Only the work a change requires is done:
+      - same forecast version and task fields: nothing is recomputed, the run
+        only confirms the snapshot is current;
+      - a rolled or partly changed deterministic forecast: criteria are only
+        evaluated on the hours that differ from the previous snapshot, the
+        unchanged prefix is reused from the stored bits;
+      - new or edited tasks, and every task on an ensemble: a full pass.
+    Rows of tasks that are no longer in ``definitions`` are removed. A forecast
+    with points off the full hour is not materialized at all (see below).
+
+    Args:
+        db (Session): Session; committed on return
+        lat (float): Rounded latitude of the forecast
+        lon (float): Rounded longitude of the forecast
+        store (ForecastStore): The forecast as fetched for ``horizon``
+        horizon (tuple): ``(from, to)`` Unix seconds the forecast was fetched for
+        definitions (Sequence): ``(task, duration_hours, criteria)`` of the active tasks
+        now (datetime, optional): Naive UTC time of the run
+
+    Returns:
+        dict: Counters ``tasks``, ``computed``, ``unchanged``, ``removed``, ``skipped`` and ``reused_hours``
+    """
+    now = now or datetime.utcnow()
+    version = forecast_version(store)
+    times, columns = store.query(*horizon)
+    snapshot = db.execute(
+        select(ForecastSnapshot).where(ForecastSnapshot.lat == lat, ForecastSnapshot.lon == lon).with_for_update()
+    ).scalar_one_or_none()
+    rows: Dict[int, TaskWindow] = {}
+    if snapshot is not None:
+        rows = {w.task_id: w for w in db.execute(
+            select(TaskWindow).where(TaskWindow.snapshot_id == snapshot.id)
+        ).scalars()}
+
+    signatures = [task_signature(task) for task, _, _ in definitions]
+    stats = {"tasks": len(definitions), "computed": 0, "unchanged": 0, "removed": 0, "skipped": 0,
+             "reused_hours": 0}
+    if np.any(times % HOUR_SECONDS):
+        # /schedule/window averages the points within [now, now + lookahead] per hour, so with sub-hourly points
+        # its first and last hours depend on the request time and match no stored hourly mean: serve those live
+        if rows:
+            db.execute(delete(TaskWindow).where(TaskWindow.snapshot_id == snapshot.id))
+        stats.update(removed=len(rows), skipped=len(definitions))
+        db.commit()
+        return stats
+
+    removed = set(rows) - {task.id for task, _, _ in definitions}
+    if removed:
+        db.execute(delete(TaskWindow).where(TaskWindow.snapshot_id == snapshot.id, TaskWindow.task_id.in_(removed)))
+        stats["removed"] = len(removed)
+
+    # Tasks whose stored rows already match this forecast version and their current fields
+    pending = [
+        k for k, (task, _, _) in enumerate(definitions)
+        if not (snapshot is not None and snapshot.version == version and task.id in rows
+                and rows[task.id].version == version and rows[task.id].task_signature == signatures[k])
+    ]
+    stats["unchanged"] = len(definitions) - len(pending)
+
+    if snapshot is None or snapshot.version != version:
+        hour_times, hourly = resample(times, columns, HOUR_SECONDS, how="mean")
+        members = next((values.shape[0] for values in hourly.values() if values.ndim > 1), 0)
+        mean = {name: values.mean(axis=0) if values.ndim > 1 else values for name, values in hourly.items()}
+        offset, keep = 0, 0
+        if snapshot is not None and members == 0 and snapshot.members == 0:
+            offset, keep = unchanged_hours(*snapshot_hourly(snapshot), hour_times, mean)
+        previous_version = snapshot.version if snapshot is not None else None
+        if snapshot is None:
+            snapshot = ForecastSnapshot(lat=lat, lon=lon)
+            db.add(snapshot)
+        snapshot.version, snapshot.members = version, members
+        snapshot.horizon_start, snapshot.horizon_end = horizon
+        snapshot.times = np.ascontiguousarray(hour_times, dtype="<i8").tobytes()
+        snapshot.variables = list(mean)
+        snapshot.values = np.ascontiguousarray([mean[name] for name in mean], dtype="<f8").tobytes()
+        db.flush()  # assigns the id of a new snapshot
+    else:
+        hour_times, hourly = snapshot_hourly(snapshot)
+        members, offset, keep, previous_version = snapshot.members, 0, hour_times.size, version
+        if members:
+            # Ensemble members are not stored, so edited tasks need the forecast itself
+            hour_times, hourly = resample(times, columns, HOUR_SECONDS, how="mean")
+    snapshot.refreshed_at = now
+
+    if pending:
+        n = hour_times.size
+        tasks = [definitions[k] for k in pending]
+        durations = np.array([hours for _, hours, _ in tasks], dtype=np.int64)
+        p_go = p_window = None
+        if members:
+            go, _, p_go, p_window = window_analysis(hourly, [c for _, _, c in tasks], durations, True)
+            starts, exceedance = p_window >= DEFAULT_CONFIDENCE, np.zeros_like(go)
+        else:
+            go = np.zeros((len(tasks), n), dtype=bool)
+            exceedance = np.zeros_like(go)
+            # Rows computed from the previous version of this snapshot keep their unchanged hours
+            reuse = [j for j, k in enumerate(pending) if keep and definitions[k][0].id in rows
+                     and rows[definitions[k][0].id].version == previous_version
+                     and rows[definitions[k][0].id].task_signature == signatures[k]]
+            full = sorted(set(range(len(tasks))) - set(reuse))
+            if reuse:
+                tail = {name: values[keep:] for name, values in hourly.items()}
+                go[reuse, keep:], exceedance[reuse, keep:] = evaluate_criteria([tasks[j][2] for j in reuse], tail)
+                for j in reuse:
+                    row = rows[tasks[j][0].id]
+                    go[j, :keep] = unpack_bits(row.go, offset + keep)[offset:]
+                    exceedance[j, :keep] = unpack_bits(row.exceedance, offset + keep)[offset:]
+                stats["reused_hours"] = keep
+            if full:
+                go[full], exceedance[full] = evaluate_criteria([tasks[j][2] for j in full], hourly)
+            starts = window_start_mask(exceedance, durations)
+
+        for j, k in enumerate(pending):
+            task = definitions[k][0]
+            row = rows.get(task.id)
+            if row is None:
+                row = TaskWindow(task_id=task.id, snapshot_id=snapshot.id)
+                db.add(row)
+            row.version, row.task_signature, row.computed_at = version, signatures[k], now
+            row.go, row.exceedance, row.starts = pack_bits(go[j]), pack_bits(exceedance[j]), pack_bits(starts[j])
+            row.p_go = None if p_go is None else np.ascontiguousarray(p_go[j], dtype="<f8").tobytes()
+            row.p_window = None if p_window is None else np.ascontiguousarray(p_window[j], dtype="<f8").tobytes()
+        stats["computed"] = len(pending)
+
+    db.commit()
+    return stats
+
+
+def window_table_query(task_id: int, lat: float, lon: float):
+    """
+    One indexed read of a task with its materialized window row at a location.
+
+    Rows are ``(task, window, snapshot)``; ``window`` and ``snapshot`` are None
+    when nothing was materialized for the location.
+    """
+    lat, lon = round(lat, LOCATION_DECIMALS), round(lon, LOCATION_DECIMALS)
+    return (
+        select(Task, TaskWindow, ForecastSnapshot)
+        .select_from(Task)
+        .outerjoin(ForecastSnapshot, and_(ForecastSnapshot.lat == lat, ForecastSnapshot.lon == lon))
+        .outerjoin(TaskWindow, and_(TaskWindow.task_id == Task.id, TaskWindow.snapshot_id == ForecastSnapshot.id))
+        .where(Task.id == task_id)
+    )
+
+
+def read_window(task: Task, window: Optional[TaskWindow], snapshot: Optional[ForecastSnapshot], task_hours: int,
+                time_from: int, time_to: int, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    Slice a materialized analysis to the hours ``time_from <= t <= time_to``.
+
+    Returns None, meaning "compute it live", when there is no row, the row was
+    computed for another forecast version or other task fields, no prefetch run
+    confirmed the snapshot within ``WINDOW_TABLE_MAX_AGE_SECONDS``, or the
+    snapshot does not cover the range.
+
+    Returns:
+        dict: ``hour_times``, ``hourly`` (ensemble mean), ``go_no_go``, ``start_indices``,
+            ``p_go`` and ``p_window`` (None when deterministic) and ``members``
+    """
+    now = now or datetime.utcnow()
+    if window is None or snapshot is None:
+        return None
+    if window.version != snapshot.version or window.task_signature != task_signature(task):
+        return None
+    if now - snapshot.refreshed_at > timedelta(seconds=WINDOW_TABLE_MAX_AGE_SECONDS):
+        return None
+    if time_from < snapshot.horizon_start or time_to > snapshot.horizon_end:
+        return None
+
+    times, hourly = snapshot_hourly(snapshot)
+    a = int(np.searchsorted(times, time_from, side="left"))
+    b = max(a, int(np.searchsorted(times, time_to, side="right")))
+    if a == b:
+        return None
+    n, count = times.size, b - a
+    # Starts over the whole snapshot also need the window to end inside the requested range
+    fits = np.arange(count) + task_hours <= count
+    starts = unpack_bits(window.starts, n)[a:b] & fits
+    served = {
+        "hour_times": times[a:b],
+        "hourly": {name: values[a:b] for name, values in hourly.items()},
+        "go_no_go": unpack_bits(window.go, n)[a:b],
+        "start_indices": np.flatnonzero(starts),
+        "p_go": None,
+        "p_window": None,
+        "members": snapshot.members,
+    }
+    if window.p_go is not None:
+        served["p_go"] = np.frombuffer(window.p_go, dtype="<f8")[a:b]
+        served["p_window"] = np.where(fits, np.frombuffer(window.p_window, dtype="<f8")[a:b], 0.0)
+    return served
@@ -0,0 +1,54 @@
+"""Cold start of the API process: import, lifespan startup and the first weather request.
+
+Each boot runs in a fresh interpreter against a throwaway SQLite database, so the
+first boot seeds the demo schema and the second finds it at the current version.
+Run with ``python -m benchmarks.bench_cold_start``.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BOOTS = 3
+
+# Runs in the child interpreter; prints one JSON line of stage timings in milliseconds
+BOOT_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:
+    started = time.perf_counter()
+    client.get("/weather-service/weather", params={"from": 0, "time_to": 1}).raise_for_status()
+    first_request = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1e3,
+    "startup_ms": (started - imported) * 1e3,
+    "first_weather_request_ms": (first_request - started) * 1e3,
+    "total_ms": (first_request - start) * 1e3,
+}))
+"""
+
+
+def boot(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    output = subprocess.run([sys.executable, "-c", BOOT_SCRIPT], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'cold_start.db'}"
+        for i in range(BOOTS):
+            label = "first boot (seeds schema)" if i == 0 else "restart (schema current)"
+            timings = boot(database_url)
+            print(f"{label:>26}: " + ", ".join(f"{k} {v:7.1f}" for k, v in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
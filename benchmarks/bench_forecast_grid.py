@@ -0,0 +1,55 @@
+"""Location lookup latency on a large synthetic forecast grid, in memory and memory-mapped.
+
+Run with ``python -m benchmarks.bench_forecast_grid``.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.forecast_store import ForecastGrid
+from demo_tools.generate_forecast_grid import build_forecast_grid
+
+REPEATS = 2000
+
+
+def bench_lookups(grid: ForecastGrid, label: str) -> None:
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(56.0, 66.0, REPEATS)
+    lons = rng.uniform(0.0, 10.0, REPEATS)
+    t0 = int(grid.times[0])
+    t1 = t0 + 12 * 3600
+
+    print(label)
+    for method in ("nearest", "bilinear"):
+        start = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            grid.query(lat, lon, t0, t1, method)
+        query_us = (time.perf_counter() - start) / REPEATS * 1e6
+
+        start = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            grid.records(lat, lon, t0, t1, method)
+        records_us = (time.perf_counter() - start) / REPEATS * 1e6
+        print(f"{method:>9}: query {query_us:6.1f} us, query + JSON records {records_us:6.1f} us")
+
+
+def main() -> None:
+    grid = build_forecast_grid(n_lat=100, n_lon=100, days=7, interval_minutes=60)
+    print(f"grid {grid.shape[0]}x{grid.shape[1]} points, {grid.times.size} steps")
+    bench_lookups(grid, "in memory (float64):")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npz_path, binary_path = Path(tmp) / "grid.npz", Path(tmp) / "grid.wxf"
+        np.savez(npz_path, lats=grid.lats, lons=grid.lons, times=grid.times, **grid.columns)
+        grid.to_binary(binary_path)
+        for path, load in ((npz_path, ForecastGrid.from_npz), (binary_path, ForecastGrid.from_binary)):
+            start = time.perf_counter()
+            load(path)
+            print(f"open {path.suffix}: {(time.perf_counter() - start) * 1e3:7.1f} ms, {path.stat().st_size / 1e6:6.1f} MB")
+        bench_lookups(ForecastGrid.from_binary(binary_path), "memory-mapped (float32):")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Scaling of the sea-state simulation with the number of worker processes.
+
+Run with ``python -m benchmarks.bench_sea_state [--sim-length SECONDS]``. The
+chunks are independent, so the speed-up should track the worker count until
+the machine runs out of physical cores. Every worker count is timed on an
+already started pool, as a Celery worker reuses its pool for every job.
+"""
+import argparse
+import os
+import time
+
+from app.sea_state import run_simulation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sim-length", type=float, default=6 * 3600, help="Simulated seconds (default 6 h)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    params = {"HS": 2.5, "TP": 9.0, "SimLength": args.sim_length, "dt": 0.1}
+    worker_counts = sorted({1, *(2 ** k for k in range(1, 8) if 2 ** k < args.max_workers), args.max_workers})
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'speed-up':>9} {'efficiency':>11}")
+    for workers in worker_counts:
+        # Start the process pool first: it lives as long as the worker process, so runs do not pay for it
+        run_simulation({**params, "SimLength": 60}, workers=workers, chunk_samples=100)
+        start = time.perf_counter()
+        run_simulation(params, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>9.2f} {baseline / elapsed / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-request latency of the weather range query as the forecast grows.
+
+Run with ``python -m benchmarks.bench_weather_store``. Every request asks for the
+same 12 hour window, so a flat latency column means the cost no longer depends
+on how many points the forecast holds.
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.forecast_store import ForecastStore
+
+STEP_SECONDS = 600  # 10-minute data
+WINDOW_SECONDS = 12 * 3600
+SIZES = (1_000, 10_000, 100_000, 500_000)
+REPEATS = 200
+
+
+def synthetic_store(n_points: int, start: int = 1_763_000_000) -> ForecastStore:
+    rng = np.random.default_rng(0)
+    times = start + STEP_SECONDS * np.arange(n_points, dtype=np.int64)
+    columns = {
+        "wind_speed": rng.uniform(0.0, 25.0, n_points).round(1),
+        "wave_height": rng.uniform(0.0, 4.0, n_points).round(1),
+        "wave_period": rng.uniform(5.0, 12.0, n_points).round(1),
+    }
+    return ForecastStore(times, columns)
+
+
+def legacy_scan(entries, time_from: int, time_to: int):
+    # The pre-store implementation: parse every timestamp on every request
+    return [
+        e for e in entries
+        if time_from <= datetime.fromisoformat(e["timestamp"].replace("Z", "+00:00")).timestamp() <= time_to
+    ]
+
+
+def timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main() -> None:
+    print(f"{'points':>10} {'store [us]':>12} {'legacy scan [us]':>18}")
+    for n_points in SIZES:
+        store = synthetic_store(n_points)
+        mid = int(store.times[n_points // 2])
+        store_us = timed(lambda: store.records(mid, mid + WINDOW_SECONDS), REPEATS)
+
+        legacy = "-"
+        if n_points <= 100_000:
+            entries = store.records(int(store.times[0]), int(store.times[-1]))
+            legacy = f"{timed(lambda: legacy_scan(entries, mid, mid + WINDOW_SECONDS), 3):.0f}"
+        print(f"{n_points:>10} {store_us:>12.1f} {legacy:>18}")
+
+
+if __name__ == "__main__":
+    main()
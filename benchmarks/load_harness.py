@@ -0,0 +1,155 @@
+"""In-process ASGI load harness: the API on SQLite with the weather service mounted in the same app.
+
+Requests go through ``httpx.ASGITransport``, so no server, Docker or network is
+involved and the numbers measure the application stack only (routing,
+validation, database, forecast analysis and serialisation).
+"""
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import celeri_worker, external_weather, schedule
+from app.database import get_async_db, get_db
+from app.init_mock_schedule_db import init_db_demo
+from app.models.schedule import Task
+from app.weather_client import WeatherClient
+from demo_tools.generate_forecast_grid import build_forecast_grid
+
+WEATHER_BASE_URL = "http://weather-stand-in"
+
+RequestFactory = Callable[[int], Tuple[str, Dict[str, Any]]]
+
+
+def seed_database(path: Path, extra_tasks: int) -> str:
+    """Create the demo schema in a SQLite file plus ``extra_tasks`` READY tasks for the listings."""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    init_db_demo(engine)
+    if extra_tasks:
+        with engine.begin() as conn:
+            conn.execute(insert(Task), [
+                {"id": 100 + i, "name": f"bench task {i}", "duration": f"{1 + i % 6}h", "predecessor": None,
+                 "status": "READY", "wave_height_limit": 1.5 + (i % 3) * 0.5}
+                for i in range(extra_tasks)
+            ])
+    engine.dispose()
+    return url
+
+
+def build_app(database_url: str, pool_size: int, cache_ttl_seconds: float) -> FastAPI:
+    """
+    The schedule, Celery and weather routers, wired to SQLite.
+
+    The schedule endpoints fetch forecasts from the weather router of this same
+    app, which serves a synthetic grid starting at the current hour.
+    """
+    external_weather._forecast_grid = build_forecast_grid(n_lat=20, n_lon=20, days=8, interval_minutes=10)
+
+    app = FastAPI()
+    app.include_router(schedule.router)
+    app.include_router(celeri_worker.router)
+    app.include_router(external_weather.router)
+
+    session_factory = sessionmaker(bind=create_engine(database_url, connect_args={"check_same_thread": False}))
+    async_engine = create_async_engine(database_url.replace("sqlite://", "sqlite+aiosqlite://"),
+                                       pool_size=pool_size, max_overflow=0)
+    async_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.state.async_engine = async_engine
+    weather_http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=WEATHER_BASE_URL)
+    app.state.weather_client = WeatherClient(weather_http, url=f"{WEATHER_BASE_URL}/weather-service/weather",
+                                             ttl_seconds=cache_ttl_seconds)
+    return app
+
+
+async def run_load(client: httpx.AsyncClient, make_request: RequestFactory, n_requests: int,
+                   concurrency: int) -> Dict[str, Any]:
+    """
+    Issue ``n_requests`` GETs from ``concurrency`` concurrent callers and summarise their latency.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the app under test
+        make_request (RequestFactory): Maps the request number to ``(path, params)``
+        n_requests (int): Total number of requests
+        concurrency (int): Number of requests in flight at once
+
+    Returns:
+        dict: Output of :func:`summarize`
+    """
+    latencies = np.empty(n_requests)
+    errors = 0
+    counter = iter(range(n_requests))
+
+    async def caller():
+        nonlocal errors
+        for i in counter:
+            path, params = make_request(i)
+            start = time.perf_counter()
+            response = await client.get(path, params=params)
+            await response.aread()
+            latencies[i] = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors, concurrency)
+
+
+def summarize(latencies: np.ndarray, elapsed: float, errors: int, concurrency: int) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds and throughput in requests per second."""
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return {
+        "concurrency": concurrency,
+        "requests": int(latencies.size),
+        "errors": errors,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(latencies.max()) * 1e3, 3),
+        "throughput_rps": round(latencies.size / elapsed, 1),
+    }
+
+
+def scenarios(task_ids: List[int], sites: List[Tuple[float, float]]) -> Dict[str, RequestFactory]:
+    """The request mix per endpoint; requests cycle through the given tasks and sites."""
+    now = int(time.time())
+
+    def window(i):
+        lat, lon = sites[i % len(sites)]
+        return "/schedule/window", {"schedule_id": task_ids[i % len(task_ids)], "lat": lat, "lon": lon}
+
+    def window_columnar(i):
+        path, params = window(i)
+        return path, {**params, "format": "columnar"}
+
+    def tasks(i):
+        return "/schedule/tasks", {"limit": 500}
+
+    def weather(i):
+        lat, lon = sites[i % len(sites)]
+        return "/weather-service/weather", {"location": f"{lat},{lon}", "from": now, "time_to": now + 12 * 3600}
+
+    return {"schedule_window": window, "schedule_window_columnar": window_columnar, "schedule_tasks": tasks,
+            "weather": weather}
@@ -0,0 +1,95 @@
+"""Microbenchmarks of the hot paths: window analysis, resampling, weather filtering, ingestion and metrics overhead."""
+import json
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from app.criteria import compile_criteria, evaluate_criteria, wave_height_criteria
+from app.forecast_store import ForecastGrid, ForecastStore
+from app.ingest import ForecastIngest
+from app.lib import ensemble_window_probabilities, wow_analysis, wow_analysis_batch
+from app.metrics import StageTimer
+from app.resample import resample
+
+STEP_SECONDS = 600  # 10-minute data
+
+
+def time_call(fn: Callable[[], Any], min_seconds: float = 0.2) -> Dict[str, float]:
+    """Call ``fn`` repeatedly for at least ``min_seconds``; report the median and best time per call."""
+    fn()  # warm-up
+    samples = []
+    deadline = time.perf_counter() + min_seconds
+    while time.perf_counter() < deadline or len(samples) < 5:
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "calls": len(samples),
+        "median_us": round(float(np.median(samples)) * 1e6, 2),
+        "best_us": round(float(np.min(samples)) * 1e6, 2),
+    }
+
+
+def run_micro(n_points: int = 10_000, n_tasks: int = 50, n_members: int = 50,
+              n_criteria_tasks: int = 2000) -> Dict[str, Dict[str, float]]:
+    """Time each hot path on a synthetic series of ``n_points`` 10-minute steps (and an hourly ensemble)."""
+    rng = np.random.default_rng(0)
+    times = 1_763_000_000 + STEP_SECONDS * np.arange(n_points, dtype=np.int64)
+    wave_height = np.clip(1.6 + np.sin(np.arange(n_points) / 40.0) + rng.normal(0, 0.2, n_points), 0.1, None)
+    columns = {
+        "wind_speed": (4.0 * wave_height + 2.0).round(1),
+        "wave_height": wave_height.round(2),
+        "wave_period": (5.5 + 1.4 * np.sqrt(wave_height)).round(1),
+    }
+    store = ForecastStore(times, columns)
+    durations = rng.integers(1, 24, n_tasks)
+    limits = rng.uniform(1.0, 3.0, n_tasks)
+    window_from, window_to = int(times[n_points // 2]), int(times[n_points // 2]) + 12 * 3600
+    stages = StageTimer("benchmark")
+    # Hourly ensemble over 10 and 60 days, as the probabilistic window endpoints analyse it
+    ensemble = np.clip(1.6 + np.sin(np.arange(1440) / 6.0) + rng.normal(0, 0.4, (n_members, 1440)), 0.1, None)
+    # A week of hourly forecast and many tasks: mostly plain limits, some combined rules and tables
+    hourly = {name: values[:168] for name, values in columns.items()}
+    shared_rules = [
+        compile_criteria("wave_height <= 2.0 and wind_speed < 12"),
+        compile_criteria({"variable": "wave_height", "by": "wave_period", "points": [[6, 2.5], [10, 2.0]]}),
+    ]
+    criteria = [shared_rules[k % 2] if k % 5 == 0 else wave_height_criteria(round(float(limit), 2))
+                for k, limit in enumerate(rng.uniform(1.0, 3.0, n_criteria_tasks))]
+
+    # The whole series as an NDJSON feed, ingested into an empty single-point grid
+    feed = "\n".join(json.dumps(record) for record in store.records(int(times[0]), int(times[-1]))).encode()
+
+    def ingest_feed():
+        grid = [ForecastGrid([61.5], [4.8], [], {name: np.empty((1, 1, 0)) for name in columns})]
+
+        def append(batch_times, batch_columns):
+            grid[0], replaced = grid[0].merge(batch_times, batch_columns)
+            return replaced
+
+        ingest = ForecastIngest("ndjson", append, list(columns))
+        for start in range(0, len(feed), 1 << 16):
+            ingest.feed(feed[start:start + (1 << 16)])
+        return ingest.finish()
+
+    def timed_stage():
+        with stages("db"):
+            pass
+
+    return {
+        "wow_analysis": time_call(lambda: wow_analysis(wave_height, 12, 2.0)),
+        f"wow_analysis_batch_{n_tasks}_tasks": time_call(lambda: wow_analysis_batch(wave_height, durations, limits)),
+        f"ensemble_probabilities_{n_members}x240": time_call(
+            lambda: ensemble_window_probabilities(ensemble[:, :240], 12, 2.0)
+        ),
+        f"ensemble_probabilities_{n_members}x1440": time_call(
+            lambda: ensemble_window_probabilities(ensemble, 12, 2.0)
+        ),
+        f"evaluate_criteria_{n_criteria_tasks}_tasks_168h": time_call(lambda: evaluate_criteria(criteria, hourly)),
+        "resample_hourly_mean": time_call(lambda: resample(times, columns, 3600, "mean")),
+        "weather_query_12h": time_call(lambda: store.query(window_from, window_to)),
+        "weather_records_12h": time_call(lambda: store.records(window_from, window_to)),
+        f"ingest_ndjson_{n_points}_records": time_call(ingest_feed),
+        "metrics_stage_timer": time_call(timed_stage),
+    }
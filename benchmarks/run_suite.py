@@ -0,0 +1,124 @@
+"""Benchmark suite: microbenchmarks plus an in-process load test, reported as JSON.
+
+Runs without Docker, Postgres or a live weather service (see ``load_harness``).
+Save a result per commit and compare two runs::
+
+    python -m benchmarks.run_suite --out bench-main.json
+    python -m benchmarks.run_suite --out bench-branch.json --baseline bench-main.json
+
+With ``--baseline`` every p50/p95/p99, throughput and microbenchmark figure is
+printed next to its baseline value and the ratio between them.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.load_harness import build_app, run_load, scenarios, seed_database
+from benchmarks.micro import run_micro
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parents[1]).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_load_suite(args) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = seed_database(Path(tmp) / "bench.db", args.tasks)
+        app = build_app(database_url, pool_size=max(args.concurrency), cache_ttl_seconds=args.cache_ttl)
+        rng = np.random.default_rng(0)
+        sites = [(61.5, 4.8)] + [(float(lat), float(lon)) for lat, lon in
+                                 zip(rng.uniform(56.5, 65.5, args.sites - 1), rng.uniform(0.5, 9.5, args.sites - 1))]
+        # READY and BLOCKED demo tasks plus a few of the extra ones
+        task_ids = [3, 4, 5] + list(range(100, 100 + min(args.tasks, 20)))
+        mix = scenarios(task_ids, sites)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                for concurrency in args.concurrency:
+                    await run_load(client, mix[name], min(args.requests, 50), concurrency)  # warm-up
+                    summary = await run_load(client, mix[name], args.requests, concurrency)
+                    results.append({"scenario": name, **summary})
+                    print(f"{name:>16} c={concurrency:<3} p50 {summary['p50_ms']:8.2f} ms  p95 {summary['p95_ms']:8.2f} ms"
+                          f"  p99 {summary['p99_ms']:8.2f} ms  {summary['throughput_rps']:8.1f} req/s"
+                          f"  errors {summary['errors']}", file=sys.stderr)
+        await app.state.weather_client.aclose()
+        await app.state.async_engine.dispose()
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print current figures next to the baseline run; a ratio above 1 means slower (or less throughput)."""
+    print(f"compared with {baseline['meta']['git_revision']} ({baseline['meta']['timestamp']})", file=sys.stderr)
+    for name, stats in current.get("micro", {}).items():
+        if name in baseline.get("micro", {}):
+            old = baseline["micro"][name]["median_us"]
+            print(f"  micro {name:>28}: {stats['median_us']:10.2f} us vs {old:10.2f} us"
+                  f"  x{stats['median_us'] / old:5.2f}", file=sys.stderr)
+    old_runs = {(r["scenario"], r["concurrency"]): r for r in baseline.get("load", [])}
+    for run in current.get("load", []):
+        old = old_runs.get((run["scenario"], run["concurrency"]))
+        if old is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            ratio = run[metric] / old[metric] if metric != "throughput_rps" else old[metric] / run[metric]
+            print(f"  {run['scenario']:>16} c={run['concurrency']:<3} {metric:>14}: "
+                  f"{run[metric]:10.2f} vs {old[metric]:10.2f}  x{ratio:5.2f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="Earlier JSON report to compare against")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--scenarios", nargs="+",
+                        default=["schedule_window", "schedule_window_columnar", "schedule_tasks", "weather"],
+                        choices=["schedule_window", "schedule_window_columnar", "schedule_tasks", "weather"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario and concurrency level")
+    parser.add_argument("--tasks", type=int, default=2000, help="Extra tasks seeded for the listing")
+    parser.add_argument("--sites", type=int, default=8, help="Distinct locations the requests cycle through")
+    parser.add_argument("--cache-ttl", type=float, default=600.0, help="Forecast cache TTL; 0 fetches every time")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+    }
+    if not args.skip_micro:
+        report["micro"] = run_micro()
+    if not args.skip_load:
+        report["load"] = asyncio.run(run_load_suite(args))
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(output + "\n")
+    else:
+        print(output)
+    if args.baseline:
+        compare(report, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
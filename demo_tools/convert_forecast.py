@@ -0,0 +1,34 @@
+"""Convert a forecast to the compact memory-mapped binary format served by the weather service.
+
+Accepts the JSON mock (``{"location": ..., "forecast": [...]}``) or a grid archive
+written by ``demo_tools.generate_forecast_grid``::
+
+    python -m demo_tools.convert_forecast app/mock_forecast.json forecast.wxf
+    python -m demo_tools.convert_forecast forecast_grid.npz forecast_grid.wxf
+    WEATHER_GRID_PATH=forecast_grid.wxf uvicorn app.main:app --port 8020
+"""
+import argparse
+from pathlib import Path
+
+from app.forecast_store import ForecastGrid
+
+
+def load_source(path: Path) -> ForecastGrid:
+    """Load a JSON forecast (as a single-point grid) or an .npz grid."""
+    return ForecastGrid.from_npz(path) if path.suffix == ".npz" else ForecastGrid.from_json(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="JSON forecast or .npz grid")
+    parser.add_argument("out", type=Path, help="Binary forecast file to write")
+    args = parser.parse_args()
+
+    grid = load_source(args.source)
+    grid.to_binary(args.out)
+    print(f"Wrote {grid.shape[0] * grid.shape[1]} points x {grid.times.size} steps "
+          f"({args.out.stat().st_size / 1e3:.0f} kB, source {args.source.stat().st_size / 1e3:.0f} kB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Generate a large synthetic multi-location forecast grid for load testing.
+
+Example (5000 offshore points, one week of 10-minute data)::
+
+    python -m demo_tools.generate_forecast_grid --n-lat 50 --n-lon 100 --days 7 --interval-minutes 10
+    WEATHER_GRID_PATH=forecast_grid.npz uvicorn app.main:app --port 8020
+"""
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.forecast_store import ForecastGrid
+
+
+def build_forecast_grid(lat_min=56.0, lat_max=66.0, n_lat=50, lon_min=0.0, lon_max=10.0, n_lon=100,
+                        start=None, days=7, interval_minutes=60, seed=0, members=0):
+    """
+    Build a grid whose fields vary smoothly in space and time, plus a little noise.
+
+    With ``members > 0`` the columns get an ensemble axis, ``(n_lat, n_lon, members, n_times)``:
+    every member shifts the storm timing by an error that grows with lead time.
+    """
+    rng = np.random.default_rng(seed)
+    if start is None:
+        start = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_epoch = int(start.timestamp())
+
+    lats = np.linspace(lat_min, lat_max, n_lat)
+    lons = np.linspace(lon_min, lon_max, n_lon)
+    times = start_epoch + 60 * interval_minutes * np.arange(days * 24 * 60 // interval_minutes, dtype=np.int64)
+
+    # Storm systems drift eastwards: phase depends on longitude and time
+    hours = (times - start_epoch)[None, None, :] / 3600.0
+    phase = 2 * np.pi * (hours / 36.0 - lons[None, :, None] / 5.0) + lats[:, None, None] / 3.0
+    exposure = 1.0 + 0.5 * (lats[:, None, None] - lat_min) / max(lat_max - lat_min, 1e-9)
+    if members:
+        # About +-3 h of timing spread per day of lead time
+        timing_error = rng.normal(0, 1, members)[None, None, :, None] * hours[:, :, None, :] / 8.0
+        phase = phase[:, :, None, :] + 2 * np.pi * timing_error / 36.0
+        exposure = exposure[:, :, None, :]
+    shape = phase.shape
+
+    wave_height = np.clip(exposure * (1.6 + 1.1 * np.sin(phase)) + rng.normal(0, 0.15, shape), 0.1, None)
+    wind_speed = np.clip(4.0 * wave_height + 2.0 + rng.normal(0, 1.5, shape), 0.0, None)
+    wave_period = np.clip(5.5 + 1.4 * np.sqrt(wave_height) + rng.normal(0, 0.3, shape), 3.0, None)
+
+    columns = {
+        "wind_speed": wind_speed.round(1),
+        "wave_height": wave_height.round(2),
+        "wave_period": wave_period.round(1),
+    }
+    return ForecastGrid(lats, lons, times, columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="forecast_grid.npz", help="*.npz, or any other name for the binary format")
+    parser.add_argument("--lat-min", type=float, default=56.0)
+    parser.add_argument("--lat-max", type=float, default=66.0)
+    parser.add_argument("--n-lat", type=int, default=50)
+    parser.add_argument("--lon-min", type=float, default=0.0)
+    parser.add_argument("--lon-max", type=float, default=10.0)
+    parser.add_argument("--n-lon", type=int, default=100)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--interval-minutes", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--members", type=int, default=0, help="Ensemble members (0: deterministic)")
+    args = parser.parse_args()
+
+    grid = build_forecast_grid(args.lat_min, args.lat_max, args.n_lat, args.lon_min, args.lon_max, args.n_lon,
+                               days=args.days, interval_minutes=args.interval_minutes, seed=args.seed,
+                               members=args.members)
+    if args.out.endswith(".npz"):
+        np.savez(args.out, lats=grid.lats, lons=grid.lons, times=grid.times, **grid.columns)
+    else:
+        grid.to_binary(args.out)
+    print(f"Wrote {args.n_lat * args.n_lon} points x {grid.times.size} steps to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
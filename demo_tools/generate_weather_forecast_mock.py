@@ -0,0 +1,151 @@
+"""Extend the JSON forecast mock up to the present, or write large synthetic forecast feeds.
+
+Without ``--out`` the mock (``app/mock_forecast.json``) gets 30-minute entries
+appended after its last timestamp until ``--days`` past today, so the demo
+always has data for "now + 12 h"::
+
+    python -m demo_tools.generate_weather_forecast_mock
+
+With ``--out`` it streams a feed of successive forecast cycles instead: every
+``--cycle-hours`` a new run re-issues the next ``--horizon-hours``, so
+timestamps repeat across cycles just like an operational feed. The file is
+written chunk by chunk, so ``--size 4GB`` needs no more memory than ``--size 4MB``::
+
+    python -m demo_tools.generate_weather_forecast_mock --out feed.ndjson --size 2GB --interval-minutes 1
+    curl -T feed.ndjson -H 'Content-Type: application/x-ndjson' http://localhost:8020/weather-service/forecast
+"""
+import argparse
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from app.forecast_store import format_timestamps, parse_timestamp
+from app.ingest import feed_format
+
+MOCK_PATH = Path(__file__).resolve().parents[1] / "app" / "mock_forecast.json"
+MOCK_INTERVAL_SECONDS = 1800
+SIZE_UNITS = {"": 1, "B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9}
+
+
+def parse_size(size: str) -> int:
+    """Parse ``"500MB"``, ``"2GB"`` or a plain byte count."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", size.upper())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"Invalid size '{size}', expected e.g. 500MB or 2GB")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def synthetic_values(times: np.ndarray, rng: np.random.Generator):
+    """Wind speed, wave height and wave period with a 36-hour storm cycle plus noise, rounded like the mock."""
+    hours = times / 3600.0
+    wave_height = np.clip(1.6 + 1.1 * np.sin(2 * np.pi * hours / 36.0) + rng.normal(0, 0.2, times.size), 0.1, None)
+    wind_speed = np.clip(4.0 * wave_height + 2.0 + rng.normal(0, 1.5, times.size), 0.0, None)
+    wave_period = np.clip(5.5 + 1.4 * np.sqrt(wave_height) + rng.normal(0, 0.3, times.size), 3.0, None)
+    return wind_speed.round(1), wave_height.round(1), wave_period.round(1)
+
+
+def feed_lines(fmt: str, start: int, interval: int, horizon: int, cycle: int, seed: int = 0,
+               invalid_rate: float = 0.0) -> Iterator[str]:
+    """
+    Yield the text of an endless feed of forecast cycles, one record per item (no separators).
+
+    Cycle ``c`` covers ``horizon`` seconds from ``start + c * cycle``.
+    ``invalid_rate`` of the records get a negative wave height, for the
+    ingestion to reject.
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.arange(0, horizon, interval, dtype=np.int64)
+    issued = start
+    while True:
+        times = issued + steps
+        wind_speed, wave_height, wave_period = synthetic_values(times, rng)
+        if invalid_rate:
+            wave_height[rng.random(times.size) < invalid_rate] = -1.0
+        for row in zip(format_timestamps(times), wind_speed.tolist(), wave_height.tolist(), wave_period.tolist()):
+            if fmt == "csv":
+                yield "%s,%s,%s,%s\n" % row
+            else:
+                yield '{"timestamp": "%s", "wind_speed": %s, "wave_height": %s, "wave_period": %s}' % row
+        issued += cycle
+
+
+def write_feed(path: Path, size: int, fmt: Optional[str] = None, start: Optional[int] = None,
+               interval: int = 600, horizon: int = 240 * 3600, cycle: int = 6 * 3600, seed: int = 0,
+               invalid_rate: float = 0.0, location=(61.5, 4.8)) -> int:
+    """Write a feed of about ``size`` bytes (whole records) to ``path``; return the number of records."""
+    fmt = fmt or feed_format(path=path) or "ndjson"
+    if start is None:
+        start = int(datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0).timestamp())
+    header = {
+        "json": '{"location": {"lat": %s, "lon": %s}, "forecast": [\n' % location,
+        "ndjson": "",
+        "csv": "timestamp,wind_speed,wave_height,wave_period\n",
+    }[fmt]
+    prefix = ",\n" if fmt == "json" else ""  # between records
+    suffix = "\n" if fmt == "ndjson" else ""  # after every record (CSV lines end in one already)
+    footer = "\n]}\n" if fmt == "json" else ""
+
+    written, records, pending = 0, 0, []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header)
+        written += len(header)
+        for line in feed_lines(fmt, start, interval, horizon, cycle, seed, invalid_rate):
+            text = (prefix if records else "") + line + suffix
+            pending.append(text)
+            written += len(text)
+            records += 1
+            if len(pending) == 10_000:
+                f.write("".join(pending))
+                pending = []
+            if written >= size:
+                break
+        f.write("".join(pending) + footer)
+    return records
+
+
+def extend_mock(path: Path = MOCK_PATH, days: int = 7, seed: int = 0) -> int:
+    """Append 30-minute entries to the JSON mock until ``days`` after today; return how many were added."""
+    with open(path, "r") as f:
+        document = json.load(f)
+    forecast = document["forecast"]
+    last = parse_timestamp(forecast[-1]["timestamp"])
+    until = int((datetime.now(tz=timezone.utc) + timedelta(days=days)).timestamp())
+    times = np.arange(last + MOCK_INTERVAL_SECONDS, until + 1, MOCK_INTERVAL_SECONDS, dtype=np.int64)
+
+    wind_speed, wave_height, wave_period = synthetic_values(times, np.random.default_rng(seed))
+    for row in zip(format_timestamps(times), wind_speed.tolist(), wave_height.tolist(), wave_period.tolist()):
+        forecast.append(dict(zip(("timestamp", "wind_speed", "wave_height", "wave_period"), row)))
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return int(times.size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, help="Write a synthetic feed (.json, .ndjson or .csv) instead")
+    parser.add_argument("--format", choices=("json", "ndjson", "csv"), help="Feed format; defaults to the suffix")
+    parser.add_argument("--size", type=parse_size, default=parse_size("100MB"), help="Feed size, e.g. 2GB")
+    parser.add_argument("--interval-minutes", type=int, default=10, help="Feed time step")
+    parser.add_argument("--horizon-hours", type=int, default=240, help="Length of every forecast cycle")
+    parser.add_argument("--cycle-hours", type=int, default=6, help="Time between forecast cycles")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="Share of records with invalid values")
+    parser.add_argument("--days", type=int, default=7, help="Mock mode: days past today to cover")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.out is None:
+        added = extend_mock(days=args.days, seed=args.seed)
+        print(f"Added {added} entries to {MOCK_PATH}")
+        return
+    records = write_feed(args.out, args.size, args.format, interval=60 * args.interval_minutes,
+                         horizon=3600 * args.horizon_hours, cycle=3600 * args.cycle_hours, seed=args.seed,
+                         invalid_rate=args.invalid_rate)
+    print(f"Wrote {records} records ({args.out.stat().st_size / 1e6:.0f} MB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Initial schema: the baseline task and celery_job tables, with JSON stored as text
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("duration", sa.String()),
+        sa.Column("predecessor", sa.Integer(), sa.ForeignKey("task.id"), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("wave_height_limit", sa.Float()),
+    )
+    op.create_table(
+        "celery_job",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("params", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("celery_job")
+    op.drop_table("task")
@@ -0,0 +1,47 @@
+"""Add job progress and batch_id, store job params/result as JSONB and index status, created_at and task.predecessor
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Worker progress and submit_batch grouping; existing jobs start at 0 % and outside any batch
+    op.add_column("celery_job", sa.Column("progress", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("celery_job", sa.Column("batch_id", sa.String(36), nullable=True))
+    op.create_index("ix_celery_job_batch_id", "celery_job", ["batch_id"])
+    if op.get_bind().dialect.name == "postgresql":
+        for column in ("params", "result"):
+            op.alter_column("celery_job", column, type_=postgresql.JSONB(), postgresql_using=f"{column}::jsonb")
+    else:
+        # No JSONB elsewhere; JSON is stored as text, so this only changes the declared type
+        with op.batch_alter_table("celery_job") as batch:
+            for column in ("params", "result"):
+                batch.alter_column(column, type_=sa.JSON())
+    op.create_index("ix_celery_job_status_created_at", "celery_job", ["status", "created_at"])
+    op.create_index("ix_task_predecessor", "task", ["predecessor"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_predecessor", table_name="task")
+    op.drop_index("ix_celery_job_status_created_at", table_name="celery_job")
+    if op.get_bind().dialect.name == "postgresql":
+        for column in ("params", "result"):
+            op.alter_column("celery_job", column, type_=sa.Text(), postgresql_using=f"{column}::text")
+    else:
+        with op.batch_alter_table("celery_job") as batch:
+            for column in ("params", "result"):
+                batch.alter_column(column, type_=sa.Text())
+    op.drop_index("ix_celery_job_batch_id", table_name="celery_job")
+    with op.batch_alter_table("celery_job") as batch:
+        batch.drop_column("batch_id")
+        batch.drop_column("progress")
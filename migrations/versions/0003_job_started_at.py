@@ -0,0 +1,24 @@
+"""Record when a worker starts a job and index celery_job.updated_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("celery_job", sa.Column("started_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_celery_job_updated_at", "celery_job", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_celery_job_updated_at", table_name="celery_job")
+    with op.batch_alter_table("celery_job") as batch:
+        batch.drop_column("started_at")
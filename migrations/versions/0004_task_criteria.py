@@ -0,0 +1,24 @@
+"""Store operability criteria per task
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("task", sa.Column("criteria", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+                                    nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task") as batch:
+        batch.drop_column("criteria")
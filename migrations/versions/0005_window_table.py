@@ -0,0 +1,54 @@
+"""Materialized window table filled by the prefetcher
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "forecast_snapshot",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("lat", sa.Float(), nullable=False),
+        sa.Column("lon", sa.Float(), nullable=False),
+        sa.Column("version", sa.String(64), nullable=False),
+        sa.Column("horizon_start", sa.Integer(), nullable=False),
+        sa.Column("horizon_end", sa.Integer(), nullable=False),
+        sa.Column("members", sa.Integer(), nullable=False),
+        sa.Column("times", sa.LargeBinary(), nullable=False),
+        sa.Column("variables", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=False),
+        sa.Column("values", sa.LargeBinary(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("lat", "lon", name="uq_forecast_snapshot_location"),
+    )
+    op.create_table(
+        "task_window",
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("task.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("snapshot_id", sa.Integer(), sa.ForeignKey("forecast_snapshot.id", ondelete="CASCADE"),
+                  primary_key=True),
+        sa.Column("version", sa.String(64), nullable=False),
+        sa.Column("task_signature", sa.String(64), nullable=False),
+        sa.Column("go", sa.LargeBinary(), nullable=False),
+        sa.Column("exceedance", sa.LargeBinary(), nullable=False),
+        sa.Column("starts", sa.LargeBinary(), nullable=False),
+        sa.Column("p_go", sa.LargeBinary(), nullable=True),
+        sa.Column("p_window", sa.LargeBinary(), nullable=True),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+    )
+    # The primary key leads with task_id; snapshot lookups and the cascade from forecast_snapshot need their own
+    op.create_index("ix_task_window_snapshot_id", "task_window", ["snapshot_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_window_snapshot_id", table_name="task_window")
+    op.drop_table("task_window")
+    op.drop_table("forecast_snapshot")
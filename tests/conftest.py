@@ -1,6 +1,97 @@
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api import celeri_worker, schedule
+from app.database import get_async_db, get_async_session_factory, get_db
+from app.init_mock_schedule_db import demo_tasks
+from app.models import Base
+from app.weather_client import WeatherClient
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs a PostgreSQL database in TEST_POSTGRES_URL (set in CI)")
+
+
+def half_hourly_forecast(request: httpx.Request) -> httpx.Response:
+    """In-process weather service stand-in: 30-minute points over the requested range."""
+    time_from = int(request.url.params["from"])
+    time_to = int(request.url.params["time_to"])
+    forecast = []
+    for i, t in enumerate(range(time_from, time_to + 1, 1800)):
+        forecast.append({
+            "timestamp": datetime.fromtimestamp(t, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "wind_speed": 10.0,
+            # Calm for 6 hours, rough for 2, repeating
+            "wave_height": 3.0 if (i // 2) % 8 >= 6 else 1.0,
+            "wave_period": 8.0,
+        })
+    return httpx.Response(200, json={"location": {}, "forecast": forecast})
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """A seeded SQLite file, reachable from both the sync and the aiosqlite engine."""
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(demo_tasks())
+        session.commit()
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def session_factory(database_url):
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def api_app(database_url, session_factory):
+    """Schedule and Celery routers wired to SQLite and an in-process weather stand-in."""
+    app = FastAPI()
+    app.include_router(schedule.router)
+    app.include_router(celeri_worker.router)
+
+    # NullPool: aiosqlite connections must not outlive the event loop that opened them
+    async_engine = create_async_engine(database_url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    async_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: async_factory
+    app.state.weather_client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(half_hourly_forecast)))
+    return app
+
+
+@pytest.fixture
+def schedule_client(api_app):
+    with TestClient(api_app) as client:
+        yield client
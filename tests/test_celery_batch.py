@@ -0,0 +1,47 @@
+import pytest
+
+from app.api import celeri_worker
+from app.models.celery_job import CeleryJob
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    calls = []
+    monkeypatch.setattr(celeri_worker, "dispatch_batch",
+                        lambda job_ids, params_list, chunk_size=1: calls.append((job_ids, params_list, chunk_size)))
+    return calls
+
+
+def test_submit_batch_inserts_all_jobs_and_dispatches_once(schedule_client, dispatched):
+    sweep = [{"HS": hs, "TP": tp, "SimLength": 200} for hs in (1, 2, 3) for tp in (8, 10)]
+
+    response = schedule_client.post("/celery-worker/submit_batch", json=sweep, params={"chunk_size": 3})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert len(body["job_ids"]) == 6
+    assert dispatched == [(body["job_ids"], sweep, 3)]
+
+    jobs = schedule_client.get("/celery-worker/tasks").json()
+    assert [j["id"] for j in jobs] == body["job_ids"]
+    assert all(j["status"] == "PENDING" and j["progress"] == 0 for j in jobs)
+
+    status = schedule_client.get(f"/celery-worker/batch/{body['batch_id']}").json()
+    assert status == {"batch_id": body["batch_id"], "total": 6, "counts": {"PENDING": 6}, "progress": 0.0,
+                      "done": False}
+
+
+def test_batch_status_aggregates_worker_updates(schedule_client, session_factory, dispatched):
+    body = schedule_client.post("/celery-worker/submit_batch", json=[{"HS": 1}, {"HS": 2}, {"HS": 3}]).json()
+    with session_factory() as db:
+        first, second, _ = (db.get(CeleryJob, i) for i in body["job_ids"])
+        first.status, first.progress = "SUCCEEDED", 100
+        second.status, second.progress = "RUNNING", 50
+        db.commit()
+
+    status = schedule_client.get(f"/celery-worker/batch/{body['batch_id']}").json()
+
+    assert status["counts"] == {"SUCCEEDED": 1, "RUNNING": 1, "PENDING": 1}
+    assert status["progress"] == 50.0
+    assert schedule_client.get("/celery-worker/batch/unknown").status_code == 404
+    assert schedule_client.post("/celery-worker/submit_batch", json=[]).status_code == 422
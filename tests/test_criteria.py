@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from app.criteria import compile_criteria, evaluate_criteria, wave_height_criteria
+from app.lib import wow_analysis_batch
+
+
+def _columns(shape=(96,), seed=3):
+    rng = np.random.default_rng(seed)
+    wave_height = rng.uniform(0.2, 3.5, shape)
+    wave_height.flat[5] = np.nan
+    return {
+        "wind_speed": rng.uniform(0.0, 20.0, shape),
+        "wave_height": wave_height,
+        "wave_period": rng.uniform(4.0, 16.0, shape),
+    }
+
+
+def test_expression_matches_numpy_and_skips_missing_points():
+    columns = _columns()
+    hs, wind, tp = columns["wave_height"], columns["wind_speed"], columns["wave_period"]
+
+    go, exceedance = compile_criteria("wave_height <= 2.5 and (wind_speed < 12 or not 6 <= wave_period < 10)").evaluate(columns)
+
+    expected = (hs <= 2.5) & ((wind < 12) | ~((6 <= tp) & (tp < 10)))
+    known = np.isfinite(hs)
+    np.testing.assert_array_equal(go, expected & known)
+    np.testing.assert_array_equal(exceedance, ~expected & known)
+    assert not go[5] and not exceedance[5]
+
+    go, _ = compile_criteria("sqrt(wave_height) * max(wave_period, 8) / 2 < min(abs(-wind_speed), 15)").evaluate(columns)
+    np.testing.assert_array_equal(go, (np.sqrt(hs) * np.maximum(tp, 8) / 2 < np.minimum(wind, 15)) & known)
+
+
+def test_limit_tables_interpolate_or_step():
+    columns = {"wave_height": np.array([2.4, 2.4, 2.1, 1.9, 1.9]), "wave_period": np.array([4.0, 7.0, 9.0, 11.0, 20.0])}
+    points = [[6, 2.5], [10, 2.0], [14, 1.5]]
+
+    linear, _ = compile_criteria({"variable": "wave_height", "by": "wave_period", "points": points}).evaluate(columns)
+    step, _ = compile_criteria(
+        {"variable": "wave_height", "by": "wave_period", "points": points, "interpolation": "step"}
+    ).evaluate(columns)
+
+    # Linear limits 2.5, 2.375, 2.125, 1.875, 1.5; step limits 2.5, 2.5, 2.5, 2.0, 1.5
+    assert linear.tolist() == [True, False, True, False, False]
+    assert step.tolist() == [True, True, True, True, False]
+
+
+@pytest.mark.parametrize("spec", [
+    "__import__('os').system('true')",
+    "wave_height.real <= 2",
+    "wave_height == 2",
+    "wave_height + 1",
+    "swell <= 2",
+    "1 < 2",
+    "wave_height <= ",
+    {"variable": "wave_height", "by": "wave_period", "points": [[10, 2.0], [6, 2.5]]},
+    {"variable": "wave_height", "by": "wave_period", "points": [[6, 2.5]], "extra": 1},
+    [],
+    3,
+    "-" * 3000 + "wave_height < 2",
+    " and ".join(["wave_height < 2"] * 20),
+])
+def test_invalid_criteria_are_rejected(spec):
+    with pytest.raises(ValueError):
+        compile_criteria(spec)
+
+
+def test_compiled_criteria_are_shared():
+    table = {"variable": "wave_height", "by": "wave_period", "points": [[6, 2.5], [10, 2.0]]}
+    reordered = {"points": [[6, 2.5], [10, 2.0]], "by": "wave_period", "variable": "wave_height"}
+
+    assert compile_criteria(table) is compile_criteria(reordered)
+    assert wave_height_criteria(2) is wave_height_criteria(2.0)
+
+
+@pytest.mark.parametrize("shape", [(120,), (7, 120)])
+def test_batch_evaluation_matches_single_criteria(shape):
+    columns = _columns(shape)
+    table = {"variable": "wave_height", "by": "wave_period", "points": [[6, 2.5], [10, 2.0]]}
+    criteria = [wave_height_criteria(limit) for limit in (1.0, 2.0, 2.5)] + [
+        compile_criteria("wind_speed < 10"),
+        compile_criteria(table),
+        compile_criteria(["wind_speed < 15", table]),
+        compile_criteria(table),
+    ]
+
+    go, exceedance = evaluate_criteria(criteria, columns)
+
+    assert go.shape == exceedance.shape == (len(criteria),) + shape
+    for k, c in enumerate(criteria):
+        expected_go, expected_exceedance = c.evaluate(columns)
+        np.testing.assert_array_equal(go[k], expected_go)
+        np.testing.assert_array_equal(exceedance[k], expected_exceedance)
+
+
+def test_wave_height_criteria_match_the_wave_height_analysis():
+    columns = _columns()
+    limits = [1.0, 1.5, 2.0]
+
+    go, _ = evaluate_criteria([wave_height_criteria(limit) for limit in limits], columns)
+
+    expected_go, _ = wow_analysis_batch(columns["wave_height"], 1, limits)
+    np.testing.assert_array_equal(go, expected_go)
@@ -0,0 +1,56 @@
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.init_mock_schedule_db import MIGRATIONS_DIR, init_db_demo
+from app.models.schedule import Task
+
+
+def test_demo_seed_runs_once_per_schema_version(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'demo.db'}")
+
+    assert init_db_demo(engine) is True
+    with engine.connect() as connection:
+        revision = MigrationContext.configure(connection).get_current_revision()
+    assert revision == ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+
+    with Session(engine) as session:
+        assert session.scalars(select(Task.id).order_by(Task.id)).all() == [1, 2, 3, 4, 5]
+        session.execute(update(Task).where(Task.id == 3).values(status="STARTED"))
+        session.commit()
+
+    # A restart keeps existing data
+    assert init_db_demo(engine) is False
+    with Session(engine) as session:
+        assert session.get(Task, 3).status == "STARTED"
+
+    # DEMO_RESET wipes and reseeds
+    assert init_db_demo(engine, force=True) is True
+    with Session(engine) as session:
+        assert session.get(Task, 3).status == "READY"
+    engine.dispose()
+
+
+def test_demo_seed_upgrades_an_older_schema_in_place(tmp_path):
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    config = Config(str(MIGRATIONS_DIR.parent / "alembic.ini"))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "0003")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(insert(Task.__table__).values(id=7, name="kept", duration="1h", status="READY"))
+
+    # A versioned database behind head is migrated, not wiped and reseeded
+    assert init_db_demo(engine) is True
+    with engine.connect() as connection:
+        assert MigrationContext.configure(connection).get_current_revision() == \
+            ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+        assert "task_window" in inspect(connection).get_table_names()
+    with Session(engine) as session:
+        assert session.scalars(select(Task.id)).all() == [7]
+    engine.dispose()
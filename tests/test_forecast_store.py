@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.external_weather import DATA_PATH, router as weather_router
+from app.forecast_store import ForecastGrid, ForecastStore, parse_timestamp
+from demo_tools.generate_forecast_grid import build_forecast_grid
+
+
+def _legacy_filter(entries, time_from, time_to):
+    return [
+        e for e in entries
+        if time_from <= datetime.fromisoformat(e["timestamp"].replace("Z", "+00:00")).timestamp() <= time_to
+    ]
+
+
+def test_store_sorts_and_queries_inclusive_range():
+    store = ForecastStore([30, 10, 20], {"wave_height": [3.0, 1.0, 2.0]})
+
+    times, columns = store.query(10, 20)
+
+    assert times.tolist() == [10, 20]
+    assert columns["wave_height"].tolist() == [1.0, 2.0]
+    assert len(store.records(21, 29)) == 0
+
+
+def test_weather_endpoint_matches_linear_scan():
+    with open(DATA_PATH) as f:
+        entries = json.load(f)["forecast"]
+    first = parse_timestamp(entries[0]["timestamp"])
+    last = parse_timestamp(entries[-1]["timestamp"])
+
+    app = FastAPI()
+    app.include_router(weather_router)
+    client = TestClient(app)
+
+    for time_from, time_to in [(first, last), (first + 1, first + 7200), (first + 3600 * 30, first + 3600 * 42), (0, 1)]:
+        response = client.get("/weather-service/weather", params={"from": time_from, "time_to": time_to})
+        assert response.status_code == 200
+        assert response.json()["forecast"] == _legacy_filter(entries, time_from, time_to)
+
+
+def test_grid_nearest_and_bilinear_lookup():
+    lats, lons, times = [60.0, 61.0], [4.0, 5.0, 6.0], [0, 3600]
+    # Wave height equals lat + lon at every step, so bilinear interpolation is exact
+    wave_height = np.add.outer(np.array(lats), np.array(lons))[:, :, None].repeat(2, axis=2)
+    grid = ForecastGrid(lats, lons, times, {"wave_height": wave_height})
+
+    _, columns, point = grid.query(60.7, 5.2, 0, 3600)
+    assert point == (61.0, 5.0)
+    assert columns["wave_height"].tolist() == [66.0, 66.0]
+
+    _, columns, point = grid.query(60.25, 4.5, 0, 0, method="bilinear")
+    assert point == pytest.approx((60.25, 4.5))
+    assert columns["wave_height"].tolist() == pytest.approx([64.75])
+
+    # Outside the grid the lookup clamps to the nearest edge
+    assert grid.nearest(70.0, -3.0) == (1, 0)
+
+
+def test_synthetic_grid_round_trips_through_npz(tmp_path):
+    grid = build_forecast_grid(n_lat=4, n_lon=5, days=1)
+    path = tmp_path / "grid.npz"
+    np.savez(path, lats=grid.lats, lons=grid.lons, times=grid.times, **grid.columns)
+
+    loaded = ForecastGrid.from_npz(path)
+
+    assert loaded.shape == (4, 5)
+    np.testing.assert_array_equal(loaded.columns["wave_height"], grid.columns["wave_height"])
+
+
+def test_binary_file_is_memory_mapped_and_reads_back_exact_values(tmp_path):
+    grid = build_forecast_grid(n_lat=4, n_lon=5, days=1)
+    path = tmp_path / "grid.wxf"
+    grid.to_binary(path)
+
+    mapped = ForecastGrid.from_binary(path)
+
+    assert isinstance(mapped.columns["wave_height"].base, np.memmap)
+    assert mapped.decimals == {"wind_speed": 1, "wave_height": 2, "wave_period": 1}
+    np.testing.assert_array_equal(mapped.times, grid.times)
+    t0, t1 = int(grid.times[3]), int(grid.times[10])
+    for method in ("nearest", "bilinear"):
+        times, columns, point = mapped.query(61.3, 2.2, t0, t1, method)
+        expected_times, expected, expected_point = grid.query(61.3, 2.2, t0, t1, method)
+        assert point == expected_point
+        for name in grid.columns:
+            np.testing.assert_allclose(columns[name], expected[name], rtol=1e-12)
+    # Quantised float32 values come back as the decimals that were written
+    assert mapped.records(61.3, 2.2, t0, t1) == grid.records(61.3, 2.2, t0, t1)
+
+
+def test_binary_file_rejects_foreign_files(tmp_path):
+    path = tmp_path / "grid.npz"
+    np.savez(path, times=np.arange(3))
+
+    with pytest.raises(ValueError):
+        ForecastGrid.from_binary(path)
+
+
+def test_ensemble_grid_round_trips_through_binary(tmp_path):
+    grid = build_forecast_grid(n_lat=3, n_lon=4, days=1, members=5)
+    path = tmp_path / "ensemble.wxf"
+    grid.to_binary(path)
+
+    mapped = ForecastGrid.from_binary(path)
+
+    assert mapped.members == grid.members == 5
+    assert mapped.columns["wave_height"].shape == (3, 4, 5, grid.times.size)
+    t0, t1 = int(grid.times[2]), int(grid.times[8])
+    records, _ = mapped.records(61.3, 2.2, t0, t1)
+    assert records == grid.records(61.3, 2.2, t0, t1)[0]
+    assert all(len(r["wave_height"]) == 5 for r in records)
+    # Member lists on the wire parse back into a (members, n) store
+    store = ForecastStore.from_records(records)
+    assert store.columns["wave_height"].shape == (5, len(records))
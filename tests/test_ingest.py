@@ -0,0 +1,184 @@
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import external_weather
+from app.forecast_store import ForecastGrid, format_timestamps, parse_timestamp
+from app.ingest import MAX_RECORD_BYTES, ForecastIngest, iter_records, read_chunks
+from demo_tools.generate_weather_forecast_mock import write_feed
+
+VARIABLES = ["wind_speed", "wave_height", "wave_period"]
+
+
+def _empty_grid(members=0):
+    shape = (1, 1) + ((members,) if members else ()) + (0,)
+    return ForecastGrid([61.5], [4.8], [], {name: np.empty(shape) for name in VARIABLES})
+
+
+def _ingest(chunks, fmt, batch_size=1000):
+    grid = [_empty_grid()]
+
+    def append(times, columns):
+        grid[0], replaced = grid[0].merge(times, columns)
+        return replaced
+
+    ingest = ForecastIngest(fmt, append, VARIABLES, batch_size=batch_size)
+    for chunk in chunks:
+        ingest.feed(chunk)
+    stats = ingest.finish()  # flushes the last batch
+    return grid[0], stats
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson", "csv"])
+def test_records_do_not_depend_on_chunk_boundaries(tmp_path, fmt):
+    path = tmp_path / f"feed.{fmt}"
+    write_feed(path, 20_000, start=1_700_000_000, horizon=6 * 3600, cycle=3600)
+    data = path.read_bytes()
+
+    whole = list(iter_records([data], fmt))
+    assert len(whole) > 100
+    for size in (1, 7, 4096):
+        assert list(iter_records(_split(data, size), fmt)) == whole
+
+
+def test_json_document_keeps_other_keys_and_rejects_truncation():
+    data = json.dumps({"location": {"lat": 61.5, "lon": 4.8}, "forecast": [{"a": 1}, {"a": 2}], "run": 12}).encode()
+    decoder_records = list(iter_records(_split(data, 3), "json"))
+    assert decoder_records == [{"a": 1}, {"a": 2}]
+
+    with pytest.raises(ValueError, match="Truncated"):
+        list(iter_records([data[:-10]], "json"))
+
+
+def test_invalid_records_are_skipped_and_last_duplicate_wins():
+    lines = [
+        {"timestamp": "2025-11-14T02:00:00Z", "wind_speed": 5, "wave_height": 1.0, "wave_period": 8},
+        {"timestamp": "2025-11-14T01:00:00Z", "wind_speed": 5, "wave_height": 1.5, "wave_period": 8},
+        {"timestamp": "2025-11-14T02:00:00Z", "wind_speed": 5, "wave_height": 2.0, "wave_period": 8},
+        {"timestamp": "2025-11-14T03:00:00", "wind_speed": 5, "wave_height": 1.0, "wave_period": 8},
+        {"timestamp": "2025-11-14T03:00:00Z", "wind_speed": 5, "wave_height": -1.0, "wave_period": 8},
+        {"timestamp": "2025-11-14T03:00:00Z", "wind_speed": 5, "wave_height": 1.0},
+        # Second batch of three: overrides an appended timestamp and adds one
+        {"timestamp": "2025-11-14T01:00:00+00:00", "wind_speed": 6, "wave_height": 0.5, "wave_period": 9},
+        {"timestamp": "2025-11-14T04:00:00Z", "wind_speed": 6, "wave_height": 0.7, "wave_period": 9},
+    ]
+    data = "\n".join(json.dumps(line) for line in lines[:6]) + "\n{oops\n" + "\n".join(map(json.dumps, lines[6:]))
+
+    grid, stats = _ingest([data.encode()], "ndjson", batch_size=3)
+
+    assert format_timestamps(grid.times) == ["2025-11-14T01:00:00Z", "2025-11-14T02:00:00Z", "2025-11-14T04:00:00Z"]
+    assert grid.columns["wave_height"][0, 0].tolist() == [0.5, 2.0, 0.7]
+    assert {k: stats[k] for k in ("records", "rejected", "duplicates", "appended", "replaced")} == {
+        "records": 9, "rejected": 4, "duplicates": 1, "appended": 3, "replaced": 1,
+    }
+    assert [e["record"] for e in stats["errors"]] == [4, 5, 6, 7]
+    assert "UTC offset" in stats["errors"][0]["error"]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_over_long_lines_are_rejected_without_buffering_them(fmt):
+    header = b"timestamp,wind_speed,wave_height,wave_period\n" if fmt == "csv" else b""
+    record = (b"2025-11-14T01:00:00Z,5,1.0,8" if fmt == "csv" else
+              b'{"timestamp": "2025-11-14T01:00:00Z", "wind_speed": 5, "wave_height": 1.0, "wave_period": 8}')
+    junk = b"x" * (MAX_RECORD_BYTES // 8)
+
+    def chunks():
+        yield header + record + b"\n"
+        for _ in range(200):  # 25 MB without a newline
+            yield junk
+        yield b"\n" + record
+
+    tracemalloc.start()
+    records = list(iter_records(chunks(), fmt))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert [type(r) for r in records] == [dict, ValueError, dict]
+    assert "longer than" in str(records[1])
+    assert peak < 4 * MAX_RECORD_BYTES
+
+    with pytest.raises(ValueError, match="CSV header"):
+        list(iter_records([junk] * 10 + [b"\n" + record], "csv"))
+
+
+def test_merge_leaves_published_grids_unchanged(tmp_path):
+    source = ForecastGrid([61.5], [4.8], [0, 3600], {name: np.full((1, 1, 2), 1.1) for name in VARIABLES})
+    source.to_binary(tmp_path / "one.wxf")
+    mapped = ForecastGrid.from_binary(tmp_path / "one.wxf")
+
+    appended, replaced = mapped.merge([7200, 10800], {name: [2.2, 3.3] for name in VARIABLES})
+    assert replaced == 0
+    tail, _ = appended.merge([14400], {name: [4.4] for name in VARIABLES})
+    overlap, replaced = tail.merge([3600, 5400], {name: [9.9, 8.8] for name in VARIABLES})
+
+    assert replaced == 1
+    # float32 file values come back rounded to their decimals, and earlier grids still see their own series
+    assert appended.columns["wave_height"][0, 0].tolist() == [1.1, 1.1, 2.2, 3.3]
+    assert tail.columns["wave_height"][0, 0].tolist() == [1.1, 1.1, 2.2, 3.3, 4.4]
+    assert overlap.times.tolist() == [0, 3600, 5400, 7200, 10800, 14400]
+    assert overlap.columns["wave_height"][0, 0].tolist() == [1.1, 9.9, 8.8, 2.2, 3.3, 4.4]
+    # A stale grid must not write into the buffer tail its successor uses
+    stale, _ = appended.merge([99999], {name: [0.0] for name in VARIABLES})
+    assert tail.columns["wave_height"][0, 0].tolist() == [1.1, 1.1, 2.2, 3.3, 4.4]
+    assert stale.times.tolist() == [0, 3600, 7200, 10800, 99999]
+
+
+def test_streaming_ingest_memory_does_not_grow_with_the_feed(tmp_path):
+    peaks = {}
+    for size in (200_000, 2_000_000, 8_000_000):
+        # Every cycle revises the same ten days, so the deduplicated series has the same size for any feed
+        path = tmp_path / f"feed_{size}.ndjson"
+        write_feed(path, size, start=1_700_000_000, cycle=0)
+        tracemalloc.start()
+        with open(path, "rb") as f:
+            _, stats = _ingest(read_chunks(f), "ndjson", batch_size=2_000)
+        peaks[size] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert stats["rejected"] == 0 and stats["appended"] == 1440
+
+    # One chunk plus one batch, whatever the size of the feed (the smallest run only warms up)
+    assert peaks[8_000_000] < 1.2 * peaks[2_000_000]
+    assert peaks[8_000_000] < 8_000_000 / 10
+
+
+@pytest.fixture
+def weather_client(monkeypatch):
+    monkeypatch.setattr(external_weather, "_forecast_grid", _empty_grid())
+    app = FastAPI()
+    app.include_router(external_weather.router)
+    return TestClient(app)
+
+
+def test_forecast_feed_endpoint_appends_without_restart(weather_client, tmp_path):
+    path = tmp_path / "feed.csv"
+    records = write_feed(path, 50_000, start=1_700_000_000, interval=1800, horizon=24 * 3600, cycle=6 * 3600)
+
+    with open(path, "rb") as f:
+        response = weather_client.post("/weather-service/forecast", params={"batch_size": 100},
+                                       content=read_chunks(f, 4096), headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["records"] == records and stats["rejected"] == 0
+    assert stats["appended"] == stats["forecast"]["points"]
+    first = parse_timestamp(stats["forecast"]["from"])
+    served = weather_client.get("/weather-service/weather",
+                                params={"from": first, "time_to": first + 3 * 3600}).json()["forecast"]
+    assert [entry["timestamp"] for entry in served] == format_timestamps(first + 1800 * np.arange(7))
+
+
+def test_forecast_feed_endpoint_rejects_unusable_feeds(weather_client):
+    assert weather_client.post("/weather-service/forecast", content=b"x", headers={"Content-Type": "text/plain"}
+                               ).status_code == 415
+
+    response = weather_client.post("/weather-service/forecast", params={"format": "json"}, content=b'{"forecast": [{"a"')
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"].startswith("Malformed JSON forecast")
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import job_events
+from app.api import celeri_worker
+from app.database import get_async_session_factory
+from app.job_events import JobEventBus, RedisJobEventBus
+from app.models.celery_job import CeleryJob
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    fake = JobEventBus()
+    monkeypatch.setattr(job_events, "_bus", fake)
+    monkeypatch.setattr(celeri_worker, "dispatch_batch", lambda *args, **kwargs: None)
+    return fake
+
+
+def _events(text):
+    return [json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")]
+
+
+def _publish_later(bus, events):
+    # The test client returns once the stream has ended, so the worker side runs in a thread
+    def run():
+        time.sleep(0.2)
+        for event in events:
+            bus.publish(event)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _event(job_id, batch_id, status, progress, minutes):
+    updated = datetime(2030, 1, 1) + timedelta(minutes=minutes)
+    return {"job_id": job_id, "batch_id": batch_id, "status": status, "progress": progress,
+            "updated_at": updated.isoformat()}
+
+
+def test_job_stream_sends_only_changes_and_ends_when_finished(schedule_client, session_factory, bus):
+    with session_factory() as db:
+        job = CeleryJob(params={}, status="PENDING")
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    _publish_later(bus, [
+        _event(job_id + 1, None, "RUNNING", 0, 1),   # other job: ignored
+        _event(job_id, None, "RUNNING", 0, 1),
+        _event(job_id, None, "RUNNING", 0, 2),       # no change: dropped
+        _event(job_id, None, "RUNNING", 50, 3),
+        _event(job_id, None, "SUCCEEDED", 100, 4),
+    ])
+    response = schedule_client.get(f"/celery-worker/tasks/{job_id}/events")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    received = [(e["status"], e["progress"]) for e in _events(response.text)]
+    assert received == [("PENDING", 0), ("RUNNING", 0), ("RUNNING", 50), ("SUCCEEDED", 100)]
+
+
+def test_batch_stream_ends_after_every_job_finishes(schedule_client, bus):
+    body = schedule_client.post("/celery-worker/submit_batch", json=[{"HS": 1}, {"HS": 2}]).json()
+    batch_id, (first, second) = body["batch_id"], body["job_ids"]
+
+    _publish_later(bus, [
+        _event(first, batch_id, "SUCCEEDED", 100, 1),
+        _event(second, batch_id, "FAILED", 0, 2),
+    ])
+    response = schedule_client.get(f"/celery-worker/batch/{batch_id}/events")
+
+    received = [(e["job_id"], e["status"]) for e in _events(response.text)]
+    assert received == [(first, "PENDING"), (second, "PENDING"), (first, "SUCCEEDED"), (second, "FAILED")]
+    assert schedule_client.get("/celery-worker/tasks/999/events").status_code == 404
+
+
+def test_stream_closes_its_session_before_streaming(api_app, schedule_client, session_factory, bus):
+    with session_factory() as db:
+        job = CeleryJob(params={}, status="RUNNING")
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    log = []
+    factory = api_app.dependency_overrides[get_async_session_factory]()
+
+    class TrackedSession(factory.class_):
+        async def close(self):
+            log.append("close")
+            await super().close()
+
+    tracked = async_sessionmaker(class_=TrackedSession, **factory.kw)
+    api_app.dependency_overrides[get_async_session_factory] = lambda: tracked
+
+    def run():
+        time.sleep(0.2)
+        log.append("event")
+        bus.publish(_event(job_id, None, "SUCCEEDED", 100, 1))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    response = schedule_client.get(f"/celery-worker/tasks/{job_id}/events")
+    thread.join()
+
+    # The snapshot session was closed while the stream was still waiting for the worker
+    assert log == ["close", "event"]
+    assert [e["status"] for e in _events(response.text)] == ["RUNNING", "SUCCEEDED"]
+
+
+class _FakePubSub:
+    """Redis pub/sub stand-in: the test pushes server messages (or an exception) into ``messages``."""
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        pass  # the confirmation arrives as a message, when the test sends it
+
+    async def listen(self):
+        while True:
+            message = await self.messages.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+    async def aclose(self):
+        pass
+
+
+class _FakeRedis:
+    def __init__(self, connections):
+        self._pubsub = _FakePubSub()
+        connections.append(self._pubsub)
+
+    def pubsub(self):
+        return self._pubsub
+
+    async def aclose(self):
+        pass
+
+
+def test_redis_bus_waits_for_the_subscription_and_recovers_from_failures(monkeypatch, caplog):
+    connections = []
+    monkeypatch.setattr(job_events.aioredis, "from_url", lambda url: _FakeRedis(connections))
+    monkeypatch.setattr(job_events, "LISTENER_RESTART_SECONDS", 0.01)
+
+    async def scenario():
+        bus = RedisJobEventBus()
+        subscribing = asyncio.ensure_future(bus.subscribe())
+        await asyncio.sleep(0.05)
+        assert not subscribing.done()  # not before Redis confirmed SUBSCRIBE
+
+        await connections[0].messages.put({"type": "subscribe"})
+        queue = await subscribing
+        await connections[0].messages.put({"type": "message", "data": json.dumps({"job_id": 1})})
+        assert await asyncio.wait_for(queue.get(), 1) == {"job_id": 1}
+
+        # Redis drops: the open stream is ended with an error and the listener comes back on its own
+        await connections[0].messages.put(ConnectionError("connection reset"))
+        assert "error" in await asyncio.wait_for(queue.get(), 1)
+        await asyncio.sleep(0.1)
+        assert len(connections) == 2
+        await connections[1].messages.put({"type": "subscribe"})
+        assert await asyncio.wait_for(bus.subscribe(), 1) is not None
+        bus._listener.cancel()
+
+    with caplog.at_level(logging.ERROR, logger="app.job_events"):
+        asyncio.run(scenario())
+    assert "Job event listener stopped" in caplog.text
@@ -1,4 +1,16 @@
-from app.lib import wow_analysis
+import random
+
+import numpy as np
+import pytest
+
+from app.lib import (
+    chain_schedule,
+    ensemble_window_probabilities,
+    topological_order,
+    window_start_mask,
+    wow_analysis,
+    wow_analysis_batch,
+)
 
 
 def test_wow_analysis_detects_valid_windows():
@@ -10,3 +22,116 @@ def test_wow_analysis_detects_valid_windows():
 
     assert go_no_go == [True, True, True, False, True, True, True]
     assert start_indices == [0, 4]
+
+
+def _reference_wow_analysis(wave_height_series, task_duration, wave_height_limit):
+    # Original O(n*d) loop, kept as the oracle for the vectorized engine
+    n = len(wave_height_series)
+    go_no_go_signals = [wave_height_series[i] <= wave_height_limit for i in range(n)]
+    start_indices = []
+    for i in range(n - task_duration + 1):
+        valid_window = True
+        for j in range(task_duration):
+            if wave_height_series[i + j] > wave_height_limit:
+                valid_window = False
+                break
+        if valid_window:
+            start_indices.append(i)
+    return go_no_go_signals, start_indices
+
+
+def test_wow_analysis_matches_reference_loop():
+    rng = random.Random(1234)
+    for _ in range(500):
+        n = rng.randint(0, 60)
+        wave_series = [round(rng.uniform(0.0, 4.0), 1) for _ in range(n)]
+        if wave_series and rng.random() < 0.2:
+            wave_series[rng.randrange(n)] = float("nan")
+        task_duration = rng.randint(-2, n + 2)
+        wave_limit = rng.choice([0.0, 1.0, 1.5, 2.0, 2.5, 4.0])
+
+        assert wow_analysis(wave_series, task_duration, wave_limit) == _reference_wow_analysis(
+            wave_series, task_duration, wave_limit
+        )
+
+
+def test_wow_analysis_batch_matches_single_calls():
+    rng = np.random.default_rng(42)
+    wave_series = rng.uniform(0.0, 3.5, size=24 * 7 * 6)
+    durations = np.array([1, 2, 4, 12, 30, 100])
+    limits = np.array([1.0, 1.5, 2.0, 2.5, 3.0, 3.5])
+
+    go_no_go, start_indices = wow_analysis_batch(wave_series, durations, limits)
+
+    assert go_no_go.shape == (len(durations), len(wave_series))
+    for k, (duration, limit) in enumerate(zip(durations, limits)):
+        expected_go, expected_starts = _reference_wow_analysis(list(wave_series), int(duration), float(limit))
+        assert go_no_go[k].tolist() == expected_go
+        assert start_indices[k].tolist() == expected_starts
+
+
+def test_ensemble_probabilities_average_member_analyses():
+    rng = np.random.default_rng(7)
+    ensemble = rng.uniform(0.0, 3.5, size=(20, 24 * 5))
+    ensemble[3, 10] = np.nan
+    durations = np.array([1, 6, 24])
+    limits = np.array([1.5, 2.5, 3.0])
+
+    p_go, p_window = ensemble_window_probabilities(ensemble, durations, limits)
+
+    assert p_go.shape == p_window.shape == (len(durations), ensemble.shape[1])
+    members = [wow_analysis_batch(series, durations, limits) for series in ensemble]
+    expected_go = np.mean([go for go, _ in members], axis=0)
+    expected_window = np.zeros_like(expected_go)
+    for _, starts in members:
+        for k, indices in enumerate(starts):
+            expected_window[k, indices] += 1 / len(ensemble)
+    np.testing.assert_allclose(p_go, expected_go)
+    np.testing.assert_allclose(p_window, expected_window)
+
+
+def test_window_start_mask_rejects_empty_windows():
+    with pytest.raises(ValueError):
+        window_start_mask([False, True], 0)
+
+
+def test_chain_schedule_respects_predecessors_and_limits():
+    wave_series = [1.0, 1.0, 3.0, 1.0, 1.0, 1.0, 1.8, 1.0, 1.0, 1.0]
+    # 0 -> 1 -> 2, plus an independent task 3 that never fits
+    durations = [2, 2, 3, 4]
+    limits = [2.0, 2.0, 1.5, 0.5]
+    predecessors = [None, 0, 1, None]
+
+    starts, ends = chain_schedule(wave_series, durations, limits, predecessors)
+
+    assert starts.tolist() == [0, 3, 7, -1]
+    assert ends.tolist() == [2, 5, 10, -1]
+
+
+def test_chain_schedule_matches_brute_force():
+    rng = random.Random(99)
+    for _ in range(200):
+        n = rng.randint(1, 40)
+        wave_series = [rng.choice([0.5, 1.0, 1.5, 2.0, 2.5]) for _ in range(n)]
+        k = rng.randint(1, 6)
+        durations = [rng.randint(1, 5) for _ in range(k)]
+        limits = [rng.choice([1.0, 1.5, 2.0, 2.5]) for _ in range(k)]
+        predecessors = [None] + [rng.choice([None, *range(i)]) for i in range(1, k)]
+
+        starts, _ = chain_schedule(wave_series, durations, limits, predecessors)
+
+        expected_end = {}
+        for t in range(k):
+            p = predecessors[t]
+            earliest = 0 if p is None else expected_end.get(p)
+            _, valid = _reference_wow_analysis(wave_series, durations[t], limits[t])
+            candidates = [i for i in valid if earliest is not None and i >= earliest]
+            if candidates:
+                expected_end[t] = candidates[0] + durations[t]
+            assert starts[t] == (candidates[0] if candidates else -1)
+
+
+def test_topological_order_detects_cycles():
+    assert topological_order([None, 2, 0]) == [0, 2, 1]
+    with pytest.raises(ValueError):
+        topological_order([1, 0])
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+import numpy as np
+
+from app.api import external_weather
+from benchmarks.load_harness import build_app, run_load, scenarios, seed_database, summarize
+
+
+def test_summary_percentiles_and_throughput():
+    summary = summarize(np.arange(1, 101) / 1000.0, elapsed=2.0, errors=1, concurrency=4)
+
+    assert summary["p50_ms"] == 50.5
+    assert summary["p99_ms"] == 99.01
+    assert summary["throughput_rps"] == 50.0
+    assert summary["errors"] == 1
+
+
+def test_harness_drives_every_scenario_in_process(tmp_path, monkeypatch):
+    # build_app installs a synthetic grid; restore the lazily loaded one afterwards
+    monkeypatch.setattr(external_weather, "_forecast_grid", None)
+    app = build_app(seed_database(tmp_path / "bench.db", extra_tasks=10), pool_size=4, cache_ttl_seconds=600)
+    mix = scenarios([3, 4, 100], [(61.5, 4.8), (58.0, 2.0)])
+
+    async def drive():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results = {name: await run_load(client, make_request, 12, 4) for name, make_request in mix.items()}
+        await app.state.weather_client.aclose()
+        await app.state.async_engine.dispose()
+        return results
+
+    for name, summary in asyncio.run(drive()).items():
+        assert summary["requests"] == 12 and summary["errors"] == 0, name
+        assert 0 < summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"] <= summary["max_ms"]
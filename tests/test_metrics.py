@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.api import metrics as metrics_api
+from app.metrics import JobDurationCollector, MetricsMiddleware, SCHEDULE_STAGES
+from app.models.celery_job import CeleryJob
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_window_records_every_stage(schedule_client):
+    name = "schedule_stage_duration_seconds_count"
+    before = {stage: _sample(name, endpoint="window", stage=stage) for stage in SCHEDULE_STAGES}
+
+    assert schedule_client.get("/schedule/window", params={"schedule_id": 3}).status_code == 200
+
+    for stage in SCHEDULE_STAGES:
+        assert _sample(name, endpoint="window", stage=stage) == before[stage] + 1
+
+
+def test_metrics_endpoint_folds_finished_jobs_once(api_app, session_factory, monkeypatch):
+    monkeypatch.setattr(metrics_api, "job_duration_collector", JobDurationCollector(since=datetime(2000, 1, 1)))
+    api_app.include_router(metrics_api.router)
+    api_app.add_middleware(MetricsMiddleware)
+    created = datetime(2026, 1, 1, 12, 0, 0)
+    with session_factory() as db:
+        db.add_all([
+            CeleryJob(params={}, status="SUCCEEDED", created_at=created, started_at=created + timedelta(seconds=2),
+                      updated_at=created + timedelta(seconds=32)),
+            CeleryJob(params={}, status="RUNNING", created_at=created, started_at=created + timedelta(seconds=1),
+                      updated_at=created + timedelta(seconds=5)),
+        ])
+        db.commit()
+    run_count = _sample("celery_job_run_duration_seconds_count", status="SUCCEEDED")
+    run_sum = _sample("celery_job_run_duration_seconds_sum", status="SUCCEEDED")
+    wait_sum = _sample("celery_job_queue_wait_seconds_sum", status="SUCCEEDED")
+
+    with TestClient(api_app) as client:
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "schedule_stage_duration_seconds_bucket" in response.text
+        client.get("/metrics")
+
+    # Only the finished job counts, and a second scrape does not count it again
+    assert _sample("celery_job_run_duration_seconds_count", status="SUCCEEDED") == run_count + 1
+    assert _sample("celery_job_run_duration_seconds_sum", status="SUCCEEDED") == run_sum + 30
+    assert _sample("celery_job_queue_wait_seconds_sum", status="SUCCEEDED") == wait_sum + 2
+    assert _sample("http_request_duration_seconds_count", method="GET", route="/metrics", status="200") >= 2
+
+
+def test_job_collector_folds_late_commits_within_the_grace_window(session_factory):
+    collector = JobDurationCollector(since=datetime(2000, 1, 1), grace=timedelta(seconds=60))
+    created = datetime(2026, 2, 1, 12, 0, 0)
+
+    def finish(updated_seconds):
+        with session_factory() as db:
+            db.add(CeleryJob(params={}, status="SUCCEEDED", created_at=created, started_at=created,
+                             updated_at=created + timedelta(seconds=updated_seconds)))
+            db.commit()
+
+    with session_factory() as db:
+        finish(100)
+        assert collector.collect(db) == 1
+        # Stamped before the job above but committed after the scrape
+        finish(70)
+        finish(110)
+        assert collector.collect(db) == 2
+        assert collector.collect(db) == 0
+        # Older than the grace window: beyond what a scrape looks back for
+        finish(10)
+        assert collector.collect(db) == 0
@@ -0,0 +1,78 @@
+from datetime import datetime
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text, create_engine, inspect, text,
+)
+
+from app.models import Base
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+def _alembic_config(url):
+    config = Config(str(ROOT_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def test_migrations_reach_the_model_schema_and_back(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    config = _alembic_config(url)
+    engine = create_engine(url)
+
+    command.upgrade(config, "head")
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+        indexes = {i["name"] for i in inspect(connection).get_indexes("celery_job")}
+    assert "ix_celery_job_status_created_at" in indexes
+
+    command.downgrade(config, "base")
+    assert set(inspect(engine).get_table_names()) == {"alembic_version"}
+    engine.dispose()
+
+
+def _baseline_metadata():
+    """The task and celery_job tables exactly as the app created them before Alembic was introduced."""
+    metadata = MetaData()
+    Table("task", metadata,
+          Column("id", Integer, primary_key=True), Column("name", String), Column("duration", String),
+          Column("predecessor", Integer, ForeignKey("task.id"), nullable=True), Column("status", String),
+          Column("wave_height_limit", Float))
+    Table("celery_job", metadata,
+          Column("id", Integer, primary_key=True), Column("params", Text, nullable=False),
+          Column("status", String(32), nullable=False), Column("result", Text, nullable=True),
+          Column("error", Text, nullable=True), Column("created_at", DateTime, nullable=False),
+          Column("updated_at", DateTime, nullable=False))
+    return metadata
+
+
+def test_baseline_database_can_be_stamped_and_upgraded(tmp_path):
+    url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    config = _alembic_config(url)
+    engine = create_engine(url)
+    baseline = _baseline_metadata()
+    baseline.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(baseline.tables["celery_job"].insert(), [
+            {"params": '{"HS": 2}', "status": "SUCCEEDED", "created_at": datetime(2025, 11, 14),
+             "updated_at": datetime(2025, 11, 14)},
+        ])
+
+    # Revision 0001 describes exactly the baseline, so an existing database is adopted by stamping it
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), baseline) == []
+    command.stamp(config, "0001")
+    command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+        job = connection.execute(text("SELECT progress, batch_id FROM celery_job")).one()
+    assert tuple(job) == (0, None)
+    engine.dispose()
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timedelta
+
+from app.api.pagination import encode_cursor
+from app.models.celery_job import CeleryJob
+
+
+def _seed_jobs(session_factory, n):
+    base = datetime(2025, 11, 14, 8, 0)
+    with session_factory() as db:
+        for i in range(n):
+            # Pairs of jobs share a created_at so the id tie-breaker is exercised
+            created = base + timedelta(minutes=i // 2)
+            db.add(CeleryJob(params={"i": i}, status="SUCCEEDED" if i % 3 else "FAILED",
+                             created_at=created, updated_at=created))
+        db.commit()
+
+
+def _all_pages(client, url, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_celery_jobs_keyset_pages_cover_table_once(schedule_client, session_factory):
+    _seed_jobs(session_factory, 25)
+
+    pages = _all_pages(schedule_client, "/celery-worker/tasks", limit=10)
+
+    assert [len(p) for p in pages] == [10, 10, 5]
+    ids = [job["id"] for p in pages for job in p]
+    assert ids == list(range(1, 26))
+
+
+def test_celery_jobs_filters(schedule_client, session_factory):
+    _seed_jobs(session_factory, 25)
+
+    failed = schedule_client.get("/celery-worker/tasks", params={"status": "FAILED"}).json()
+    recent = schedule_client.get("/celery-worker/tasks", params={"created_from": "2025-11-14T08:10:00"}).json()
+
+    assert {job["status"] for job in failed} == {"FAILED"} and len(failed) == 9
+    assert [job["id"] for job in recent] == list(range(21, 26))
+    assert schedule_client.get("/celery-worker/tasks", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_forged_cursors_are_rejected(schedule_client):
+    # Right length, wrong types: must not reach the keyset comparison
+    for url, cursor in [("/celery-worker/tasks", encode_cursor("x", "y")),
+                        ("/celery-worker/tasks", encode_cursor("2025-11-14T08:00:00", True)),
+                        ("/schedule/tasks", encode_cursor("7")),
+                        ("/schedule/tasks", encode_cursor(None))]:
+        assert schedule_client.get(url, params={"cursor": cursor}).status_code == 400
+
+
+def test_ndjson_export_streams_every_row(schedule_client, session_factory):
+    _seed_jobs(session_factory, 25)
+
+    response = schedule_client.get("/celery-worker/tasks", headers={"Accept": "application/x-ndjson"},
+                                   params={"limit": 1})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    jobs = [json.loads(line) for line in response.text.splitlines()]
+    assert [job["id"] for job in jobs] == list(range(1, 26))
+
+    tasks = schedule_client.get("/schedule/tasks", params={"format": "ndjson", "status": ["READY", "BLOCKED"]})
+    assert [json.loads(line)["id"] for line in tasks.text.splitlines()] == [3, 4, 5]
+
+
+def test_task_pages_keep_list_shape(schedule_client):
+    pages = _all_pages(schedule_client, "/schedule/tasks", limit=2)
+
+    assert [[t["id"] for t in p] for p in pages] == [[1, 2], [3, 4], [5]]
+    assert set(pages[0][0]) == {"id", "name", "duration", "predecessor", "status", "wave_height_limit",
+                                "criteria"}
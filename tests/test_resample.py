@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.external_weather import get_forecast_grid, router as weather_router
+from app.resample import parse_aggregation, parse_resolution, resample
+
+
+def _reference_hourly_mean(times, values):
+    # The dict-of-buckets loop schedule_window used before the resampler
+    buckets = {}
+    for t, v in zip(times, values):
+        b = buckets.setdefault(t // 3600 * 3600, [0.0, 0])
+        b[0] += v
+        b[1] += 1
+    return sorted(buckets), [buckets[k][0] / buckets[k][1] for k in sorted(buckets)]
+
+
+def test_hourly_mean_matches_reference_loop():
+    rng = np.random.default_rng(7)
+    times = np.sort(rng.choice(np.arange(0, 3600 * 48, 60), size=500, replace=False))
+    values = rng.uniform(0, 4, size=times.size)
+
+    bucket_times, aggregated = resample(times, {"wave_height": values}, 3600)
+
+    expected_times, expected_values = _reference_hourly_mean(times.tolist(), values.tolist())
+    assert bucket_times.tolist() == expected_times
+    assert aggregated["wave_height"] == pytest.approx(expected_values)
+
+
+def test_per_variable_aggregation_skips_empty_buckets():
+    times = np.array([0, 600, 7200, 7800])
+    columns = {"wave_height": np.array([1.0, 3.0, 2.0, 0.5]), "wind_speed": np.array([4.0, 6.0, 1.0, 3.0])}
+
+    bucket_times, aggregated = resample(times, columns, parse_resolution("1h"),
+                                        parse_aggregation("wave_height:max", columns))
+
+    assert bucket_times.tolist() == [0, 7200]
+    assert aggregated["wave_height"].tolist() == [3.0, 2.0]
+    assert aggregated["wind_speed"].tolist() == [5.0, 2.0]
+
+
+def test_weather_endpoint_resolution_parameter():
+    app = FastAPI()
+    app.include_router(weather_router)
+    client = TestClient(app)
+    forecast_grid = get_forecast_grid()
+    first, last = int(forecast_grid.times[0]), int(forecast_grid.times[-1])
+
+    raw = client.get("/weather-service/weather", params={"from": first, "time_to": last}).json()["forecast"]
+    hourly = client.get("/weather-service/weather",
+                        params={"from": first, "time_to": last, "resolution": "1h", "aggregation": "max"})
+
+    assert hourly.status_code == 200
+    forecast = hourly.json()["forecast"]
+    assert len(forecast) < len(raw)
+    assert all(p["timestamp"].endswith(":00:00Z") for p in forecast)
+    assert max(p["wave_height"] for p in forecast) == max(p["wave_height"] for p in raw)
+    bad = client.get("/weather-service/weather", params={"from": first, "time_to": last, "resolution": "1h",
+                                                         "aggregation": "median"})
+    assert bad.status_code == 400
@@ -0,0 +1,234 @@
+import httpx
+from fastapi.testclient import TestClient
+
+from app.api.columnar import expand_run_lengths, run_lengths, time_axis
+from app.forecast_store import format_timestamps
+from app.models.schedule import Task
+from app.weather_client import WeatherClient
+from conftest import half_hourly_forecast
+
+
+def test_schedule_window_resamples_hourly_and_finds_windows(schedule_client):
+    response = schedule_client.get("/schedule/window", params={"schedule_id": 3, "lookahead_hours": 48})
+
+    assert response.status_code == 200
+    body = response.json()
+    timeline = body["hourly_forecast"]
+    assert 47 <= len(timeline) <= 49
+    assert {p["wave_height"] for p in timeline} <= {1.0, 3.0}
+    assert body["analysis"]["go_no_go"] == [p["wave_height"] <= 2.0 for p in timeline]
+    assert body["analysis"]["start_windows"]
+    assert all(w["duration_hours"] == 2 for w in body["analysis"]["start_windows"])
+
+
+def test_schedule_window_reuses_cached_forecast(schedule_client):
+    for _ in range(3):
+        assert schedule_client.get("/schedule/window", params={"schedule_id": 4}).status_code == 200
+
+    stats = schedule_client.get("/schedule/forecast-cache").json()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_schedule_window_unknown_task(schedule_client):
+    assert schedule_client.get("/schedule/window", params={"schedule_id": 999}).status_code == 404
+
+
+def test_schedule_windows_batch_matches_single_task_calls(schedule_client):
+    batch = schedule_client.get("/schedule/windows", params={"lookahead_hours": 72})
+
+    assert batch.status_code == 200
+    body = batch.json()
+    assert [w["schedule_id"] for w in body["windows"]] == [3, 4, 5]  # READY and BLOCKED by default
+    for window in body["windows"]:
+        single = schedule_client.get(
+            "/schedule/window", params={"schedule_id": window["schedule_id"], "lookahead_hours": 72}
+        ).json()
+        assert single["hourly_forecast"] == body["hourly_forecast"]
+        assert single["analysis"] == window["analysis"]
+
+    assert schedule_client.get("/schedule/forecast-cache").json()["misses"] == 1
+
+
+def test_schedule_windows_by_task_ids_reports_missing(schedule_client):
+    body = schedule_client.get("/schedule/windows", params=[("task_id", 1), ("task_id", 4), ("task_id", 42)]).json()
+
+    assert [w["schedule_id"] for w in body["windows"]] == [1, 4]
+    assert body["missing_task_ids"] == [42]
+
+
+def test_schedule_windows_reports_malformed_tasks_and_analyses_the_rest(schedule_client, session_factory):
+    before = schedule_client.get("/schedule/windows").json()["windows"]
+    with session_factory() as db:
+        db.get(Task, 4).duration = "half a day"
+        db.commit()
+
+    response = schedule_client.get("/schedule/windows")
+
+    assert response.status_code == 200
+    windows = {w["schedule_id"]: w for w in response.json()["windows"]}
+    assert list(windows) == [3, 4, 5]
+    assert windows[4]["error"] == "Invalid task fields: duration must be like '4h'"
+    assert "analysis" not in windows[4]
+    assert [windows[w["schedule_id"]]["analysis"] for w in before if w["schedule_id"] != 4] == \
+        [w["analysis"] for w in before if w["schedule_id"] != 4]
+
+    with session_factory() as db:
+        for task_id in (3, 5):
+            db.get(Task, task_id).criteria = "open('x')"
+        db.commit()
+    windows = schedule_client.get("/schedule/windows").json()["windows"]
+    assert all("error" in w for w in windows)
+
+
+def test_schedule_plan_orders_chain_after_predecessors(schedule_client):
+    response = schedule_client.get("/schedule/plan", params={"lookahead_hours": 96})
+
+    assert response.status_code == 200
+    chains = response.json()["chains"]
+    assert len(chains) == 1 and chains[0]["root_id"] == 1
+    tasks = chains[0]["tasks"]
+    assert [t["id"] for t in tasks] == [1, 2, 3, 4, 5]
+    assert tasks[0]["start"] is None and tasks[0]["feasible"]
+
+    previous_end = None
+    for t in tasks[2:]:
+        assert t["feasible"]
+        if previous_end is not None:
+            assert t["start"] >= previous_end
+        previous_end = t["end"]
+
+
+def test_schedule_plan_blocks_successors_of_malformed_tasks(schedule_client, session_factory):
+    with session_factory() as db:
+        db.get(Task, 4).duration = "half a day"
+        db.commit()
+
+    response = schedule_client.get("/schedule/plan", params={"lookahead_hours": 96})
+
+    assert response.status_code == 200
+    tasks = {t["id"]: t for t in response.json()["chains"][0]["tasks"]}
+    assert tasks[3]["feasible"] and "error" not in tasks[3]
+    assert tasks[4]["error"] == "Invalid task fields: duration must be like '4h'"
+    assert not tasks[4]["feasible"] and tasks[4]["start"] is None
+    assert not tasks[5]["feasible"] and tasks[5]["start"] is None
+
+    # A running task whose duration cannot be read leaves its successors unplanned too
+    with session_factory() as db:
+        db.get(Task, 4).duration = "3h"
+        db.get(Task, 3).status, db.get(Task, 3).duration = "STARTED", "soon"
+        db.commit()
+    tasks = {t["id"]: t for t in schedule_client.get("/schedule/plan").json()["chains"][0]["tasks"]}
+    assert "error" in tasks[3]
+    assert not tasks[4]["feasible"] and not tasks[5]["feasible"]
+
+
+def test_task_listing_and_status_updates_share_the_database(schedule_client):
+    assert schedule_client.put("/schedule/task/3/started").status_code == 200
+
+    tasks = {t["id"]: t for t in schedule_client.get("/schedule/tasks").json()}
+
+    assert len(tasks) == 5
+    assert tasks[3]["status"] == "STARTED"
+    assert schedule_client.get("/celery-worker/tasks").json() == []
+
+
+def test_schedule_window_columnar_matches_records(schedule_client):
+    params = {"schedule_id": 4, "lookahead_hours": 72}
+    records = schedule_client.get("/schedule/window", params=params).json()
+    columnar = schedule_client.get("/schedule/window", params={**params, "format": "columnar"}).json()
+
+    series = columnar["hourly_forecast"]
+    assert columnar["format"] == "columnar" and "times" not in series
+    times = [series["start"] + i * series["step"] for i in range(series["count"])]
+    assert format_timestamps(times) == [r["timestamp"] for r in records["hourly_forecast"]]
+    for name, values in series["columns"].items():
+        assert values == [r[name] for r in records["hourly_forecast"]]
+
+    analysis = columnar["analysis"]
+    assert expand_run_lengths(analysis["go_no_go"]).tolist() == records["analysis"]["go_no_go"]
+    starts = format_timestamps(analysis["start_windows"]["start"])
+    assert starts == [w["start"] for w in records["analysis"]["start_windows"]]
+    assert analysis["start_windows"]["duration_hours"] == 3
+
+
+def test_run_lengths_round_trip_and_gapped_axis():
+    for mask in ([], [True], [False, False, True, True, True, False], [True] * 5):
+        encoded = run_lengths(mask)
+        assert sum(encoded["runs"]) == len(mask)
+        assert expand_run_lengths(encoded).tolist() == mask
+
+    assert "times" not in time_axis([0, 3600, 7200], 3600)
+    assert time_axis([0, 3600, 10800], 3600)["times"].tolist() == [0, 3600, 10800]
+
+
+def ensemble_forecast(request: httpx.Request) -> httpx.Response:
+    """Four-member stand-in: three members follow the calm/rough cycle, one stays rough throughout."""
+    deterministic = half_hourly_forecast(request).json()
+    for point in deterministic["forecast"]:
+        point["wave_height"] = [point["wave_height"]] * 3 + [3.0]
+        point["wind_speed"] = [point["wind_speed"]] * 4
+        point["wave_period"] = [point["wave_period"]] * 4
+    return httpx.Response(200, json=deterministic)
+
+
+def test_schedule_window_thresholds_ensemble_probabilities(api_app):
+    api_app.state.weather_client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(ensemble_forecast)))
+    params = {"schedule_id": 3, "lookahead_hours": 48}
+    with TestClient(api_app) as client:
+        strict = client.get("/schedule/window", params=params).json()
+        relaxed = client.get("/schedule/window", params={**params, "confidence": 0.75}).json()
+
+    assert strict["ensemble_members"] == 4
+    # The hourly forecast is the ensemble mean
+    assert {p["wave_height"] for p in strict["hourly_forecast"]} <= {1.5, 3.0}
+    analysis = strict["analysis"]
+    assert analysis["confidence"] == 0.9
+    assert set(analysis["p_go"]) <= {0.0, 0.75}
+    # No hour reaches 90% agreement, but every calm hour reaches 75%
+    assert not any(analysis["go_no_go"]) and not analysis["start_windows"]
+    assert relaxed["analysis"]["go_no_go"] == [p == 0.75 for p in analysis["p_go"]]
+    assert relaxed["analysis"]["start_windows"]
+
+
+def test_schedule_window_confidence_on_deterministic_forecast_matches_default(schedule_client):
+    params = {"schedule_id": 3, "lookahead_hours": 48}
+    default = schedule_client.get("/schedule/window", params=params).json()
+    certain = schedule_client.get("/schedule/window", params={**params, "confidence": 1}).json()
+
+    assert "ensemble_members" not in certain
+    assert certain["analysis"]["go_no_go"] == default["analysis"]["go_no_go"]
+    assert certain["analysis"]["start_windows"] == default["analysis"]["start_windows"]
+    assert certain["analysis"]["p_go"] == [float(go) for go in default["analysis"]["go_no_go"]]
+
+
+def test_schedule_plan_requires_p_go_to_reach_the_confidence(api_app):
+    api_app.state.weather_client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(ensemble_forecast)))
+    with TestClient(api_app) as client:
+        strict = client.get("/schedule/plan").json()
+        relaxed = client.get("/schedule/plan", params={"confidence": 0.75}).json()
+
+    def feasible(plan):
+        return [t["feasible"] for chain in plan["chains"] for t in chain["tasks"] if t["status"] == "READY"]
+
+    assert not any(feasible(strict))
+    assert any(feasible(relaxed))
+
+
+def test_task_criteria_combine_forecast_variables(schedule_client):
+    params = {"task_id": [3, 5], "lookahead_hours": 48}
+    before = {w["schedule_id"]: w for w in schedule_client.get("/schedule/windows", params=params).json()["windows"]}
+    # The demo limit table allows 2.25 m at the stand-in's 8 s period, so the calm hours still qualify
+    assert before[5]["task"]["criteria"] and before[5]["analysis"]["start_windows"]
+
+    # The stand-in blows 10 m/s throughout, so a stricter wind cap closes every window
+    response = schedule_client.put("/schedule/task/3/criteria", json={"criteria": "wave_height <= 2 and wind_speed < 8"})
+    assert response.status_code == 200
+    after = schedule_client.get("/schedule/windows", params=params).json()["windows"][0]
+    assert after["task"]["criteria"] == "wave_height <= 2 and wind_speed < 8"
+    assert not any(after["analysis"]["go_no_go"]) and not after["analysis"]["start_windows"]
+
+    assert schedule_client.put("/schedule/task/3/criteria", json={"criteria": "open('x')"}).status_code == 400
+    assert schedule_client.put("/schedule/task/3/criteria", json={"criteria": None}).status_code == 200
+    restored = schedule_client.get("/schedule/windows", params=params).json()["windows"][0]
+    assert restored["analysis"] == before[3]["analysis"]
@@ -0,0 +1,62 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.sea_state import SeaStateSimulation, jonswap_spectrum, run_simulation
+
+
+def test_jonswap_spectrum_preserves_significant_wave_height():
+    omega = np.linspace(0.05, 6.0, 20000)
+    m0 = np.trapezoid(jonswap_spectrum(omega, hs=2.0, tp=9.0), omega)
+
+    assert 4 * np.sqrt(m0) == pytest.approx(2.0, rel=0.02)
+
+
+def test_chunked_statistics_match_single_pass():
+    params = {"HS": 2, "TP": 9, "SimLength": 600, "dt": 0.2}
+    simulation = SeaStateSimulation.from_params(params)
+    eta = simulation.elevation(0, simulation.n_samples)
+
+    progress = []
+    stats = run_simulation(params, workers=1, chunk_samples=256, progress=progress.append)
+
+    assert stats["samples"] == eta.size
+    assert stats["std"] == pytest.approx(eta.std())
+    assert stats["max_crest"] == pytest.approx(eta.max())
+    assert stats["upcrossings"] == np.count_nonzero((eta[:-1] < 0) & (eta[1:] >= 0))
+    assert progress[-1] == 100 and progress == sorted(progress)
+
+
+def test_process_pool_matches_serial_run():
+    params = {"HS": 3, "TP": 11, "SimLength": 400, "seed": 3}
+
+    serial = run_simulation(params, workers=1, chunk_samples=1000)
+    parallel = run_simulation(params, workers=2, chunk_samples=1000)
+    assert parallel == pytest.approx(serial)
+
+    # The pool outlives the call: a second simulation pays no start-up or shutdown
+    start = time.perf_counter()
+    assert run_simulation(params, workers=2, chunk_samples=1000) == pytest.approx(serial)
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs two cores")
+def test_process_pool_is_faster_than_serial_run():
+    params = {"HS": 3, "TP": 11, "SimLength": 2 * 3600, "seed": 3}
+    run_simulation({**params, "SimLength": 100}, workers=2, chunk_samples=100)  # start the pool
+
+    start = time.perf_counter()
+    run_simulation(params, workers=1)
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    run_simulation(params, workers=2)
+    assert time.perf_counter() - start < serial
+
+
+def test_invalid_params_are_rejected():
+    with pytest.raises(ValueError):
+        run_simulation({"HS": 2, "TP": 9})
+    with pytest.raises(ValueError):
+        run_simulation({"HS": -1, "TP": 9, "SimLength": 10})
@@ -0,0 +1,121 @@
+import os
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import schedule
+from app.database import get_db
+from app.models import Base
+from app.models.schedule import Task
+
+
+def _seed_chains(session_factory, chains, length):
+    """Add ``chains`` independent chains; the head is READY and every later task BLOCKED on the previous one."""
+    ids = []
+    with session_factory() as db:
+        for c in range(chains):
+            chain = [100 + c * length + i for i in range(length)]
+            db.add_all(Task(id=task_id, name=f"chain {c} step {i}", duration="1h",
+                            predecessor=chain[i - 1] if i else None, status="BLOCKED" if i else "READY",
+                            wave_height_limit=2.0)
+                       for i, task_id in enumerate(chain))
+            ids.append(chain)
+        db.commit()
+    return ids
+
+
+def test_bulk_transition_updates_unblocks_and_rejects(schedule_client):
+    response = schedule_client.put("/schedule/tasks/status", json={"task_ids": [3, 1, 3, 99], "status": "COMPLETED"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [t["id"] for t in body["updated"]] == [3]
+    assert [(t["id"], t["status"]) for t in body["unblocked"]] == [(4, "READY")]
+    assert body["rejected"] == [{"id": 1, "status": "COMPLETED"}, {"id": 99, "status": None}]
+
+    # Task 5 still waits for task 4, which was only just unblocked
+    tasks = {t["id"]: t["status"] for t in schedule_client.get("/schedule/tasks").json()}
+    assert tasks == {1: "COMPLETED", 2: "COMPLETED", 3: "COMPLETED", 4: "READY", 5: "BLOCKED"}
+
+    started = schedule_client.put("/schedule/tasks/status", json={"task_ids": [4, 5], "status": "STARTED"}).json()
+    assert [t["id"] for t in started["updated"]] == [4]
+    assert started["unblocked"] == []
+    assert started["rejected"] == [{"id": 5, "status": "BLOCKED"}]
+
+
+def test_bulk_transition_validates_body(schedule_client):
+    assert schedule_client.put("/schedule/tasks/status", json={"task_ids": [], "status": "COMPLETED"}).status_code == 422
+    assert schedule_client.put("/schedule/tasks/status", json={"task_ids": [3], "status": "READY"}).status_code == 422
+
+
+def _complete_concurrently(app, session_factory):
+    chains = _seed_chains(session_factory, chains=50, length=4)
+    all_ids = [task_id for chain in chains for task_id in chain]
+
+    def hammer(seed):
+        rng = random.Random(seed)
+        updated, unblocked = [], []
+        with TestClient(app) as client:
+            for _ in range(60):
+                # Overlapping random batches: most ids are still BLOCKED or already done by another client
+                response = client.put("/schedule/tasks/status",
+                                      json={"task_ids": rng.sample(all_ids, 25), "status": "COMPLETED"})
+                assert response.status_code == 200
+                body = response.json()
+                updated += [t["id"] for t in body["updated"]]
+                unblocked += [t["id"] for t in body["unblocked"]]
+        return updated, unblocked
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(hammer, range(16)))
+
+    # Sweep whatever the random batches missed, then check every transition happened exactly once
+    with TestClient(app) as client:
+        for _ in range(4):
+            body = client.put("/schedule/tasks/status", json={"task_ids": all_ids, "status": "COMPLETED"}).json()
+            results.append(([t["id"] for t in body["updated"]], [t["id"] for t in body["unblocked"]]))
+
+    updated = Counter(task_id for u, _ in results for task_id in u)
+    unblocked = Counter(task_id for _, b in results for task_id in b)
+    assert updated == Counter(all_ids)
+    assert unblocked == Counter(task_id for chain in chains for task_id in chain[1:])
+    with session_factory() as db:
+        assert {t.status for t in db.query(Task).filter(Task.id.in_(all_ids))} == {"COMPLETED"}
+
+
+def test_concurrent_bulk_transitions_complete_every_task_once(api_app, session_factory):
+    _complete_concurrently(api_app, session_factory)
+
+
+@pytest.fixture
+def postgres_session_factory():
+    """Sessions on a disposable PostgreSQL database, given as ``TEST_POSTGRES_URL``; its tables are recreated."""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url, pool_size=20)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.mark.postgres
+def test_concurrent_bulk_transitions_on_postgres(postgres_session_factory):
+    # Row locks (and the FOR UPDATE pre-lock that orders them) only exist here; SQLite serialises all writers
+    app = FastAPI()
+    app.include_router(schedule.router)
+
+    def override_get_db():
+        with postgres_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    _complete_concurrently(app, postgres_session_factory)
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.weather_client import ForecastCache, WeatherAPIError, WeatherClient
+from app.forecast_store import ForecastStore
+
+NOW = datetime(2025, 11, 14, 8, 30, tzinfo=timezone.utc)
+
+
+def _forecast_payload(request):
+    start = int(request.url.params["from"])
+    forecast = [
+        {"timestamp": datetime.fromtimestamp(start + 1800 * i, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+         "wind_speed": 10.0, "wave_height": 1.0, "wave_period": 8.0}
+        for i in range(4)
+    ]
+    return {"location": {}, "forecast": forecast}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.params["location"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=_forecast_payload(request))
+
+    async def run():
+        client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        stores = await asyncio.gather(*(client.forecast(61.5001, 4.8, NOW) for _ in range(20)))
+        again = await client.forecast(61.5, 4.8, NOW.replace(minute=59))
+        await client.aclose()
+        return client, stores, again
+
+    client, stores, again = asyncio.run(run())
+
+    assert calls == ["61.5,4.8"]
+    assert all(store is stores[0] for store in stores) and again is stores[0]
+    assert len(stores[0]) == 4
+    stats = client.cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 19, 1)
+
+
+def test_ttl_expiry_lru_eviction_and_stale_fallback():
+    clock = _Clock()
+    store = ForecastStore([0], {"wave_height": [1.0]})
+    upstream = {"fail": False, "calls": 0}
+
+    async def fetch(key):
+        upstream["calls"] += 1
+        if upstream["fail"]:
+            raise WeatherAPIError(503, "down")
+        return store
+
+    async def run():
+        cache = ForecastCache(fetch, ttl_seconds=60, max_entries=2, max_stale_seconds=3600, clock=clock)
+        await cache.get((61.5, 4.8, 0))
+        clock.now = 30
+        await cache.get((61.5, 4.8, 0))  # fresh hit
+        clock.now = 90
+        await cache.get((61.5, 4.8, 0))  # expired, refetched
+
+        # Upstream down: the next hour bucket falls back to the stale copy for the location
+        upstream["fail"] = True
+        assert await cache.get((61.5, 4.8, 3600)) is store
+        with pytest.raises(WeatherAPIError):
+            await cache.get((62.0, 4.8, 3600))
+
+        upstream["fail"] = False
+        await cache.get((62.0, 4.8, 0))
+        await cache.get((63.0, 4.8, 0))
+        return cache
+
+    cache = asyncio.run(run())
+    stats = cache.stats()
+    assert upstream["calls"] == 6
+    assert (stats["hits"], stats["stale_served"], stats["errors"]) == (1, 1, 2)
+    assert (stats["size"], stats["evictions"]) == (2, 1)
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.celery_tasks.prefetch_windows import task_definitions
+from app.forecast_store import format_timestamps
+from app.models.schedule import Task
+from app.models.window_table import ForecastSnapshot, TaskWindow
+from app.weather_client import WeatherClient
+from app.window_table import ACTIVE_STATUSES, refresh_windows
+
+LAT, LON = 61.5, 4.8
+
+
+def hourly_forecast(request: httpx.Request) -> httpx.Response:
+    """Hourly stand-in whose values depend on the absolute hour, so a rolled horizon overlaps exactly."""
+    time_from = int(request.url.params["from"])
+    time_to = int(request.url.params["time_to"])
+    forecast = [
+        {"timestamp": format_timestamps([t])[0], "wind_speed": 10.0,
+         "wave_height": 3.0 if (t // 3600) % 8 >= 6 else 1.0, "wave_period": 8.0}
+        for t in range(time_from, time_to + 1, 3600)
+    ]
+    return httpx.Response(200, json={"location": {}, "forecast": forecast})
+
+
+def ten_minute_forecast(request: httpx.Request) -> httpx.Response:
+    """Sub-hourly stand-in like the bundled mock: hourly means depend on which points a window includes."""
+    time_from = int(request.url.params["from"])
+    time_to = int(request.url.params["time_to"])
+    forecast = [
+        {"timestamp": format_timestamps([t])[0], "wind_speed": 10.0,
+         "wave_height": 1.0 + 0.25 * ((t // 600) % 6), "wave_period": 8.0}
+        for t in range(time_from // 600 * 600, time_to + 1, 600)
+    ]
+    return httpx.Response(200, json={"location": {}, "forecast": forecast})
+
+
+def _refresh(session_factory, now, lat=LAT, lon=LON, transport=hourly_forecast):
+    client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(transport)))
+    store = asyncio.run(client.forecast(lat, lon, now))
+    horizon = WeatherClient.horizon(WeatherClient.cache_key(lat, lon, now))
+    with session_factory() as db:
+        tasks = db.execute(select(Task).where(Task.status.in_(ACTIVE_STATUSES)).order_by(Task.id)).scalars().all()
+        return refresh_windows(db, lat, lon, store, horizon, task_definitions(tasks))
+
+
+@pytest.mark.parametrize("transport, source", [(hourly_forecast, "materialized"), (ten_minute_forecast, "live")])
+def test_materialized_windows_match_live_computation(api_app, session_factory, transport, source):
+    api_app.state.weather_client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(transport)))
+    requests = [{"schedule_id": task_id, "lookahead_hours": hours, "format": output}
+                for task_id in (3, 4, 5) for hours in (12, 48) for output in ("records", "columnar")]
+    with TestClient(api_app) as client:
+        live = [client.get("/schedule/window", params=params) for params in requests]
+        assert {r.headers["x-window-source"] for r in live} == {"live"}
+
+        stats = _refresh(session_factory, datetime.now(tz=timezone.utc), transport=transport)
+        assert (stats["computed"], stats["skipped"]) == ((3, 0) if source == "materialized" else (0, 3))
+        served = [client.get("/schedule/window", params=params) for params in requests]
+
+        # Sub-hourly forecasts are never materialized: their partial first and last hours depend on the request time
+        assert {r.headers["x-window-source"] for r in served} == {source}
+        assert [r.json() for r in served] == [r.json() for r in live]
+        # Explicit confidence and other locations are always computed live
+        assert client.get("/schedule/window", params={"schedule_id": 3, "confidence": 0.5}).headers[
+            "x-window-source"] == "live"
+        assert client.get("/schedule/window", params={"schedule_id": 3, "lat": 60.0}).headers[
+            "x-window-source"] == "live"
+
+
+def test_refresh_only_recomputes_what_changed(api_app, session_factory):
+    now = datetime.now(tz=timezone.utc)
+    assert _refresh(session_factory, now) == {"tasks": 3, "computed": 3, "unchanged": 0, "removed": 0, "skipped": 0,
+                                               "reused_hours": 0}
+    assert _refresh(session_factory, now)["unchanged"] == 3
+
+    api_app.state.weather_client = WeatherClient(httpx.AsyncClient(transport=httpx.MockTransport(hourly_forecast)))
+    with TestClient(api_app) as client:
+        # Edited criteria invalidate that task's row until the next refresh
+        client.put("/schedule/task/3/criteria", json={"criteria": "wave_height <= 2 and wind_speed < 12"})
+        assert client.get("/schedule/window", params={"schedule_id": 3}).headers["x-window-source"] == "live"
+        assert client.get("/schedule/window", params={"schedule_id": 4}).headers["x-window-source"] == "materialized"
+        client.put("/schedule/task/4/complete")
+    stats = _refresh(session_factory, now)
+    assert (stats["computed"], stats["unchanged"], stats["removed"]) == (1, 1, 1)
+
+    # Stale snapshots are not served
+    with session_factory() as db:
+        db.execute(select(ForecastSnapshot)).scalar_one().refreshed_at -= timedelta(days=1)
+        db.commit()
+    with TestClient(api_app) as client:
+        assert client.get("/schedule/window", params={"schedule_id": 3}).headers["x-window-source"] == "live"
+
+
+def test_rolled_horizon_reuses_unchanged_hours(session_factory):
+    now = datetime.now(tz=timezone.utc)
+    _refresh(session_factory, now)
+    rolled = _refresh(session_factory, now + timedelta(hours=1))
+    # From scratch at another location, on the same forecast
+    _refresh(session_factory, now + timedelta(hours=1), lat=60.0)
+
+    with session_factory() as db:
+        n_hours = len(db.execute(select(ForecastSnapshot).where(ForecastSnapshot.lat == LAT)).scalar_one().times) // 8
+        rows = db.execute(select(TaskWindow, ForecastSnapshot.lat).join(ForecastSnapshot)).all()
+    assert rolled["computed"] == 3 and rolled["reused_hours"] == n_hours - 1
+    by_location = {}
+    for window, lat in rows:
+        by_location.setdefault(window.task_id, {})[lat] = (window.go, window.exceedance, window.starts)
+    for task_id, windows in by_location.items():
+        assert windows[LAT] == windows[60.0]